@@ -0,0 +1,12 @@
+"""
+Microbenchmarks for pyconfita.
+
+Each module can be run on its own, e.g.:
+
+    python -m benchmarks.bench_logging
+
+or all together, writing results as JSON, and compared between two runs:
+
+    python -m benchmarks run -o results.json
+    python -m benchmarks compare baseline.json results.json
+"""
@@ -0,0 +1,140 @@
+"""
+Run the benchmark suite and write results as JSON, or compare two runs.
+
+    python -m benchmarks run -o results.json [--only bench_confita ...]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.1]
+
+compare exits with status 1 if a metric regressed by more than threshold
+(relative), or exceeds the budget set by its benchmark module (BUDGETS,
+metric -> maximum value), so that it can gate changes.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import sys
+from typing import Dict, Optional
+
+MODULES = (
+    "bench_confita",
+    "bench_schema",
+    "bench_logging",
+    "bench_string",
+    "bench_file",
+    "bench_import",
+    "bench_warm_start",
+    "bench_vault_kv2",
+    "bench_threads",
+)
+
+
+def flatten(results: dict, prefix: str = "") -> Dict[str, float]:
+    """
+    Returns numeric results keyed by path (nested keys joined with "/").
+    Non-numeric results are dropped.
+    """
+    flat = {}
+    for k, v in results.items():
+        path = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(flatten(v, f"{path}/"))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            flat[path] = v
+    return flat
+
+
+def run(only: Optional[list] = None) -> dict:
+    """
+    Run benchmark modules, returns the report.
+    """
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "benchmarks": {},
+    }
+    for name in only or MODULES:
+        module = importlib.import_module(f"benchmarks.{name}")
+        print(f"Running {name}...", file=sys.stderr)
+        report["benchmarks"][name] = {
+            "higher_is_better": getattr(module, "HIGHER_IS_BETTER", True),
+            "budgets": getattr(module, "BUDGETS", {}),
+            "results": flatten(module.run()),
+        }
+    return report
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Returns the regressions of current against baseline: (metric, baseline
+    value, current value, relative change), for the metrics present in both,
+    and the metrics of current over budget: (metric, budget, current value,
+    relative excess).
+    """
+    regressions = []
+    for name, bench in current["benchmarks"].items():
+        for metric, budget in bench.get("budgets", {}).items():
+            value = bench["results"].get(metric)
+            if value is not None and value > budget:
+                change = (value - budget) / budget
+                regressions.append((f"{name}:{metric}", budget, value, change))
+        base_bench = baseline["benchmarks"].get(name)
+        if base_bench is None:
+            continue
+        sign = 1 if bench["higher_is_better"] else -1
+        for metric, value in bench["results"].items():
+            base_value = base_bench["results"].get(metric)
+            if not base_value:
+                continue
+            change = (value - base_value) / base_value
+            if sign * change < -threshold:
+                regressions.append((f"{name}:{metric}", base_value, value, change))
+    return regressions
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command")
+    run_parser = subparsers.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("-o", "--output", help="JSON report path")
+    run_parser.add_argument("--only", nargs="+", choices=MODULES)
+    compare_parser = subparsers.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative regression tolerated, defaults to 0.1",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for metric, base_value, value, change in regressions:
+            print(f"{metric}: {base_value:.6g} -> {value:.6g} ({change:+.1%})")
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+        print("No regression")
+        return 0
+
+    report = run(getattr(args, "only", None))
+    output = json.dumps(report, indent=2)
+    if getattr(args, "output", None):
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
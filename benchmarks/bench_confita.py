@@ -0,0 +1,180 @@
+"""
+Measure Confita.get, Confita.get_struct and Backend._cast throughput:
+- get and get_struct of each backend at several schema sizes;
+- case-sensitive versus case-insensitive resolution;
+- stacks of 1 to 10 backends;
+- Vault backend with cache on and off, against a local stub Vault agent.
+
+Results are operations per second, keyed by case name.
+"""
+import json
+import os
+import tempfile
+import timeit
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator
+
+import yaml
+
+from pyconfita.testing import serve
+from pyconfita import (
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    EnvBackend,
+    FileBackend,
+    StringBackend,
+    VaultBackend,
+)
+from pyconfita.backend.backend import Backend
+
+SIZES = (10, 100, 1000)
+STACKS = (1, 2, 5, 10)
+ENV_PREFIX = "PYCONFITA_BENCH_"
+VAULT_PATH = "bench"
+# Minimum duration of one measure, in seconds
+MIN_DURATION = 0.2
+
+LOGGER = DummyLoggingInterface(level="info")
+
+
+def ops_per_s(fn: Callable) -> float:
+    """
+    Returns calls of fn per second, measured over at least MIN_DURATION.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= MIN_DURATION:
+            return number / elapsed
+        number *= 10 if elapsed < MIN_DURATION / 10 else 2
+
+
+def make_kv(size: int) -> Dict[str, str]:
+    return {f"K_{i}": str(i) for i in range(size)}
+
+
+def make_schema(size: int) -> Dict[str, type]:
+    return {f"K_{i}": int for i in range(size)}
+
+
+@contextmanager
+def environ(kv: Dict[str, str]) -> Iterator[None]:
+    """
+    Set prefixed environment variables from kv, removed on exit.
+    """
+    names = [f"{ENV_PREFIX}{k}" for k in kv]
+    os.environ.update({f"{ENV_PREFIX}{k}": v for k, v in kv.items()})
+    try:
+        yield
+    finally:
+        for name in names:
+            os.environ.pop(name, None)
+
+
+def build_backends(stack: ExitStack, directory: str, kv: dict) -> dict:
+    """
+    Returns one backend of each kind, all loaded with kv.
+    """
+    file_path = os.path.join(directory, f"vars_{len(kv)}.yaml")
+    with open(file_path, "w") as f:
+        yaml.safe_dump(kv, f)
+    stack.enter_context(environ(kv))
+    vault_stub = stack.enter_context(serve({VAULT_PATH: kv}))
+
+    backends = {
+        "dict": DictBackend(kv),
+        "file": FileBackend(file_path),
+        "string": StringBackend(json.dumps(kv)),
+        "env": EnvBackend(prefix=ENV_PREFIX),
+        "env_snapshot": EnvBackend(snapshot=True, prefix=ENV_PREFIX),
+    }
+    for name, enable_cache in [("vault_cache", True), ("vault_no_cache", False)]:
+        vault = VaultBackend(
+            LOGGER,
+            default_key_path=VAULT_PATH,
+            url=vault_stub.url,
+            enable_cache=enable_cache,
+        )
+        vault.await_ready()
+        stack.callback(vault.close)
+        backends[name] = vault
+    return backends
+
+
+def bench_backends(results: dict) -> None:
+    """
+    get and get_struct of each backend, case-sensitive or not, at several
+    schema sizes.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            with ExitStack() as stack:
+                kv = make_kv(size)
+                schema = make_schema(size)
+                key = f"K_{size // 2}"
+                for name, bk in build_backends(stack, directory, kv).items():
+                    for case_sensitive in [True, False]:
+                        c = Confita(
+                            logger=LOGGER,
+                            backends=[bk],
+                            case_sensitive=case_sensitive,
+                            case_insensitive_struct=not case_sensitive,
+                        )
+                        mode = "cs" if case_sensitive else "ci"
+                        # Lowercased key: read as is if case-sensitive
+                        _key = key if case_sensitive else key.lower()
+                        results[f"get/{name}/{mode}/size={size}"] = ops_per_s(
+                            lambda: c.get(_key, type=int)
+                        )
+                        results[f"get_struct/{name}/{mode}/size={size}"] = ops_per_s(
+                            lambda: c.get_struct(schema)
+                        )
+
+
+def bench_stacks(results: dict) -> None:
+    """
+    get and get_struct with stacks of dict backends. Each backend holds a
+    slice of the keys.
+    """
+    size = 100
+    schema = make_schema(size)
+    for n in STACKS:
+        backends = [
+            DictBackend(
+                {k: v for j, (k, v) in enumerate(make_kv(size).items()) if j % n == i}
+            )
+            for i in range(n)
+        ]
+        for short_circuit in [False, True]:
+            c = Confita(logger=LOGGER, backends=backends, short_circuit=short_circuit)
+            mode = "short_circuit" if short_circuit else "forward"
+            results[f"stack/get/{mode}/backends={n}"] = ops_per_s(
+                lambda: c.get("K_0", type=int)
+            )
+            results[f"stack/get_struct/{mode}/backends={n}"] = ops_per_s(
+                lambda: c.get_struct(schema)
+            )
+        # Reads of values resolved once
+        snapshot = Confita(logger=LOGGER, backends=backends).snapshot(schema)
+        results[f"stack/snapshot/backends={n}"] = ops_per_s(lambda: snapshot["K_0"])
+
+
+def bench_cast(results: dict) -> None:
+    bk = Backend()
+    for _type, v in [(str, "s"), (int, "10"), (float, "1.5"), (bool, "true")]:
+        results[f"cast/{_type.__name__}"] = ops_per_s(lambda: bk._cast(v, type=_type))
+
+
+def run() -> dict:
+    results = {}
+    bench_cast(results)
+    bench_stacks(results)
+    bench_backends(results)
+    return results
+
+
+if __name__ == "__main__":
+    for name, per_s in run().items():
+        print(f"{name:>45}: {per_s:.0f}/s")
@@ -0,0 +1,73 @@
+"""
+Measure FileBackend load time on multi-megabyte YAML and JSON files, against
+the previous loading (JSON attempt, second read, pure Python YAML loader).
+"""
+import json
+import os
+import tempfile
+import timeit
+
+import yaml
+
+from pyconfita import FileBackend
+
+NUMBER = 2
+# Results are durations
+HIGHER_IS_BETTER = False
+N_KEYS = 100_000
+
+
+def build(directory: str) -> dict:
+    kv = {f"key_{i}": f"value_{i}" if i % 2 else i for i in range(N_KEYS)}
+    kv["nested"] = {f"key_{i}": [i, str(i), {"x": i}] for i in range(N_KEYS // 10)}
+    paths = {}
+    for _format, dump in [("yaml", yaml.safe_dump), ("json", json.dumps)]:
+        path = os.path.join(directory, f"vars.{_format}")
+        with open(path, "w") as f:
+            f.write(dump(kv))
+        paths[_format] = path
+    return paths
+
+
+def legacy_load(file_path: str) -> dict:
+    """
+    Loading before single-pass parsing
+    """
+    _kv = None
+    try:
+        with open(file_path, "r") as f:
+            _kv = json.loads(f.read())
+    except Exception as e:
+        pass
+    if _kv is None:
+        with open(file_path, "r") as f:
+            _kv = yaml.safe_load("".join(f.readlines()))
+    return _kv
+
+
+def run() -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = build(directory)
+        for _format, path in paths.items():
+            assert FileBackend(path).kv == legacy_load(path)
+            size_mb = os.path.getsize(path) / 1e6
+            for name, load in [("legacy", legacy_load), ("single-pass", FileBackend)]:
+                elapsed = timeit.timeit(lambda: load(path), number=NUMBER)
+                results[f"{_format} {name}"] = {
+                    "size_mb": size_mb,
+                    "load_s": elapsed / NUMBER,
+                }
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, res in results.items():
+        print(f"{name:>16}: {res['load_s'] * 1000:.1f} ms ({res['size_mb']:.1f} MB)")
+    for _format in ["yaml", "json"]:
+        speedup = (
+            results[f"{_format} legacy"]["load_s"]
+            / results[f"{_format} single-pass"]["load_s"]
+        )
+        print(f"{_format + ' speedup':>16}: x{speedup:.2f}")
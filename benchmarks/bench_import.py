@@ -0,0 +1,81 @@
+"""
+Measure the cold import cost of pyconfita for the env/dict path with
+`python -X importtime`, and check it against a budget (checked by
+`python -m benchmarks compare`, not by the test suite: timings are noisy on
+loaded machines).
+"""
+import os
+import subprocess
+import sys
+
+import pyconfita
+
+# Import of the env/dict path, in a fresh interpreter
+STATEMENT = "from pyconfita import Confita, EnvBackend, DictBackend"
+# Modules that must not be imported on the env/dict path
+HEAVY_MODULES = ("hvac", "requests", "cacheout", "yaml", "asyncio")
+# Budget of the cumulative import time of pyconfita, in microseconds
+BUDGET_US = 50_000
+# Metric -> maximum value, checked by compare
+BUDGETS = {"import_us": BUDGET_US}
+REPEAT = 5
+# Results are durations
+HIGHER_IS_BETTER = False
+
+
+def _src_path() -> str:
+    # Directory containing the pyconfita package
+    return os.path.dirname(os.path.dirname(os.path.abspath(pyconfita.__file__)))
+
+
+def import_time(statement: str = STATEMENT) -> tuple:
+    """
+    Runs statement in a fresh interpreter with -X importtime.
+    Returns the cumulative import time of pyconfita (us) and the heavy
+    modules imported.
+    """
+    code = (
+        f"import sys; {statement}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in [_src_path(), env.get("PYTHONPATH")] if p
+    )
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    cumulative = None
+    for line in res.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if fields[2].strip() == "pyconfita":
+            cumulative = int(fields[1])
+    heavy = [m for m in res.stdout.strip().split(",") if m]
+    return cumulative, heavy
+
+
+def run() -> dict:
+    # Warm-up run to write bytecode caches, then keep the best run
+    import_time()
+    times = []
+    heavy = []
+    for _ in range(REPEAT):
+        cumulative, heavy = import_time()
+        times.append(cumulative)
+    return {"import_us": min(times), "heavy_modules": heavy}
+
+
+if __name__ == "__main__":
+    results = run()
+    print(f"{STATEMENT}")
+    print(f"{'import':>10}: {results['import_us']} us (budget {BUDGET_US} us)")
+    print(f"{'heavy':>10}: {', '.join(results['heavy_modules']) or '-'}")
+    if results["import_us"] > BUDGET_US or results["heavy_modules"]:
+        sys.exit(1)
@@ -0,0 +1,58 @@
+"""
+Measure the cost of debug messages in Confita.get.
+
+Compares a logger discarding debug messages after they are built (behaviour
+of loggers not implementing is_enabled) with a level-aware logger, which lets
+Confita skip building them.
+"""
+import timeit
+
+from pyconfita import Confita, DictBackend, LoggingInterface
+from pyconfita.logging_interface import LEVELS
+
+NUMBER = 20000
+# Results are durations
+HIGHER_IS_BETTER = False
+N_BACKENDS = 5
+
+
+class DiscardingLoggingInterface(LoggingInterface):
+    """Logger discarding debug messages once they are built"""
+
+    def log(self, level=None, message=None, *args, **kwargs) -> None:
+        if LEVELS.get(level, 0) < LEVELS["info"]:
+            return
+
+
+class LevelAwareLoggingInterface(DiscardingLoggingInterface):
+    """Logger reporting debug messages as disabled"""
+
+    def is_enabled(self, level=None) -> bool:
+        return LEVELS.get(level, 0) >= LEVELS["info"]
+
+
+def build_confita(logger: LoggingInterface) -> Confita:
+    backends = [
+        DictBackend({f"K_{j}": f"value_{i}_{j}" for j in range(10)})
+        for i in range(N_BACKENDS)
+    ]
+    return Confita(logger=logger, backends=backends)
+
+
+def run() -> dict:
+    results = {}
+    for name, logger in [
+        ("eager", DiscardingLoggingInterface()),
+        ("level_aware", LevelAwareLoggingInterface()),
+    ]:
+        c = build_confita(logger)
+        elapsed = timeit.timeit(lambda: c.get("K_5"), number=NUMBER)
+        results[name] = elapsed / NUMBER * 1e6
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, us_per_call in results.items():
+        print(f"{name:>12}: {us_per_call:.2f} us/get")
+    print(f"{'speedup':>12}: x{results['eager'] / results['level_aware']:.2f}")
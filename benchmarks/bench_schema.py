@@ -0,0 +1,41 @@
+"""
+Measure get_struct throughput with a dict schema and a compiled Schema.
+"""
+import timeit
+
+from pyconfita import Confita, DictBackend, DummyLoggingInterface, Schema
+
+NUMBER = 2000
+N_FIELDS = 200
+N_BACKENDS = 3
+TYPES = [str, int, float, bool]
+
+
+def build() -> tuple:
+    fields = {f"K_{i}": TYPES[i % len(TYPES)] for i in range(N_FIELDS)}
+    values = {"K_%d" % i: str(i) if i % 4 != 3 else "true" for i in range(N_FIELDS)}
+    backends = [
+        DictBackend({k: v for j, (k, v) in enumerate(values.items()) if j % 3 == i})
+        for i in range(N_BACKENDS)
+    ]
+    c = Confita(logger=DummyLoggingInterface(level="info"), backends=backends)
+    return c, fields
+
+
+def run() -> dict:
+    c, fields = build()
+    schema = Schema(fields)
+    assert dict(c.get_struct(schema)) == c.get_struct(fields)
+
+    results = {}
+    for name, _schema in [("dict", fields), ("compiled", schema)]:
+        elapsed = timeit.timeit(lambda: c.get_struct(_schema), number=NUMBER)
+        results[name] = NUMBER / elapsed
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, per_s in results.items():
+        print(f"{name:>10}: {per_s:.0f} get_struct/s ({N_FIELDS} fields)")
+    print(f"{'speedup':>10}: x{results['compiled'] / results['dict']:.2f}")
@@ -0,0 +1,91 @@
+"""
+Measure StringBackend construction on the inputs of the string backend tests,
+against the previous parsing (JSON, quote-replaced JSON, then YAML).
+"""
+import json
+import timeit
+
+import yaml
+
+from pyconfita import DictBackend, StringBackend
+
+NUMBER = 5000
+REPEAT = 5
+
+# Inputs of backend/string/tests/test_string.py
+INPUTS = {
+    "json": (
+        '{"lower": "cased",'
+        ' "upper": "CASED",'
+        ' "int": 1,'
+        ' "float": 1.0,'
+        ' "bool": true,'
+        ' "none": null}'
+    ),
+    "json simple quotes": (
+        "{'lower': 'cased',"
+        "'upper': 'CASED',"
+        "'int': 1,"
+        "'float': 1.0,"
+        "'bool': true,"
+        "'none': null}"
+    ),
+    "yaml": (
+        "lower: cased\n"
+        "upper: CASED\n"
+        "int: 1\n"
+        "float: 1.0\n"
+        "bool: true\nnone: null"
+    ),
+    "empty string": "",
+    "empty dict": "{}",
+    "empty dict with spaces": " {} ",
+}
+
+
+def legacy_backend(input_str: str) -> DictBackend:
+    """
+    Backend built with the parsing used before the format hint and sniffing
+    """
+    _kv = None
+    try:
+        _kv = json.loads(input_str)
+    except Exception as e:
+        try:
+            _kv = json.loads(input_str.strip().replace("'", '"'))
+        except Exception as ee:
+            pass
+    if _kv is None:
+        try:
+            _kv = yaml.safe_load(input_str)
+        except Exception as e:
+            pass
+    return DictBackend(_kv or {})
+
+
+def run() -> dict:
+    results = {}
+    for name, input_str in INPUTS.items():
+        assert StringBackend(input_str).kv == legacy_backend(input_str).kv
+        # Best of REPEAT runs
+        legacy = min(
+            timeit.repeat(
+                lambda: legacy_backend(input_str), number=NUMBER, repeat=REPEAT
+            )
+        )
+        current = min(
+            timeit.repeat(
+                lambda: StringBackend(input_str), number=NUMBER, repeat=REPEAT
+            )
+        )
+        results[name] = {"legacy": NUMBER / legacy, "current": NUMBER / current}
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, res in results.items():
+        print(
+            f"{name:>22}: {res['legacy']:.0f} -> {res['current']:.0f} backends/s"
+            f" (x{res['current'] / res['legacy']:.2f})"
+        )
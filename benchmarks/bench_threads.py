@@ -0,0 +1,131 @@
+"""
+Measure Confita.get throughput from 1 to 64 threads sharing one Confita:
+- dict backend, updated by a writer thread;
+- file backend in reload mode;
+- Vault backend with cache, against a local stub Vault agent, with a short
+cache ttl so that entries expire while being read.
+
+Results are operations per second, all threads included, keyed by case name
+and number of threads. With the GIL, throughput is not expected to grow with
+threads, but not to collapse either.
+"""
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict
+
+import yaml
+
+from pyconfita.testing import serve
+from pyconfita import (
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    FileBackend,
+    VaultBackend,
+)
+
+THREADS = (1, 2, 4, 8, 16, 32, 64)
+N_KEYS = 100
+VAULT_PATH = "bench"
+# Duration of one measure, in seconds
+DURATION = 0.2
+
+LOGGER = DummyLoggingInterface(level="warning")
+
+
+def ops_per_s(fn: Callable[[int], None], n_threads: int) -> float:
+    """
+    Returns calls of fn per second, summed over n_threads threads calling it
+    for DURATION seconds. fn is called with a call counter.
+    """
+    barrier = threading.Barrier(n_threads + 1)
+    stop = threading.Event()
+    counts = []
+    errors = []
+
+    def run():
+        count = 0
+        barrier.wait()
+        try:
+            while not stop.is_set():
+                fn(count)
+                count += 1
+        except Exception as e:
+            errors.append(e)
+        counts.append(count)
+
+    threads = [threading.Thread(target=run) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    time.sleep(DURATION)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return sum(counts) / elapsed
+
+
+def build_cases(stack: ExitStack, directory: str) -> Dict[str, Callable]:
+    """
+    Returns case name -> function reading one key, called with a counter.
+    """
+    kv = {f"K_{i}": str(i) for i in range(N_KEYS)}
+    keys = list(kv)
+
+    dict_bk = DictBackend(dict(kv))
+    dict_confita = Confita(LOGGER, [dict_bk], enable_cache=True)
+
+    def read_dict(i: int) -> None:
+        dict_confita.get(keys[i % N_KEYS], type=int)
+        if i % 1000 == 0:
+            # Copy-on-write update, as a writer would do
+            dict_bk.update({"K_0": str(i)})
+
+    file_path = os.path.join(directory, "vars.yaml")
+    with open(file_path, "w") as f:
+        yaml.safe_dump(kv, f)
+    file_confita = Confita(
+        LOGGER, [FileBackend(file_path, reload=True, reload_interval=0.01)]
+    )
+
+    def read_file(i: int) -> None:
+        file_confita.get(keys[i % N_KEYS], type=int)
+
+    server = stack.enter_context(serve({VAULT_PATH: kv}))
+    vault = VaultBackend(
+        LOGGER,
+        url=server.url,
+        default_key_path=VAULT_PATH,
+        enable_cache=True,
+        cache_ttl=0.05,
+    )
+    stack.callback(vault.close)
+    vault_confita = Confita(LOGGER, [vault])
+
+    def read_vault(i: int) -> None:
+        vault_confita.get(keys[i % N_KEYS], type=int)
+
+    return {"dict": read_dict, "file": read_file, "vault": read_vault}
+
+
+def run() -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        for name, fn in build_cases(stack, directory).items():
+            results[name] = {f"threads={n}": ops_per_s(fn, n) for n in THREADS}
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    for name, by_threads in results.items():
+        base = by_threads["threads=1"]
+        for case, ops in by_threads.items():
+            print(f"{name:>6} {case:>11}: {ops:>12,.0f} ops/s (x{ops / base:.2f})")
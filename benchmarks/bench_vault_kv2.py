@@ -0,0 +1,68 @@
+"""
+Measure revalidation of one large KV v2 secret against a stub agent: full data
+reads versus metadata version checks, in bytes sent by the agent and time per
+revalidation.
+"""
+import time
+
+from pyconfita.testing import serve
+from pyconfita import VaultBackend
+from pyconfita.logging_interface import DummyLoggingInterface
+
+N_KEYS = 2000
+N_REVALIDATIONS = 200
+# Results are bytes and durations
+HIGHER_IS_BETTER = False
+LOGGER = DummyLoggingInterface(level="warning")
+
+
+def revalidate(server, enable_cache: bool) -> tuple:
+    """
+    Returns bytes sent by the agent and time per revalidation of the secret,
+    caching (and checking versions) or not.
+    """
+    bk = VaultBackend(
+        LOGGER,
+        url=server.url,
+        default_key_path="app",
+        kv_version=2,
+        enable_cache=enable_cache,
+    )
+    assert bk.get("key_0") == "value_0"
+    bytes_sent = server.bytes_sent
+    begin = time.perf_counter()
+    for _ in range(N_REVALIDATIONS):
+        if bk.cache is not None:
+            # Expire the entry
+            bk.cache.get_entry("app").fetched_at -= bk.cache.ttl
+        assert bk.get("key_0") == "value_0"
+    elapsed = time.perf_counter() - begin
+    bk.close()
+    return (
+        (server.bytes_sent - bytes_sent) / N_REVALIDATIONS,
+        elapsed / N_REVALIDATIONS,
+    )
+
+
+def run() -> dict:
+    secret = {f"key_{i}": f"value_{i}" * 4 for i in range(N_KEYS)}
+    secret["key_0"] = "value_0"
+    results = {}
+    with serve({}, kv2_store={"app": [secret]}) as server:
+        full_bytes, full_s = revalidate(server, enable_cache=False)
+        check_bytes, check_s = revalidate(server, enable_cache=True)
+    results["full_read_bytes"] = full_bytes
+    results["version_check_bytes"] = check_bytes
+    results["full_read_s"] = full_s
+    results["version_check_s"] = check_s
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    print(f"{N_KEYS} keys secret, {N_REVALIDATIONS} revalidations")
+    for name, value in results.items():
+        if name.endswith("_s"):
+            print(f"{name:>20}: {value * 1e6:.1f} us")
+        else:
+            print(f"{name:>20}: {value:.0f} B")
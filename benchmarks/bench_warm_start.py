@@ -0,0 +1,71 @@
+"""
+Measure Vault backend start: time until one key of every path is read, cold
+(all paths read from the agent) versus warm (paths loaded from the persistent
+cache, read again from the agent in the background), against a stub agent
+answering after DELAY seconds.
+"""
+import os
+import tempfile
+import time
+
+from pyconfita.testing import serve
+from pyconfita import VaultBackend
+from pyconfita.logging_interface import DummyLoggingInterface
+
+N_PATHS = 50
+# Latency of the stub agent, per request
+DELAY = 0.005
+REPEAT = 3
+# Results are durations
+HIGHER_IS_BETTER = False
+LOGGER = DummyLoggingInterface(level="warning")
+
+
+def start(url: str, cache_path: str) -> float:
+    """
+    Returns the time to create a Vault backend, and read one key of every
+    path.
+    """
+    begin = time.perf_counter()
+    bk = VaultBackend(
+        LOGGER,
+        url=url,
+        default_key_path="path_0",
+        enable_cache=True,
+        persistent_cache_path=cache_path,
+    )
+    for i in range(N_PATHS):
+        assert bk.get("key", path=f"path_{i}") == f"value_{i}"
+    elapsed = time.perf_counter() - begin
+    if bk._revalidate_thread is not None:
+        bk._revalidate_thread.join()
+    bk.close()
+    return elapsed
+
+
+def run() -> dict:
+    store = {f"path_{i}": {"key": f"value_{i}"} for i in range(N_PATHS)}
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, serve(
+        store, delay=DELAY
+    ) as server:
+        cache_path = os.path.join(directory, "vault-cache.json")
+        cold = []
+        warm = []
+        for _ in range(REPEAT):
+            if os.path.exists(cache_path):
+                os.unlink(cache_path)
+            cold.append(start(server.url, cache_path))
+            # The cache file is written by the cold start
+            warm.append(start(server.url, cache_path))
+        results["cold_start_s"] = min(cold)
+        results["warm_start_s"] = min(warm)
+    return results
+
+
+if __name__ == "__main__":
+    results = run()
+    print(f"{N_PATHS} paths, stub agent latency {DELAY * 1000:.0f} ms")
+    for name, elapsed in results.items():
+        print(f"{name:>14}: {elapsed * 1000:.1f} ms")
+    print(f"{'speedup':>14}: x{results['cold_start_s'] / results['warm_start_s']:.1f}")
@@ -0,0 +1,2 @@
+# Makes the benchmarks package importable from tests, whatever the pytest
+# invocation (rootdir is inserted in sys.path)
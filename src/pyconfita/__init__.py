@@ -1,7 +1,69 @@
+from importlib import import_module
+from typing import TYPE_CHECKING
+
 from pyconfita.backend.environment.environment import Backend as EnvBackend
-from pyconfita.backend.vault.vault import Backend as VaultBackend
-from pyconfita.backend.file.file import Backend as FileBackend
 from pyconfita.backend.dict.dict import Backend as DictBackend
-from pyconfita.backend.string.string import Backend as StringBackend
 from pyconfita.logging_interface import LoggingInterface, DummyLoggingInterface
+from pyconfita.metrics_interface import MetricsInterface, InMemoryMetrics
+from pyconfita.tracing_interface import TracerInterface, InMemoryTracer
 from pyconfita.pyconfita import Confita
+from pyconfita.schema import Schema
+from pyconfita.snapshot import Snapshot, SnapshotRefresher
+
+# Exports loaded on first access, so that `import pyconfita` does not import
+# hvac, requests, cacheout, yaml, asyncio or multiprocessing: name -> (module,
+# attribute)
+_LAZY_EXPORTS = {
+    "VaultBackend": ("pyconfita.backend.vault.vault", "Backend"),
+    "AsyncVaultBackend": ("pyconfita.backend.vault.async_vault", "Backend"),
+    "FileBackend": ("pyconfita.backend.file.file", "Backend"),
+    "StringBackend": ("pyconfita.backend.string.string", "Backend"),
+    "AsyncConfita": ("pyconfita.async_pyconfita", "AsyncConfita"),
+    "SharedSnapshotPublisher": ("pyconfita.shared", "SharedSnapshotPublisher"),
+    "SharedSnapshotReader": ("pyconfita.shared", "SharedSnapshotReader"),
+}
+
+if TYPE_CHECKING:
+    from pyconfita.backend.vault.vault import Backend as VaultBackend
+    from pyconfita.backend.vault.async_vault import Backend as AsyncVaultBackend
+    from pyconfita.backend.file.file import Backend as FileBackend
+    from pyconfita.backend.string.string import Backend as StringBackend
+    from pyconfita.async_pyconfita import AsyncConfita
+    from pyconfita.shared import SharedSnapshotPublisher, SharedSnapshotReader
+
+__all__ = [
+    "EnvBackend",
+    "VaultBackend",
+    "AsyncVaultBackend",
+    "FileBackend",
+    "DictBackend",
+    "StringBackend",
+    "LoggingInterface",
+    "DummyLoggingInterface",
+    "MetricsInterface",
+    "InMemoryMetrics",
+    "TracerInterface",
+    "InMemoryTracer",
+    "Confita",
+    "AsyncConfita",
+    "Schema",
+    "Snapshot",
+    "SnapshotRefresher",
+    "SharedSnapshotPublisher",
+    "SharedSnapshotReader",
+]
+
+
+def __getattr__(name: str):
+    try:
+        module_name, attr = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), attr)
+    # Cache in module globals: next accesses do not go through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
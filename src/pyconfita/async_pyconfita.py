@@ -0,0 +1,362 @@
+import asyncio
+import inspect
+import time
+from typing import List, Optional, Any, Mapping, Tuple
+
+from pyconfita.backend.backend import Backend
+from pyconfita.pyconfita import Confita
+from pyconfita.schema import Schema, get_key_variants, has_nested
+from pyconfita.snapshot import Snapshot
+from pyconfita.tracing_interface import OUTCOME, batch_outcome
+
+
+async def _call(fn, *args, **kwargs) -> Any:
+    """
+    Call fn, awaiting the result for asynchronous backends. Reads of
+    synchronous backends run inline.
+    """
+    res = fn(*args, **kwargs)
+    if inspect.isawaitable(res):
+        res = await res
+    return res
+
+
+class AsyncConfita(Confita):
+    """
+    Confita for asyncio applications.
+
+    Backends may be synchronous or asynchronous (e.g. AsyncVaultBackend),
+    with the same precedence as Confita: the last not None value in order of
+    the list of backends. Asynchronous backends are queried concurrently.
+    Synchronous backends are read inline, on the event loop: they are meant
+    to be in-memory (dict, environment, file, string). Use AsyncVaultBackend
+    rather than VaultBackend, whose reads would block the event loop.
+    """
+
+    def _check_backend(self, bk: Backend) -> None:
+        """
+        Synchronous and asynchronous backends are both supported.
+        """
+
+    async def get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key in all the backends, asynchronous ones
+        concurrently.
+        Returns the last not None value found in order of the list of
+        backends. Returns None if not found.
+
+        :param key:
+        :param kwargs:
+        :return:
+        """
+        if not self.metrics.enabled and not self.tracer.enabled:
+            return await self._get_cached(key, **kwargs)
+
+        with self._start_span("pyconfita.get", key, kwargs) as span:
+            start = time.perf_counter()
+            _value = await self._get_cached(key, **kwargs)
+            if self.metrics.enabled:
+                self.metrics.observe(
+                    "pyconfita_get_seconds", time.perf_counter() - start
+                )
+            span.set_attribute(OUTCOME, "miss" if _value is None else "hit")
+        return _value
+
+    async def _get_cached(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key from cache if enabled, else from backends.
+        """
+        if not self.enable_cache:
+            return await self._get(key, **kwargs)
+
+        epoch = self._cache_epoch
+        variant = self._get_cache_variant(**kwargs)
+        generations = self._get_generations()
+        entry = self._lookup_cache(key, variant, generations, kwargs)
+        if self.metrics.enabled:
+            self._record_cache_request(hit=entry is not None)
+        if entry is None:
+            cacheable = [bk for bk in self.backends if bk.cacheable]
+            _value, winner = await self._resolve(key, cacheable, **kwargs)
+            index = -1 if winner is None else self.backends.index(winner)
+            self._set_cache_entry(key, variant, (generations, _value, index), epoch)
+        else:
+            _, _value, index = entry
+            winner = None
+
+        # Live backends after the cached winner take precedence
+        live = [bk for bk in self.backends[index + 1 :] if not bk.cacheable]
+        if live:
+            live_value, live_winner = await self._resolve(key, live, **kwargs)
+            if live_value is not None:
+                _value, winner = live_value, live_winner
+        if self.metrics.enabled and winner is not None:
+            self._record_wins({key: winner.name})
+        return _value
+
+    async def _read(self, bk: Backend, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key in one backend.
+        """
+        if self.case_sensitive:
+            return await _call(bk.get, key, **kwargs)
+
+        if bk.has_case_insensitive_index:
+            return bk.get_case_insensitive(key, **kwargs)
+
+        # Try reading with casing variations on key
+        for variant in get_key_variants(key):
+            _value = await _call(bk.get, variant, **kwargs)
+            if _value is not None:
+                return _value
+        return None
+
+    async def _read_traced(self, bk: Backend, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key in one backend, in a span.
+        """
+        with self._start_span("pyconfita.backend.get", key, kwargs, bk) as span:
+            _value = await self._read(bk, key, **kwargs)
+            span.set_attribute(OUTCOME, "miss" if _value is None else "hit")
+        return _value
+
+    async def _trace_read(
+        self, span_name: str, bk: Backend, keys: Mapping, read, *args, **kwargs
+    ) -> dict:
+        """
+        Returns read(*args, **kwargs), a read of keys in backend bk, awaited
+        if needed, in a span if tracing is enabled.
+        """
+        if not self.tracer.enabled:
+            return await _call(read, *args, **kwargs)
+        with self._start_span(span_name, list(keys), kwargs, bk) as span:
+            _values = await _call(read, *args, **kwargs)
+            found = sum(v is not None for v in _values.values())
+            span.set_attribute(OUTCOME, batch_outcome(len(keys), found))
+        return _values
+
+    async def _get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key in all the backends, bypassing the cache.
+
+        :param key:
+        :param kwargs:
+        :return:
+        """
+        _value, winner = await self._resolve(key, self.backends, **kwargs)
+        if self.metrics.enabled and winner is not None:
+            self._record_wins({key: winner.name})
+        return _value
+
+    async def _resolve(
+        self, key: str, backends: List[Backend], **kwargs
+    ) -> Tuple[Optional[Any], Optional[Backend]]:
+        """
+        Read the value at key in backends, asynchronous ones concurrently
+        (synchronous ones inline). Returns the last not
+        None value found in order of backends, and the backend it was read
+        from (None if not found).
+        """
+        read = self._read_traced if self.tracer.enabled else self._read
+        _all_values = await asyncio.gather(
+            *(read(bk, key, **kwargs) for bk in backends)
+        )
+        _value = None
+        winner = None
+        for bk, tmp_value in zip(backends, _all_values):
+            if tmp_value is not None:
+                _value = tmp_value
+                winner = bk
+
+        if self.metrics.enabled:
+            for bk, tmp_value in zip(backends, _all_values):
+                self._record_lookups(bk, 1, tmp_value is not None)
+
+        if self.logger.is_enabled("debug"):
+            for bk, tmp_value in zip(backends, _all_values):
+                self.logger.log(
+                    **{
+                        "level": "debug",
+                        "message": {"message": f"{bk.name} reads {key} = {tmp_value}"},
+                    }
+                )
+            self._log_values(key, list(_all_values), _value)
+        return _value, winner
+
+    async def get_struct(self, schema: dict, **kwargs) -> Mapping:
+        """
+        Load all values defined in schema in a struct (dict) with identical
+        backend precedence used in get. Asynchronous backends are queried
+        concurrently, unless short-circuit resolution is enabled.
+        """
+        if not self.metrics.enabled and not self.tracer.enabled:
+            return await self._get_struct(schema, **kwargs)
+
+        with self._start_span("pyconfita.get_struct", list(schema), kwargs) as span:
+            start = time.perf_counter()
+            _struct = await self._get_struct(schema, **kwargs)
+            if self.metrics.enabled:
+                self.metrics.observe(
+                    "pyconfita_get_struct_seconds", time.perf_counter() - start
+                )
+            found = sum(v is not None for v in _struct.values())
+            span.set_attribute(OUTCOME, batch_outcome(len(_struct), found))
+        return _struct
+
+    async def snapshot(self, schema: dict, **kwargs) -> Snapshot:
+        """
+        Resolve all values defined in schema once, as get_struct, in a
+        read-only, hashable Snapshot.
+        """
+        version = next(self._snapshot_versions)
+        start = time.perf_counter()
+        _struct = await self.get_struct(schema, **kwargs)
+        return Snapshot(
+            _struct, version=version, build_seconds=time.perf_counter() - start
+        )
+
+    def refresher(self, schema: dict, interval: float = 60.0, on_swap=None, **kwargs):
+        raise Exception(
+            "Snapshot refresher is not supported by AsyncConfita, use Confita"
+        )
+
+    async def _get_struct(self, schema: dict, **kwargs) -> Mapping:
+        if isinstance(schema, Schema):
+            return schema.build(await self._get_many(schema, **kwargs))
+
+        if self.case_insensitive_struct or has_nested(schema):
+            compiled = Schema(schema)
+            return compiled.build(await self._get_many(compiled, **kwargs)).as_dict()
+
+        if self.short_circuit:
+            return await self._get_struct_short_circuit(schema, **kwargs)
+
+        track = self.metrics.enabled
+        winners = {}
+        _struct = {k: None for k in schema.keys()}
+        tmp_structs = await asyncio.gather(
+            *(
+                self._trace_read(
+                    "pyconfita.backend.get_struct",
+                    bk,
+                    schema,
+                    bk.get_struct,
+                    schema,
+                    **kwargs,
+                )
+                for bk in self.backends
+            )
+        )
+        for bk, tmp_struct in zip(self.backends, tmp_structs):
+            found = 0
+            for k, v in tmp_struct.items():
+                if v is not None:
+                    _struct[k] = v
+                    found += 1
+                    if track:
+                        winners[k] = bk.name
+            if track:
+                self._record_lookups(bk, len(schema), found)
+
+        if track:
+            self._record_wins(winners)
+        return _struct
+
+    async def _get_struct_short_circuit(self, schema: dict, **kwargs) -> dict:
+        """
+        Load all values defined in schema walking backends from the highest
+        precedence (last) to the lowest one (first), only requesting keys
+        still unresolved.
+        """
+        track = self.metrics.enabled
+        winners = {}
+        _struct = {k: None for k in schema.keys()}
+        unresolved = dict(schema)
+        for bk in reversed(self.backends):
+            if not unresolved:
+                break
+            requested = len(unresolved)
+            tmp_values = await self._trace_read(
+                "pyconfita.backend.get_many",
+                bk,
+                unresolved,
+                bk.get_many,
+                unresolved,
+                **kwargs,
+            )
+            for k, v in tmp_values.items():
+                if v is not None:
+                    _struct[k] = v
+                    unresolved.pop(k, None)
+                    if track:
+                        winners[k] = bk.name
+            if track:
+                self._record_lookups(bk, requested, requested - len(unresolved))
+
+        if track:
+            self._record_wins(winners)
+        return _struct
+
+    async def _read_many(self, bk: Backend, schema: Schema, **kwargs) -> dict:
+        """
+        Read values of compiled schema found in one backend, with casing
+        variations of keys if case_insensitive_struct is enabled.
+        """
+        if not self.case_insensitive_struct:
+            return await _call(bk.get_many, schema, **kwargs)
+        if bk.has_case_insensitive_index:
+            return bk.get_many_case_insensitive(schema, **kwargs)
+        _values = await _call(bk.get_many, schema.variant_schema, **kwargs)
+        return schema.pick_variants(_values)
+
+    async def _get_many(self, schema: Schema, **kwargs) -> dict:
+        """
+        Resolve values of compiled schema with backend precedence, returning
+        only the keys found in at least one backend.
+        """
+        track = self.metrics.enabled
+        winners = {}
+        _values = {}
+        if self.short_circuit:
+            for bk in reversed(self.backends):
+                pending = schema.subset(k for k in schema if k not in _values)
+                if not pending:
+                    break
+                tmp_values = await self._trace_read(
+                    "pyconfita.backend.get_many",
+                    bk,
+                    pending,
+                    self._read_many,
+                    bk,
+                    pending,
+                    **kwargs,
+                )
+                for k, v in tmp_values.items():
+                    _values.setdefault(k, v)
+                if track:
+                    self._record_lookups(bk, len(pending), len(tmp_values))
+                    winners.update(dict.fromkeys(tmp_values, bk.name))
+        else:
+            tmp_values = await asyncio.gather(
+                *(
+                    self._trace_read(
+                        "pyconfita.backend.get_many",
+                        bk,
+                        schema,
+                        self._read_many,
+                        bk,
+                        schema,
+                        **kwargs,
+                    )
+                    for bk in self.backends
+                )
+            )
+            for bk, tmp in zip(self.backends, tmp_values):
+                _values.update(tmp)
+                if track:
+                    self._record_lookups(bk, len(schema), len(tmp))
+                    winners.update(dict.fromkeys(tmp, bk.name))
+
+        if track:
+            self._record_wins(winners)
+        return _values
@@ -1,12 +1,78 @@
-from typing import Any, Optional
+import threading
+from typing import Any, Optional, Dict, Mapping, Tuple
 
+from pyconfita.fork import register_after_fork
+from pyconfita.metrics_interface import MetricsInterface, NOOP_METRICS
+from pyconfita.tracing_interface import TracerInterface, NOOP_TRACER
+from pyconfita.schema import Schema, get_caster, get_key_variants, has_nested
 
-class Backend:
+
+class _BaseBackend:
     """
-    Base class representing a key-value store/backend.
+    Attributes and helpers shared by synchronous and asynchronous backends.
     """
 
     name: str
+    generation: int = 0
+    # False for live backends, whose values may change without a new
+    # generation (e.g. environment, Vault): Confita does not cache their
+    # values, and reads them on each get
+    cacheable: bool = True
+    # True if get_case_insensitive is backed by an index (one lookup)
+    has_case_insensitive_index: bool = False
+    # Metrics interface, set by Confita if not set by the backend
+    metrics: MetricsInterface = NOOP_METRICS
+    # Tracer interface, set by Confita if not set by the backend
+    tracer: TracerInterface = NOOP_TRACER
+
+    def get_generation(self) -> int:
+        """
+        Returns the generation counter of the backend.
+        The counter is incremented each time the content of the backend
+        changes, so that values resolved from an older generation can be
+        discarded by callers.
+        """
+        return self.generation
+
+    def _cast(self, v: Any, **kwargs):
+        """
+        Convert value into type as defined by kwargs['type'] parameter.
+        Supported types: [str, bool, float, int].
+        Default conversion type is `str`.
+        If value is None, returns None.
+        """
+        # Default expected type is string
+        _type = kwargs.get("type", str)
+        if "v_type" in kwargs:
+            _type = kwargs.get("v_type", str)
+        return get_caster(_type)(v)
+
+    def _get_many_from(self, kv_store: dict, keys: Dict[str, type]) -> dict:
+        """
+        Returns values of keys found in kv_store (not None values), with type
+        conversion.
+        """
+        _values = {}
+        if isinstance(keys, Schema):
+            # Precomputed casters
+            for key, caster in keys.casters.items():
+                _value = kv_store.get(key)
+                if _value is not None:
+                    _values[key] = caster(_value)
+            return _values
+
+        for key, _type in keys.items():
+            _value = kv_store.get(key)
+            if _value is not None:
+                _values[key] = self._cast(_value, type=_type)
+
+        return _values
+
+
+class Backend(_BaseBackend):
+    """
+    Base class representing a key-value store/backend.
+    """
 
     def get(self, key: str, **kwargs) -> Optional[Any]:
         """
@@ -15,6 +81,18 @@ class Backend:
         """
         return self._cast(self._get(key, **kwargs), **kwargs)
 
+    def get_case_insensitive(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Returns value found at key in key-value backend, ignoring casing.
+        Defaults to reading casing variations of key in order (key, uppercased
+        key, lowercased key). Only None values are considered as not found.
+        """
+        for variant in get_key_variants(key):
+            _value = self.get(variant, **kwargs)
+            if _value is not None:
+                return _value
+        return None
+
     def _get(self, key: str, **kwargs) -> Optional[Any]:
         """
         Returns raw value found at key in key-value backend.
@@ -22,53 +100,293 @@ class Backend:
         """
         return NotImplementedError
 
-    def _cast(self, v: Any, **kwargs):
+    def get_struct(self, schema: Dict[str, type], **kwargs) -> Mapping:
         """
-        Convert value into type as defined by kwargs['type'] parameter.
-        Supported types: [str, bool, float, int].
-        Default conversion type is `str`.
-        If value is None, returns None.
+        Load all values defined in schema in a struct (dict) with type
+        underlyong conversion.
+        Schema is a dict (key -> type, or key -> nested dict schema) or a
+        compiled Schema, in which case the returned struct is a StructResult
+        with defaults applied.
         """
-        # Default expected type is string
-        _type = kwargs.get("type", str)
-        if "v_type" in kwargs:
-            _type = kwargs.get("v_type", str)
-        if _type not in [str, bool, float, int]:
-            raise Exception(
-                "Unsupported type conversion. Support for str, bool, float, int."
-            )
-
-        if v is None:
-            return v
-
-        if isinstance(v, _type):
-            # Right type
-            return v
-
-        # Mismatch: value is not None and type is incorrect
-        if isinstance(v, str):
-            if _type == bool:
-                v = True if "t" in v.lower() else False
-                return v
-            if _type == int:
-                v = int(v)
-                return v
-            if _type == float:
-                v = float(v)
-                return v
-
-        else:
-            raise Exception(
-                "Type conversion cannot be achieved when variable is not a string"
-            )
-
-    def get_struct(self, schema: dict, **kwargs) -> dict:
+        if isinstance(schema, Schema):
+            return schema.build(self.get_many(schema, **kwargs))
+
+        if has_nested(schema):
+            schema = Schema(schema)
+            return schema.build(self.get_many(schema, **kwargs)).as_dict()
+
+        _struct = {}
+        for key, _type in schema.items():
+            _struct[key] = self.get(key, type=_type, **kwargs)
+
+        return _struct
+
+    def get_many(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys (mapping key to type, as in a schema) with type
+        conversion. Unlike get_struct, returns only the keys found in the
+        backend (not None values).
+        """
+        _values = {}
+        if isinstance(keys, Schema):
+            # Precomputed casters
+            for key, caster in keys.casters.items():
+                _value = self._get(key, **kwargs)
+                if _value is not None:
+                    _values[key] = caster(_value)
+            return _values
+
+        for key, _type in keys.items():
+            _value = self.get(key, type=_type, **kwargs)
+            if _value is not None:
+                _values[key] = _value
+
+        return _values
+
+
+class AsyncBackend(_BaseBackend):
+    """
+    Base class representing an asynchronous key-value store/backend: reads
+    are coroutines, awaited by AsyncConfita. Not supported by Confita.
+    """
+
+    async def get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Returns value found at key in key-value backend.
+        Type conversion is handled by _cast method.
+        """
+        return self._cast(await self._get(key, **kwargs), **kwargs)
+
+    async def get_case_insensitive(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Returns value found at key in key-value backend, ignoring casing, by
+        reading casing variations of key in order.
+        """
+        for variant in get_key_variants(key):
+            _value = await self.get(variant, **kwargs)
+            if _value is not None:
+                return _value
+        return None
+
+    async def _get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Returns raw value found at key in key-value backend.
+        Defaults to None if key not found in store.
+        """
+        raise NotImplementedError
+
+    async def get_struct(self, schema: Dict[str, type], **kwargs) -> Mapping:
         """
         Load all values defined in schema in a struct (dict) with type
-        underlyong conversion
+        conversion, as Backend.get_struct.
         """
+        if isinstance(schema, Schema):
+            return schema.build(await self.get_many(schema, **kwargs))
+
+        if has_nested(schema):
+            schema = Schema(schema)
+            return schema.build(await self.get_many(schema, **kwargs)).as_dict()
+
         _struct = {}
         for key, _type in schema.items():
-            _struct[key] = self.get(key, type=_type, **kwargs)
+            _struct[key] = await self.get(key, type=_type, **kwargs)
 
         return _struct
+
+    async def get_many(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys found in the backend (not None values) with type
+        conversion.
+        """
+        _values = {}
+        for key, _type in keys.items():
+            _value = await self.get(key, type=_type, **kwargs)
+            if _value is not None:
+                _values[key] = _value
+
+        return _values
+
+
+def _flatten(kv: dict) -> dict:
+    """
+    Returns the flattened index of kv: dotted path -> value, for all the
+    keys of kv and of nested dicts (e.g. "db.primary.host").
+    """
+    flat = {}
+    stack = [("", kv)]
+    while stack:
+        prefix, mapping = stack.pop()
+        for k, v in mapping.items():
+            path = f"{prefix}{k}"
+            flat[path] = v
+            if isinstance(v, dict):
+                stack.append((f"{path}.", v))
+    return flat
+
+
+def _casefold(kv: dict) -> dict:
+    """
+    Returns the casefolded key index of kv: casefolded key -> value. The
+    first key of the dict wins when several keys only differ by casing.
+    """
+    index = {}
+    for k, v in kv.items():
+        if isinstance(k, str):
+            index.setdefault(k.casefold(), v)
+    return index
+
+
+class KVBackend(Backend):
+    """
+    Base class of backends loading keys from an in-memory dict (dict, file,
+    string).
+
+    Keys of nested dicts are read with dotted paths (e.g. "db.primary.host").
+    Dotted paths are resolved with a flattened index (path -> value), built
+    once, on first lookup of a dotted path not found as is.
+    A casefolded key index is built once, on first case-insensitive lookup,
+    so that it costs one dict lookup whatever the casing of keys. Setting kv
+    replaces the dict, drops the indexes and increments the generation.
+
+    Thread-safe, copy-on-write: the dict is never modified in place, reads
+    take no lock and see one loaded dict. Writers (setting kv, update) are
+    serialized, so that no generation increment is lost.
+
+    Indexes are tied to the identity of the dict: a dict modified in place
+    by the caller is not re-indexed, and case-insensitive and dotted-path
+    lookups may return previous values. Use update, or set kv again (the
+    same dict is re-indexed).
+    """
+
+    has_case_insensitive_index = True
+    _kv: dict = {}
+    # (source dict, index built from this dict)
+    _kv_flat: Optional[Tuple[dict, dict]] = None
+    _kv_casefold: Optional[Tuple[dict, dict]] = None
+    _kv_flat_casefold: Optional[Tuple[dict, dict]] = None
+
+    @property
+    def kv(self) -> dict:
+        return self._kv
+
+    @kv.setter
+    def kv(self, kv: dict) -> None:
+        with self._get_write_lock():
+            self._set_kv(kv)
+
+    def _set_kv(self, kv: dict) -> None:
+        # One reference assignment: concurrent readers see the previous or
+        # the new dict, never a partially loaded one. Indexes remember their
+        # source dict, and are rebuilt for the new one.
+        self._kv = kv
+        self._kv_flat = None
+        self._kv_casefold = None
+        self._kv_flat_casefold = None
+        self.generation += 1
+
+    def _get_write_lock(self) -> threading.Lock:
+        # Created on first write, subclasses do not call an initializer.
+        # dict.setdefault is atomic: concurrent first writers get one lock.
+        lock = self.__dict__.get("_write_lock")
+        if lock is None:
+            lock = self.__dict__.setdefault("_write_lock", threading.Lock())
+            register_after_fork(self)
+        return lock
+
+    def _after_fork(self) -> None:
+        """
+        Reset the write lock in a forked child, where it may have been held
+        by a thread of the parent.
+        """
+        self._write_lock = threading.Lock()
+
+    def update(self, values: dict) -> None:
+        """
+        Set values (key -> value) in a copy of the dict, and swap it in, as
+        setting kv. Concurrent readers keep reading the previous dict
+        meanwhile.
+        """
+        with self._get_write_lock():
+            kv = dict(self._kv)
+            kv.update(values)
+            self._set_kv(kv)
+
+    def _get_flat_index(self, kv: dict) -> dict:
+        cached = self._kv_flat
+        if cached is not None and cached[0] is kv:
+            return cached[1]
+        index = _flatten(kv)
+        self._kv_flat = (kv, index)
+        return index
+
+    def _get_casefold_index(self, kv: dict) -> dict:
+        cached = self._kv_casefold
+        if cached is not None and cached[0] is kv:
+            return cached[1]
+        index = _casefold(kv)
+        self._kv_casefold = (kv, index)
+        return index
+
+    def _get_flat_casefold_index(self, kv: dict) -> dict:
+        flat = self._get_flat_index(kv)
+        cached = self._kv_flat_casefold
+        if cached is not None and cached[0] is flat:
+            return cached[1]
+        index = _casefold(flat)
+        self._kv_flat_casefold = (flat, index)
+        return index
+
+    def _lookup(self, kv: dict, key: str) -> Optional[Any]:
+        """
+        Returns raw value at key in kv, else at dotted path key.
+        """
+        _value = kv.get(key)
+        if _value is None and "." in key:
+            _value = self._get_flat_index(kv).get(key)
+        return _value
+
+    def _get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+
+        :param key: key, or dotted path of a nested key
+        :param kwargs:
+        :return:
+        """
+        # Inlined _lookup: hot path
+        kv = self._kv
+        _value = kv.get(key)
+        if _value is None and "." in key:
+            _value = self._get_flat_index(kv).get(key)
+        return _value
+
+    def _get_case_insensitive(self, key: str) -> Optional[Any]:
+        """
+        Returns raw value at key, with exact casing first, else from the
+        casefolded key index.
+        """
+        return self._lookup_case_insensitive(self._kv, key)
+
+    def _lookup_case_insensitive(self, kv: dict, key: str) -> Optional[Any]:
+        _value = self._lookup(kv, key)
+        if _value is None:
+            if "." in key:
+                index = self._get_flat_casefold_index(kv)
+            else:
+                index = self._get_casefold_index(kv)
+            _value = index.get(key.casefold())
+        return _value
+
+    def get_case_insensitive(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Returns value found at key, ignoring casing, with one index lookup.
+        """
+        return self._cast(self._get_case_insensitive(key), **kwargs)
+
+    def get_many_case_insensitive(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys found in the dict, ignoring casing, with type
+        conversion.
+        """
+        kv = self._kv
+        _raw_values = {key: self._lookup_case_insensitive(kv, key) for key in keys}
+        return self._get_many_from(_raw_values, keys)
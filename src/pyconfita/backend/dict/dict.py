@@ -1,11 +1,12 @@
-from typing import Optional, Any
-
-from pyconfita.backend.backend import Backend as _Backend
+from pyconfita.backend.backend import KVBackend as _Backend
 
 
 class Backend(_Backend):
     """
     Load key from dict
+
+    The dict is not copied: do not modify it in place after creating the
+    backend, use update or set kv (see KVBackend).
     """
 
     name = "dict"
@@ -17,12 +18,3 @@ class Backend(_Backend):
         :param kwargs:
         """
         self.kv = kv
-
-    def _get(self, key: str, **kwargs) -> Optional[Any]:
-        """
-
-        :param key:
-        :param kwargs:
-        :return:
-        """
-        return self.kv.get(key)
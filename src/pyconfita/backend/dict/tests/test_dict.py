@@ -13,3 +13,104 @@ def test_backend():
     # Key not found
     _val = bk.get("UNKNOWN")
     assert _val is None
+
+
+def test_get_many():
+    """Test backend get_many only returns found keys"""
+    d = {"lower": "cased", "int": "10", "none": None}
+    bk = Backend(d)
+
+    _values = bk.get_many({"lower": str, "int": int, "none": str, "UNKNOWN": str})
+    assert _values == {"lower": "cased", "int": 10}
+
+
+def test_get_case_insensitive():
+    """Test case-insensitive get with the casefolded key index"""
+    d = {"DbHost": "localhost", "PORT": "0", "debug": False}
+    bk = Backend(d)
+
+    assert bk.get_case_insensitive("DbHost") == "localhost"
+    assert bk.get_case_insensitive("dbhost") == "localhost"
+    assert bk.get_case_insensitive("DBHOST") == "localhost"
+    assert bk.get_case_insensitive("port", type=int) == 0
+    assert bk.get_case_insensitive("DEBUG", type=bool) is False
+    assert bk.get_case_insensitive("UNKNOWN") is None
+
+    assert bk.get_many_case_insensitive({"dbhost": str, "Port": int}) == {
+        "dbhost": "localhost",
+        "Port": 0,
+    }
+
+
+def test_set_kv_reindexes():
+    """Test replacing kv drops the casefolded key index and bumps generation"""
+    bk = Backend({"DbHost": "localhost"})
+    generation = bk.get_generation()
+    assert bk.get_case_insensitive("dbhost") == "localhost"
+
+    bk.kv = {"DBHOST": "remote"}
+    assert bk.get_generation() == generation + 1
+    assert bk.get_case_insensitive("dbhost") == "remote"
+
+
+def test_update():
+    """Test update swaps in an updated copy of kv"""
+    kv = {"DbHost": "localhost", "Port": "5432"}
+    bk = Backend(kv)
+    generation = bk.get_generation()
+    assert bk.get_case_insensitive("dbhost") == "localhost"
+
+    bk.update({"DbHost": "remote"})
+    assert bk.get_generation() == generation + 1
+    assert bk.get_case_insensitive("dbhost") == "remote"
+    assert bk.get("Port") == "5432"
+    assert kv["DbHost"] == "localhost"
+
+
+def test_get_dotted_path():
+    """Test get of nested keys with dotted paths"""
+    d = {
+        "db": {"primary": {"host": "localhost", "port": "5432"}},
+        "db.replica": "literal",
+        "flat": "value",
+    }
+    bk = Backend(d)
+
+    # Flat keys do not build the flattened index
+    assert bk.get("flat") == "value"
+    assert bk.get("UNKNOWN") is None
+    assert bk._kv_flat is None
+
+    assert bk.get("db.primary.host") == "localhost"
+    assert bk.get("db.primary.port", type=int) == 5432
+    assert bk.get("db.primary.unknown") is None
+    # Keys containing dots are read as is first
+    assert bk.get("db.replica") == "literal"
+
+    # Case-insensitive dotted paths
+    assert bk.get_case_insensitive("DB.Primary.HOST") == "localhost"
+    assert bk.get_many_case_insensitive({"db.primary.PORT": int}) == {
+        "db.primary.PORT": 5432
+    }
+
+    # Setting kv drops the flattened index
+    bk.kv = {"db": {"primary": {"host": "remote"}}}
+    assert bk.get("db.primary.host") == "remote"
+
+
+def test_modified_in_place():
+    """Test a dict modified in place is re-indexed when kv is set again"""
+    kv = {"DbHost": "localhost", "db": {"port": "5432"}}
+    bk = Backend(kv)
+    assert bk.get_case_insensitive("dbhost") == "localhost"
+    assert bk.get("db.port") == "5432"
+
+    kv["DbHost"] = "remote"
+    kv["db"] = {"port": "5433"}
+    # Indexes are tied to the dict, not to its content
+    assert bk.get_case_insensitive("dbhost") == "localhost"
+    assert bk.get("db.port") == "5432"
+
+    bk.kv = kv
+    assert bk.get_case_insensitive("dbhost") == "remote"
+    assert bk.get("db.port") == "5433"
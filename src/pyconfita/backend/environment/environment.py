@@ -1,16 +1,66 @@
 import os
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 
-from pyconfita.backend.backend import Backend as _Backend
+from pyconfita.backend.backend import Backend as _BaseBackend
+from pyconfita.backend.backend import KVBackend as _Backend
 
 
 class Backend(_Backend):
     """
     Load key from environment (environment variable)
+
+    By default, each lookup reads os.environ. In snapshot mode, the
+    environment variables are copied once into a plain dict, read with one
+    dict lookup (casefolded key index included), until refresh is called.
     """
 
     name: str = "environment"
 
+    def __init__(
+        self, snapshot: bool = False, prefix: Optional[str] = None, *args, **kwargs
+    ):
+        """
+
+        :param snapshot: bool, True to copy the environment once, see refresh
+        :param prefix: prefix of the environment variables to read, stripped
+        from keys (e.g. with prefix "APP_", key "PORT" reads APP_PORT)
+        :param args:
+        :param kwargs:
+        """
+        self.snapshot = snapshot
+        self.prefix = prefix or ""
+        self.has_case_insensitive_index = snapshot
+        # Without snapshot, os.environ is read live
+        self.cacheable = snapshot
+        if self.snapshot:
+            self.kv = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        """
+        Returns the environment variables starting with prefix, prefix
+        stripped.
+        """
+        environ = os.environ.copy()
+        if not self.prefix:
+            return environ
+        n = len(self.prefix)
+        return {k[n:]: v for k, v in environ.items() if k.startswith(self.prefix)}
+
+    def refresh(self) -> bool:
+        """
+        Copy the environment again in snapshot mode. The generation is
+        incremented only if the environment changed.
+
+        :return: True if the environment changed
+        """
+        if not self.snapshot:
+            return False
+        kv = self._load()
+        if kv == self._kv:
+            return False
+        self.kv = kv
+        return True
+
     def _get(self, key: str, **kwargs) -> Optional[Any]:
         """
 
@@ -18,4 +68,20 @@ class Backend(_Backend):
         :param kwargs:
         :return:
         """
-        return os.environ.get(key)
+        if self.snapshot:
+            return self._kv.get(key)
+        return os.environ.get(self.prefix + key)
+
+    def get_case_insensitive(self, key: str, **kwargs) -> Optional[Any]:
+        if self.snapshot:
+            return super().get_case_insensitive(key, **kwargs)
+        return _BaseBackend.get_case_insensitive(self, key, **kwargs)
+
+    def get_many(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys found in the environment with type conversion, in
+        one pass over the snapshot in snapshot mode.
+        """
+        if self.snapshot:
+            return self._get_many_from(self._kv, keys)
+        return super().get_many(keys, **kwargs)
@@ -1,4 +1,5 @@
 import os
+from unittest import mock
 
 from pyconfita.backend.environment.environment import Backend
 
@@ -20,3 +21,48 @@ def test_backend():
     del os.environ[env_var]
     _val = bk.get(env_var)
     assert _val is None
+
+
+def test_backend_prefix():
+    """Test backend get with prefix"""
+    bk = Backend(prefix="PYCONFITA_TEST_")
+    with mock.patch.dict(os.environ, {"PYCONFITA_TEST_PORT": "8080"}):
+        assert bk.get("PORT", type=int) == 8080
+        assert bk.get("PYCONFITA_TEST_PORT") is None
+
+
+def test_backend_snapshot():
+    """Test backend get in snapshot mode. Ensure the environment is read once
+    until refresh"""
+    env = {"PYCONFITA_TEST_PORT": "8080", "PYCONFITA_TEST_DbHost": "localhost"}
+    with mock.patch.dict(os.environ, env):
+        bk = Backend(snapshot=True, prefix="PYCONFITA_TEST_")
+        assert bk.kv == {"PORT": "8080", "DbHost": "localhost"}
+        generation = bk.get_generation()
+
+        os.environ["PYCONFITA_TEST_PORT"] = "9090"
+        assert bk.get("PORT", type=int) == 8080
+        assert bk.get_case_insensitive("dbhost") == "localhost"
+        assert bk.get_many({"PORT": int, "DBHOST": str, "dbhost": str}) == {
+            "PORT": 8080
+        }
+        assert bk.get_many_case_insensitive({"port": int, "DBHOST": str}) == {
+            "port": 8080,
+            "DBHOST": "localhost",
+        }
+
+        assert bk.refresh()
+        assert bk.get_generation() == generation + 1
+        assert bk.get("PORT", type=int) == 9090
+
+        # Unchanged environment
+        assert not bk.refresh()
+        assert bk.get_generation() == generation + 1
+
+
+def test_backend_case_insensitive():
+    """Test backend case-insensitive get without snapshot"""
+    bk = Backend()
+    assert not bk.has_case_insensitive_index
+    with mock.patch.dict(os.environ, {"PYCONFITA_TEST_KEY": "value"}):
+        assert bk.get_case_insensitive("pyconfita_test_key") == "value"
@@ -1,55 +1,171 @@
 import os
-from typing import Optional, Any
+import threading
+import time
+from typing import Optional, Any, Dict, Tuple
 
-import yaml
-import json
-
-from pyconfita.backend.backend import Backend as _Backend
+from pyconfita.backend.backend import KVBackend as _Backend
+from pyconfita.backend.parsing import EXTENSIONS, check_format, parse
+from pyconfita.fork import register_after_fork
 
 
 class Backend(_Backend):
     """
     Load key from file (YAML or JSON)
+
+    With reload enabled, the file is checked for changes (mtime, size, inode)
+    at most once every reload_interval seconds, on reads and on
+    get_generation. It is parsed again only when it changed, and the new dict
+    is swapped in at once. The generation is incremented on each reload.
     """
 
     name = "file"
 
-    def __init__(self, file_path: str, *args, **kwargs):
+    def __init__(
+        self,
+        file_path: str,
+        format: str = "auto",
+        reload: bool = False,
+        reload_interval: float = 1.0,
+        *args,
+        **kwargs,
+    ):
         """
+        The file is read once. Its format is given by format, else by the
+        file extension (.json, .yaml, .yml), else sniffed from its content.
 
+        :param file_path: path to the YAML or JSON file
+        :param format: one of "auto", "json", "yaml". Defaults to "auto".
+        With an explicit format, raises if the file cannot be parsed
+        :param reload: bool, True to reload the file when it changes
+        :param reload_interval: minimum time between two checks of the file,
+        in seconds. Defaults to 1 second
         :param args:
         :param kwargs:
         """
-        _kv = None
-
         if not os.path.isfile(file_path):
             raise Exception("File not found")
 
-        try:
-            # Try as JSON
-            with open(file_path, "r") as f:
-                _kv = json.loads(f.read())
-        except Exception as e:
-            pass
-        if _kv is None:
-            try:
-                # Try as YAML
-                with open(file_path, "r") as f:
-                    raw_yml = "".join(f.readlines())
-                    _kv = yaml.safe_load(raw_yml)
-            except Exception as e:
-                pass
+        self.file_path = file_path
+        self.format = check_format(format)
+        self.reload = reload
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._signature = self._stat()
+        self.kv = self._load()
+        if self.reload:
+            register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """
+        Reset the reload and write locks in a forked child, where they may
+        have been held by a thread of the parent.
+        """
+        super()._after_fork()
+        self._reload_lock = threading.Lock()
 
+    def _get_format(self) -> str:
+        """
+        Returns the format of the file: explicit format, else from extension
+        """
+        if self.format != "auto":
+            return self.format
+        _, ext = os.path.splitext(self.file_path)
+        return EXTENSIONS.get(ext.lower(), "auto")
+
+    def _load(self, strict: bool = False) -> dict:
+        """
+        Read the file once and parse it
+
+        :param strict: bool, True to raise if the file cannot be parsed as a
+        dict, whatever the format. Strict on an explicit format anyway
+        """
+        with open(self.file_path, "r") as f:
+            raw = f.read()
+
+        _kv = parse(raw, self._get_format(), strict=strict or self.format != "auto")
+        if strict and not isinstance(_kv, dict):
+            raise Exception(f"File {self.file_path} is not a dict")
         if _kv is None:
             _kv = {}
+        return _kv
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Returns the signature of the file (mtime, size, inode), None if it
+        cannot be stat'ed.
+        """
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
 
-        self.kv = _kv
+    def check_reload(self) -> bool:
+        """
+        Reload the file if reload is enabled, the last check is older than
+        reload_interval and the file changed.
+        A reload already running in another thread is not waited for: values
+        of the previous load are read meanwhile. If the file is removed, or
+        cannot be parsed as a dict (e.g. empty or half-written in place),
+        values of the previous load are kept, and the file is parsed again on
+        next check.
 
-    def _get(self, key: str, **kwargs) -> Optional[Any]:
+        :return: True if the file was reloaded
         """
+        if not self.reload:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False
 
-        :param key:
-        :param kwargs:
-        :return:
+        try:
+            self._checked_at = now
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return False
+            # Signature is taken before reading: a change while reading is
+            # detected on next check
+            previous, self._signature = self._signature, signature
+            try:
+                _kv = self._load(strict=True)
+            except Exception as e:
+                # Parsed again on next check, once the file is fully written
+                self._signature = previous
+                return False
+            self.kv = _kv
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def get_generation(self) -> int:
+        """
+        Returns the generation of the backend, reloading the file first if it
+        changed.
         """
-        return self.kv.get(key)
+        self.check_reload()
+        return self.generation
+
+    def _get(self, key: str, **kwargs) -> Optional[Any]:
+        self.check_reload()
+        return super()._get(key, **kwargs)
+
+    def _get_case_insensitive(self, key: str) -> Optional[Any]:
+        self.check_reload()
+        return super()._get_case_insensitive(key)
+
+    def get_many(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys found in the file with type conversion, all from
+        the same load.
+        """
+        self.check_reload()
+        kv = self._kv
+        _raw_values = {key: self._lookup(kv, key) for key in keys}
+        return self._get_many_from(_raw_values, keys)
+
+    def get_many_case_insensitive(self, keys: Dict[str, type], **kwargs) -> dict:
+        self.check_reload()
+        return super().get_many_case_insensitive(keys, **kwargs)
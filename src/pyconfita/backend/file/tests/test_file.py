@@ -1,4 +1,6 @@
 import os
+import threading
+from unittest import mock
 import pytest
 from pyconfita.backend.file.file import Backend
 
@@ -45,3 +47,150 @@ def test_backend_empty_json_file():
     bk = Backend(file_path)
 
     assert bk.get("bool") is None
+
+
+def test_backend_format(tmp_path):
+    """Test backend with explicit format, file extension and sniffed format"""
+    # YAML content, misleading extension: parsed with the other parser
+    file_path = tmp_path / "vars.json"
+    file_path.write_text("txt: world\nint: 10\n")
+    assert Backend(str(file_path)).get("int", type=int) == 10
+
+    # No known extension: sniffed content
+    file_path = tmp_path / "vars.conf"
+    file_path.write_text('  {"txt": "world"}')
+    assert Backend(str(file_path)).get("txt") == "world"
+    file_path.write_text("txt: world\n")
+    assert Backend(str(file_path)).get("txt") == "world"
+
+    # YAML flow mapping, sniffed as JSON
+    file_path.write_text("{txt: world}")
+    assert Backend(str(file_path)).get("txt") == "world"
+
+    # Explicit format
+    assert Backend(str(file_path), format="yaml").get("txt") == "world"
+    with pytest.raises(Exception):
+        Backend(str(file_path), format="json")
+    with pytest.raises(Exception):
+        Backend(str(file_path), format="toml")
+
+
+def test_backend_reads_file_once(tmp_path):
+    """Test backend opens the file once"""
+    file_path = tmp_path / "vars.yaml"
+    file_path.write_text("txt: world\n")
+    with mock.patch("builtins.open", side_effect=open) as mocked_open:
+        bk = Backend(str(file_path))
+    assert mocked_open.call_count == 1
+    assert bk.get("txt") == "world"
+
+
+def test_backend_reload(tmp_path):
+    """Test backend reload mode. Ensure the file is parsed again only when it
+    changed, and the generation is incremented on reload"""
+    file_path = tmp_path / "vars.yaml"
+    file_path.write_text("txt: hello\n")
+
+    # Reload disabled
+    bk = Backend(str(file_path))
+    file_path.write_text("txt: world!\n")
+    assert bk.get("txt") == "hello"
+
+    bk = Backend(str(file_path), reload=True, reload_interval=0)
+    generation = bk.get_generation()
+    with mock.patch.object(bk, "_load", wraps=bk._load) as mocked_load:
+        # Unchanged file
+        assert bk.get("txt") == "world!"
+        assert bk.get_generation() == generation
+        assert mocked_load.call_count == 0
+
+        # Changed file, new inode
+        new_path = tmp_path / "vars.yaml.new"
+        new_path.write_text("txt: hello\nint: 10\n")
+        os.replace(new_path, file_path)
+        assert bk.get_generation() == generation + 1
+        assert bk.get("txt") == "hello"
+        assert bk.get_many({"int": int}) == {"int": 10}
+        assert mocked_load.call_count == 1
+
+        # Removed file: previous values are kept
+        os.remove(file_path)
+        assert bk.get("txt") == "hello"
+        assert bk.get_generation() == generation + 1
+
+
+def test_backend_reload_half_written(tmp_path):
+    """Test backend reload mode with a file written in place. Ensure values of
+    the previous load are kept while the file cannot be parsed as a dict"""
+    file_path = tmp_path / "vars.yaml"
+    content = "txt: hello\nlist: [1, 2]\n"
+    file_path.write_text(content)
+    bk = Backend(str(file_path), reload=True, reload_interval=0)
+    generation = bk.get_generation()
+
+    # Truncated, then half-written: invalid YAML, then a scalar
+    for partial in ("", content[:18], content[:2]):
+        file_path.write_text(partial)
+        assert bk.get("txt") == "hello"
+        assert bk.get_generation() == generation
+
+    file_path.write_text(content.replace("hello", "world"))
+    assert bk.get("txt") == "world"
+    assert bk.get_generation() == generation + 1
+
+    # Same with a JSON file and sniffed format
+    file_path = tmp_path / "vars"
+    file_path.write_text('{"a": "0"}')
+    bk = Backend(str(file_path), reload=True, reload_interval=0)
+    file_path.write_text('{"a": "1", ')
+    assert bk.get("a") == "0"
+    file_path.write_text('{"a": "1"}')
+    assert bk.get("a") == "1"
+
+
+def test_backend_reload_interval(tmp_path):
+    """Test backend reload mode. Ensure the file is not checked more than once
+    per reload interval"""
+    file_path = tmp_path / "vars.yaml"
+    file_path.write_text("txt: hello\n")
+
+    bk = Backend(str(file_path), reload=True, reload_interval=3600)
+    file_path.write_text("txt: world!\n")
+    with mock.patch("os.stat") as mocked_stat:
+        assert bk.get("txt") == "hello"
+        assert mocked_stat.call_count == 0
+
+    bk._checked_at -= 3600
+    assert bk.get("txt") == "world!"
+
+
+def test_backend_reload_concurrent_readers(tmp_path):
+    """Test backend reload mode with concurrent readers. Ensure each struct is
+    read from one load of the file"""
+    file_path = tmp_path / "vars.json"
+    file_path.write_text('{"a": "0", "b": "0"}')
+    bk = Backend(str(file_path), reload=True, reload_interval=0)
+
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            _values = bk.get_many({"a": int, "b": int})
+            if _values["a"] != _values["b"]:
+                errors.append(_values)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(1, 50):
+        new_path = tmp_path / "vars.json.new"
+        new_path.write_text(f'{{"a": "{i}", "b": "{i}"}}')
+        os.replace(new_path, file_path)
+        bk.check_reload()
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert bk.get("a", type=int) == 49
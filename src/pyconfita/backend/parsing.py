@@ -0,0 +1,97 @@
+import json
+from typing import Any, Optional
+
+import yaml
+
+# Supported formats of serialized key-value stores
+FORMATS = ("auto", "json", "yaml")
+# File extension -> format
+EXTENSIONS = {".json": "json", ".yaml": "yaml", ".yml": "yaml"}
+
+# Number of first characters read to sniff the format
+_HEAD_SIZE = 64
+
+# LibYAML based loader if available, else pure Python loader
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def check_format(_format: str) -> str:
+    """
+    Returns _format if supported, else raises.
+    """
+    if _format not in FORMATS:
+        raise Exception(f"Unsupported format {_format}. Support for {FORMATS}.")
+    return _format
+
+
+def sniff_format(raw: str) -> str:
+    """
+    Returns the format of raw content from its first non-whitespace
+    characters: JSON for an object or array, JSON with single quotes for an
+    object with single-quoted keys, YAML otherwise.
+    """
+    # First characters only: sniffing does not copy large content
+    head = raw[:_HEAD_SIZE]
+    if head[:1].isspace():
+        head = head.lstrip() or raw.lstrip()[:_HEAD_SIZE]
+    first = head[:1]
+    if first == "{":
+        second = head[1:2]
+        if second.isspace():
+            second = (head[1:].lstrip() or raw.lstrip()[1:].lstrip())[:1]
+        return "json_single_quotes" if second == "'" else "json"
+    if first == "[":
+        return "json"
+    return "yaml"
+
+
+def load_json(raw: str) -> Any:
+    return json.loads(raw)
+
+
+def load_yaml(raw: str) -> Any:
+    return yaml.load(raw, Loader=YamlLoader)
+
+
+def load_json_single_quotes(raw: str) -> Any:
+    return json.loads(raw.replace("'", '"'))
+
+
+LOADERS = {
+    "json": load_json,
+    "json_single_quotes": load_json_single_quotes,
+    "yaml": load_yaml,
+}
+
+
+def parse(raw: str, _format: str = "auto", strict: bool = False) -> Optional[Any]:
+    """
+    Parse raw content once with the parser of _format, or of the sniffed
+    format if auto. _format is expected to be checked once by the caller
+    (see check_format).
+
+    If not strict and parsing fails, the YAML parser is tried (e.g. YAML
+    flow mapping starting with "{"), or the JSON one if YAML failed, and None
+    is returned if raw content cannot be parsed. If strict, raises if raw
+    content cannot be parsed.
+
+    :param raw: serialized content
+    :param _format: one of "auto", "json", "yaml"
+    :param strict: bool, True to only try the parser of _format
+    :return:
+    """
+    if _format == "auto":
+        _format = sniff_format(raw)
+    try:
+        load = LOADERS[_format]
+    except KeyError:
+        raise Exception(f"Unsupported format {_format}. Support for {FORMATS}.")
+    try:
+        return load(raw)
+    except Exception:
+        if strict:
+            raise
+    try:
+        return LOADERS["json" if _format == "yaml" else "yaml"](raw)
+    except Exception:
+        return None
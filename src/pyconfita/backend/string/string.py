@@ -1,8 +1,5 @@
-from typing import Optional, Any
-import yaml
-import json
-
-from pyconfita.backend.backend import Backend as _Backend
+from pyconfita.backend.backend import KVBackend as _Backend
+from pyconfita.backend.parsing import check_format, parse
 
 
 class Backend(_Backend):
@@ -12,39 +9,24 @@ class Backend(_Backend):
 
     name = "string"
 
-    def __init__(self, input_str: str, *args, **kwargs):
+    def __init__(self, input_str: str, format: str = "auto", *args, **kwargs):
         """
+        The string is parsed once. Its format is given by format, else
+        sniffed from its first characters.
 
+        :param input_str: serialized YAML or JSON
+        :param format: one of "auto", "json", "yaml". Defaults to "auto".
+        With an explicit format, raises if the string cannot be parsed
         :param args:
         :param kwargs:
         """
         _kv = None
         if input_str is not None:
-            try:
-                _kv = json.loads(input_str)
-            except Exception as e:
-                try:
-                    _input_str = input_str.strip().replace("'", '"')
-                    _kv = json.loads(_input_str)
-                except Exception as ee:
-                    pass
-
-            if _kv is None:
-                try:
-                    _kv = yaml.safe_load(input_str)
-                except Exception as e:
-                    pass
+            strict = check_format(format) != "auto"
+            _kv = parse(input_str, format, strict=strict)
 
         if _kv is None:
             _kv = {}
 
-        self.kv = _kv
-
-    def _get(self, key: str, **kwargs) -> Optional[Any]:
-        """
-
-        :param key:
-        :param kwargs:
-        :return:
-        """
-        return self.kv.get(key)
+        # Not shared yet: set without taking the write lock
+        self._set_kv(_kv)
@@ -1,3 +1,9 @@
+import json
+from unittest import mock
+
+import pytest
+import yaml
+
 from pyconfita.backend.string.string import Backend
 
 
@@ -116,3 +122,25 @@ def test_backend_edge_cases():
     bk = Backend(d)
     _val = bk.get("UNKNOWN")
     assert _val is None
+
+
+def test_backend_format():
+    """Test backend with explicit format, and parsed once in auto format"""
+    d = "lower: cased\nint: 1"
+    assert Backend(d, format="yaml").get("int", type=int) == 1
+    with pytest.raises(Exception):
+        Backend(d, format="json")
+    with pytest.raises(Exception):
+        Backend(d, format="toml")
+
+    d = '{"lower": "cased", "int": 1}'
+    assert Backend(d, format="json").get("int", type=int) == 1
+
+    for d in [d, "{'lower': 'cased', 'int': 1}", "lower: cased\nint: 1"]:
+        with mock.patch(
+            "pyconfita.backend.parsing.json.loads", wraps=json.loads
+        ) as mocked_json, mock.patch(
+            "pyconfita.backend.parsing.yaml.load", wraps=yaml.load
+        ) as mocked_yaml:
+            assert Backend(d).get("lower") == "cased"
+        assert mocked_json.call_count + mocked_yaml.call_count == 1
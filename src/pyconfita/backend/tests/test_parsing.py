@@ -0,0 +1,34 @@
+import pytest
+import yaml
+
+from pyconfita.backend import parsing
+
+
+def test_sniff_format():
+    """Test format sniffed from first non-whitespace character"""
+    assert parsing.sniff_format(' \n {"a": 1}') == "json"
+    assert parsing.sniff_format("[1, 2]") == "json"
+    assert parsing.sniff_format("{ 'a': 1}") == "json_single_quotes"
+    assert parsing.sniff_format("a: 1") == "yaml"
+    assert parsing.sniff_format("") == "yaml"
+
+
+def test_parse():
+    """Test parse with auto and explicit formats"""
+    assert parsing.parse('{"a": 1}') == {"a": 1}
+    assert parsing.parse("a: 1") == {"a": 1}
+    assert parsing.parse("{a: 1}") == {"a": 1}
+    assert parsing.parse("a: [") is None
+    assert parsing.parse("a: 1", "yaml", strict=True) == {"a": 1}
+    with pytest.raises(Exception):
+        parsing.parse("a: 1", "json", strict=True)
+    with pytest.raises(Exception):
+        parsing.parse("a: 1", "toml")
+
+
+def test_yaml_loader():
+    """Test YAML is loaded with LibYAML when available"""
+    if yaml.__with_libyaml__:
+        assert parsing.YamlLoader is yaml.CSafeLoader
+    else:
+        assert parsing.YamlLoader is yaml.SafeLoader
@@ -0,0 +1,409 @@
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, Mapping
+
+import requests
+from hvac.utils import get_token_from_env
+
+from pyconfita.backend.backend import AsyncBackend as _Backend
+from pyconfita.backend.vault.cache import KVStoreCache
+from pyconfita.backend.vault.readiness import Readiness
+from pyconfita.backend.vault.vault import KeyRef, raise_path_not_found
+from pyconfita.fork import register_after_fork
+from pyconfita.logging_interface import LoggingInterface
+from pyconfita.metrics_interface import MetricsInterface, NOOP_METRICS
+from pyconfita.schema import Schema
+from pyconfita.singleflight import AsyncSingleFlight
+from pyconfita.tracing_interface import (
+    TracerInterface,
+    NOOP_TRACER,
+    PATH,
+    BACKEND,
+    OUTCOME,
+)
+
+
+# Options of VaultBackend not supported by the asynchronous backend
+UNSUPPORTED_OPTIONS = (
+    "cache_stale_grace",
+    "refresh_ahead",
+    "refresh_ahead_ratio",
+    "refresh_interval",
+    "max_workers",
+    "read_timeout",
+    "kv_version",
+    "mount_point",
+    "pinned_versions",
+    "persistent_cache_path",
+    "persistent_cache_max_age",
+    "persistent_cache_write_delay",
+)
+
+
+class Backend(_Backend):
+    """
+    Load a key from Vault key-value store, asynchronously.
+
+    Blocking I/O runs in a thread pool executor so that the event loop is
+    never blocked. Each executor thread sends requests with its own
+    keep-alive HTTP session (requests does not promise that a Session is
+    thread-safe).
+    """
+
+    name: str = "vault"
+    # Secrets change without a new generation: cached by the Vault cache,
+    # with its ttl, not by Confita
+    cacheable: bool = False
+
+    def __init__(
+        self,
+        logger: LoggingInterface,
+        default_key_path: str = "config-__CLUSTER_NAME__/data-team",
+        url: str = "http://localhost:8200",
+        readiness_timeout: int = 30,
+        enable_cache: bool = False,
+        token: Optional[str] = None,
+        *args,
+        **kwargs,
+    ):
+        """
+        Initializer for the asynchronous Vault client, communicating with a
+        Vault agent.
+        By default, the Vault agent is reachable locally in clear without
+        authentication.
+
+        :param logger: logging interface
+        :param default_key_path: default path for key-value lookup
+        :param url: Vault agent URL, defaults to http://localhost:8200
+        :param readiness_timeout: timeout, defaults to 30 seconds
+        :param enable_cache: bool, True to enable caching key-value stores
+        :param token: Vault token, defaults to VAULT_TOKEN environment
+        variable or ~/.vault-token
+        :param kwargs:
+            - pool_maxsize: number of executor threads, each keeping one
+            keep-alive connection, defaults to 64
+            - request_timeout: timeout of one request to Vault agent,
+            defaults to 30 seconds
+            - cache_maxsize, cache_ttl, readiness_ttl, readiness_backoff,
+            readiness_max_backoff: see VaultBackend
+            - metrics: metrics interface, defaults to no-op
+            - tracer: tracer interface, defaults to no-op
+            Other options of VaultBackend are not supported, and raise:
+            cache_stale_grace, refresh_ahead, refresh_ahead_ratio,
+            refresh_interval, max_workers, read_timeout (see request_timeout),
+            kv_version, mount_point, pinned_versions, persistent_cache_path,
+            persistent_cache_max_age, persistent_cache_write_delay
+        """
+        unsupported = [option for option in UNSUPPORTED_OPTIONS if option in kwargs]
+        if unsupported:
+            raise Exception(
+                f"Unsupported options of asynchronous Vault backend: {unsupported}"
+            )
+        self.default_key_path = default_key_path
+        self.url = url.rstrip("/")
+        self.readiness_timeout = readiness_timeout
+        if logger is None:
+            raise Exception("Vault logger must not be None")
+        self.logger = logger
+        self.readiness = Readiness(
+            probe=self._probe,
+            logger=self.logger,
+            timeout=self.readiness_timeout,
+            ttl=kwargs.get("readiness_ttl", 60),
+            initial_backoff=kwargs.get("readiness_backoff", 0.05),
+            max_backoff=kwargs.get("readiness_max_backoff", 1.0),
+        )
+        self.cache = None
+        self.enable_cache = enable_cache
+        if self.enable_cache:
+            maxsize = kwargs.get("cache_maxsize", 1024)
+            ttl = kwargs.get("cache_ttl", 600)  # Defaults to 10min
+            self.cache = KVStoreCache(maxsize=maxsize, ttl=ttl)
+        # Concurrent cache misses on a path share one read
+        self._flight = AsyncSingleFlight()
+        self.metrics = kwargs.get("metrics") or NOOP_METRICS
+        self.tracer = kwargs.get("tracer") or NOOP_TRACER
+
+        self.pool_maxsize = kwargs.get("pool_maxsize", 64)
+        self.request_timeout = kwargs.get("request_timeout", 30)
+        self.token = token if token is not None else get_token_from_env()
+        # HTTP session of each thread, and all live sessions, closed by close
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.pool_maxsize)
+        register_after_fork(self)
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Keep-alive HTTP session of the calling thread, created on its first
+        request.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._make_session()
+            with self._sessions_lock:
+                self._sessions.add(session)
+        return session
+
+    def _make_session(self) -> requests.Session:
+        """
+        Returns a keep-alive HTTP session, sending the Vault token if any.
+        """
+        session = requests.Session()
+        if self.token is not None:
+            session.headers["X-Vault-Token"] = self.token
+        return session
+
+    def _after_fork(self) -> None:
+        """
+        Reset state inherited from the parent process, in a forked child: the
+        HTTP sessions (and their connections) and the executor are created
+        again, and cached key-value stores are dropped.
+        """
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.pool_maxsize)
+        self._flight = AsyncSingleFlight()
+        if self.cache is not None:
+            self.cache.reset()
+
+    def close(self) -> None:
+        """
+        Release executor threads and keep-alive connections of all threads.
+        """
+        self.executor.shutdown(wait=False)
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.close()
+
+    async def _run(self, fn, *args) -> Any:
+        """
+        Run blocking fn in the executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def _read(self, path: str) -> Optional[dict]:
+        """
+        GET /v1/<path> with the session of the calling thread. Returns None if
+        path is not found.
+        """
+        res = self.session.get(f"{self.url}/v1/{path}", timeout=self.request_timeout)
+        if res.status_code == 404:
+            return None
+        res.raise_for_status()
+        return res.json()
+
+    @property
+    def metrics(self) -> MetricsInterface:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: MetricsInterface) -> None:
+        self._metrics = metrics
+        self.readiness.metrics = metrics
+        if self.cache is not None:
+            self.cache.metrics = metrics
+
+    @property
+    def tracer(self) -> TracerInterface:
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer: TracerInterface) -> None:
+        self._tracer = tracer
+        self.readiness.tracer = tracer
+        if self.cache is not None:
+            self.cache.tracer = tracer
+
+    def _observe_read(self, start: float, result: str) -> None:
+        if self._metrics.enabled:
+            self._metrics.observe(
+                "pyconfita_vault_read_seconds",
+                time.perf_counter() - start,
+                {"result": result},
+            )
+
+    def _probe(self) -> bool:
+        """
+        Returns True if Vault agent answers with a success status code.
+        """
+        res = self.session.get(self.url, timeout=self.request_timeout)
+        return res.status_code in [200, 201, 202, 203, 204]
+
+    async def is_agent_ready(self) -> bool:
+        """
+        Wait for Vault agent readiness until timeout.
+        Readiness is remembered for readiness_ttl seconds after a successful
+        probe: no request is sent to the agent meanwhile.
+
+        :return:
+        """
+        return await self.readiness.wait_async(self._run)
+
+    async def await_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for Vault agent readiness until timeout (defaults to
+        readiness_timeout), and remember it until a read fails.
+        Meant to be awaited once at startup, so that reads never probe the
+        agent.
+
+        :param timeout:
+        :return:
+        """
+        is_ready = await self.readiness.wait_async(self._run, timeout=timeout)
+        if is_ready:
+            self.readiness.pin()
+        return is_ready
+
+    async def _get_kv_store(self, path: str) -> dict:
+        """
+        Return key-value store at path. Raises if path is not found.
+        """
+        if not self._tracer.enabled:
+            return await self._read_kv_store(path)
+        with self._tracer.start_span(
+            "pyconfita.vault.read", {PATH: path, BACKEND: self.name}
+        ) as span:
+            kv_store = await self._read_kv_store(path)
+            span.set_attribute(OUTCOME, "ok")
+        return kv_store
+
+    async def _read_kv_store(self, path: str) -> dict:
+        start = time.perf_counter()
+        try:
+            res = await self._run(self._read, path)
+            self._observe_read(start, "ok")
+        except Exception as e:
+            self._observe_read(start, "error")
+            self.readiness.reset()
+            self.logger.log(
+                **{
+                    "level": "error",
+                    "message": {
+                        "message": f"[Vault] Error reading key-value store"
+                        f" at path={path}: {e}"
+                    },
+                }
+            )
+            raise e
+        if res is None:
+            raise_path_not_found(self.logger, path)
+        return res.get("data", {})
+
+    async def _get_kv_store_when_ready(self, path: str) -> dict:
+        """
+        Return key-value store at path when Vault agent is ready.
+
+        """
+        is_ready = await self.is_agent_ready()
+        if is_ready:
+            return await self._get_kv_store(path=path)
+        else:
+            self.logger.log(
+                **{
+                    "level": "error",
+                    "message": {
+                        "message": f"[Vault] Failed to communicate with Vault"
+                        f" agent. Cannot retrieve key-value"
+                        f" store at path={path}"
+                    },
+                }
+            )
+            raise Exception(
+                f"[Vault] Failed to communicate with Vault"
+                f" agent. Cannot retrieve key-value"
+                f" store at path={path}"
+            )
+
+    def _cache_kv_store(self, path: str, kv_store: dict):
+        """
+        Cache key-value store (loaded from path) if caching is enabled.
+        """
+        if self.enable_cache:
+            self.cache.set_kv_store(path, kv_store)
+
+    async def _get_cached_kv_store(self, path: str) -> dict:
+        """
+        Return key-value store at path
+        - from cache if enabled
+        - directly when Vault is ready, caching it if enabled. Concurrent
+        cache misses on path await the first one's read, and share its result
+        or error
+        """
+        if not self.enable_cache:
+            return await self._get_kv_store_when_ready(path=path)
+
+        kv_store = self.cache.get_kv_store(path)
+        if kv_store is not None:
+            return kv_store
+        kv_store, shared = await self._flight.do(
+            path, lambda: self._load_kv_store(path)
+        )
+        if shared:
+            self.cache.stats.increment("coalesced")
+        return kv_store
+
+    async def _load_kv_store(self, path: str) -> dict:
+        """
+        Read key-value store at path after a cache miss, and cache it.
+        """
+        # A concurrent read may have cached path since the cache lookup
+        kv_store = self.cache.peek_kv_store(path)
+        if kv_store is not None:
+            return kv_store
+        kv_store = await self._get_kv_store_when_ready(path=path)
+        self._cache_kv_store(path=path, kv_store=kv_store)
+        return kv_store
+
+    async def _get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Get key
+        - from cache if enabled
+        - directly when Vault is ready
+
+        Default path is used if no one provided in kwargs.
+
+        :param key:
+        :param kwargs:
+        :return:
+        """
+        _path = kwargs.get("path", self.default_key_path)
+        k_ref = KeyRef(path=_path, key=key)
+        kv_store = await self._get_cached_kv_store(path=k_ref.path)
+        return kv_store.get(k_ref.key)
+
+    async def get_struct(self, schema: dict, **kwargs) -> Mapping:
+        """
+        Load all values defined in schema in a struct (dict) with one request,
+        or from cache if enabled.
+        """
+        if isinstance(schema, Schema):
+            return schema.build(await self.get_many(schema, **kwargs))
+
+        _path = kwargs.get("path", self.default_key_path)
+        kv_store = await self._get_cached_kv_store(path=_path)
+        _struct = {}
+        for key, _type in schema.items():
+            _value = kv_store.get(key)
+            if _value is not None:
+                _value = self._cast(_value, type=_type)
+            _struct[key] = _value
+
+        return _struct
+
+    async def get_many(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys found in the key-value store with one request, or
+        from cache if enabled.
+        """
+        _path = kwargs.get("path", self.default_key_path)
+        kv_store = await self._get_cached_kv_store(path=_path)
+        return self._get_many_from(kv_store, keys)
@@ -0,0 +1,245 @@
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Optional, Any, Tuple
+
+from cacheout import Cache
+
+from pyconfita.metrics_interface import MetricsInterface, NOOP_METRICS
+from pyconfita.tracing_interface import TracerInterface, NOOP_TRACER, PATH, OUTCOME
+
+KEY_NOT_FOUND_IN_CACHE = "__key_not_found_in_cache__"
+
+
+@dataclass
+class KVStoreEntry:
+    """
+    Key-value store cached for one path, with the time it was read at.
+    """
+
+    kv_store: dict
+    fetched_at: float
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a key-value store cache, updated under lock: they are bumped
+    by all the threads reading the cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    stale_served: int = 0
+    evictions: int = 0
+    refreshes: int = 0
+    refresh_failures: int = 0
+    refresh_latency_total: float = 0.0
+    refresh_latency_max: float = 0.0
+    # KV v2 revalidations by metadata version: data read skipped, or read
+    version_unchanged: int = 0
+    version_changed: int = 0
+    # Cache misses served by the read of a concurrent miss
+    coalesced: int = 0
+    lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def increment(self, name: str) -> None:
+        """
+        Increment counter name by one.
+        """
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_refresh(self, latency: float) -> None:
+        with self.lock:
+            self.refreshes += 1
+            self.refresh_latency_total += latency
+            self.refresh_latency_max = max(self.refresh_latency_max, latency)
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {
+                f.name: getattr(self, f.name) for f in fields(self) if f.name != "lock"
+            }
+
+
+class KVStoreCache:
+    """
+    Cache of key-value stores read from Vault, with one entry per path.
+
+    A cached key-value store answers all the keys at its path: a key missing
+    from the store is a negative entry (None), and does not trigger any new
+    read until the entry expires.
+
+    An entry is fresh for ttl seconds. Once expired, it is kept stale_grace
+    more seconds, and can be served while it is reloaded, or if Vault cannot
+    be read.
+
+    For KV v2 secrets, the version last read at each path is kept beyond
+    expiry, with its key-value store, so that expired entries can be
+    revalidated by version. At most maxsize versions are kept.
+    """
+
+    metrics: MetricsInterface = NOOP_METRICS
+    tracer: TracerInterface = NOOP_TRACER
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 600, stale_grace: int = 0):
+        """
+
+        :param maxsize: maximum number of cached paths
+        :param ttl: time to live of a cached path, in seconds
+        :param stale_grace: time an expired path is kept to be served while
+        it is reloaded, in seconds
+        """
+        self.ttl = ttl
+        self.stale_grace = stale_grace
+        self.cache = Cache(maxsize=maxsize, ttl=ttl + stale_grace)
+        # KV v2: path -> (version, key-value store) last read
+        self.versions = Cache(maxsize=maxsize)
+        self.stats = CacheStats()
+
+    def get_entry(self, path: str) -> Optional[KVStoreEntry]:
+        """
+        Returns the entry cached at path, fresh or stale. None if not cached.
+        """
+        return self.cache.get(path, default=None)
+
+    def is_fresh(self, entry: KVStoreEntry) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def get_kv_store(self, path: str) -> Optional[dict]:
+        """
+        Returns the key-value store cached at path, None if not cached or
+        expired.
+        """
+        if self.tracer.enabled:
+            with self.tracer.start_span(
+                "pyconfita.vault.cache_lookup", {PATH: path}
+            ) as span:
+                kv_store = self._get_kv_store(path)
+                span.set_attribute(OUTCOME, "miss" if kv_store is None else "hit")
+            return kv_store
+        return self._get_kv_store(path)
+
+    def _get_kv_store(self, path: str) -> Optional[dict]:
+        entry = self.get_entry(path)
+        if entry is None or not self.is_fresh(entry):
+            self.stats.increment("misses")
+            self._record_request("miss")
+            return None
+        self.stats.increment("hits")
+        self._record_request("hit")
+        return entry.kv_store
+
+    def peek_kv_store(self, path: str) -> Optional[dict]:
+        """
+        Returns the key-value store cached at path, None if not cached or
+        expired. Not counted as a cache request.
+        """
+        entry = self.get_entry(path)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry.kv_store
+
+    def _record_request(self, result: str) -> None:
+        if self.metrics.enabled:
+            self.metrics.increment(
+                "pyconfita_cache_requests_total",
+                labels={"cache": "vault", "result": result},
+            )
+
+    def record_stale_served(self) -> None:
+        """
+        Count a stale key-value store served while reloaded, or because Vault
+        could not be read.
+        """
+        self.stats.increment("stale_served")
+        self._record_request("stale")
+
+    def get_stale_kv_store(self, path: str) -> Optional[dict]:
+        """
+        Returns the key-value store cached at path, even if expired (within
+        stale grace). None if not cached.
+        """
+        entry = self.get_entry(path)
+        if entry is None:
+            return None
+        return entry.kv_store
+
+    def set_kv_store(
+        self, path: str, kv_store: dict, fetched_at: Optional[float] = None
+    ) -> None:
+        """
+        Cache the whole key-value store read at path.
+        """
+        if fetched_at is None:
+            fetched_at = time.time()
+        maxsize = self.cache.maxsize
+        if maxsize and len(self.cache) >= maxsize and not self.cache.has(path):
+            # Oldest entry is evicted to make room
+            self.stats.increment("evictions")
+            if self.metrics.enabled:
+                self.metrics.increment(
+                    "pyconfita_cache_evictions_total",
+                    labels={"cache": "vault", "reason": "size"},
+                )
+        self.cache.set(path, KVStoreEntry(kv_store=kv_store, fetched_at=fetched_at))
+
+    def get_version(self, path: str) -> Optional[Tuple[int, dict]]:
+        """
+        Returns the version of the KV v2 secret last read at path, with its
+        key-value store. None if unknown.
+        """
+        return self.versions.get(path, default=None)
+
+    def set_version(self, path: str, version: Optional[int], kv_store: dict) -> None:
+        """
+        Remember the version of the KV v2 secret read at path, with its
+        key-value store. Forget it if version is None (not found).
+        """
+        if version is None:
+            self.versions.delete(path)
+        else:
+            self.versions.set(path, (version, kv_store))
+
+    def get(self, k_ref, default: Any = KEY_NOT_FOUND_IN_CACHE) -> Optional[Any]:
+        """
+        Returns the value of key reference k_ref (path, key).
+        Returns None if path is cached without key, and default if path is not
+        cached.
+        """
+        kv_store = self.get_kv_store(k_ref.path)
+        if kv_store is None:
+            return default
+        return kv_store.get(k_ref.key)
+
+    def delete(self, path: str) -> None:
+        """
+        Drop the key-value store cached at path, and its version.
+        """
+        self.cache.delete(path)
+        self.versions.delete(path)
+
+    def clear(self) -> None:
+        """
+        Drop all cached key-value stores, and their versions.
+        """
+        self.cache.clear()
+        self.versions.clear()
+
+    def reset(self) -> None:
+        """
+        Drop all cached key-value stores and versions, replacing the
+        underlying caches and their locks, e.g. in a forked child process.
+        """
+        self.cache = Cache(maxsize=self.cache.maxsize, ttl=self.cache.ttl)
+        self.versions = Cache(maxsize=self.versions.maxsize)
+        self.stats.lock = threading.Lock()
+
+    def paths(self) -> list:
+        """
+        Returns the cached paths.
+        """
+        return list(self.cache.keys())
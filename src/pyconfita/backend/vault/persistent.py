@@ -0,0 +1,204 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from pyconfita.logging_interface import LoggingInterface
+
+# Version of the file layout
+FORMAT_VERSION = 1
+
+
+class PersistentCache:
+    """
+    Last-known-good key-value stores read from Vault, persisted in a local
+    file, to warm up the cache on start.
+
+    The file holds secrets: it is only readable and writable by its owner
+    (0600), and is replaced atomically on each write. Files readable or
+    writable by others, or owned by another user, are rejected.
+    Entries older than max_age seconds are not loaded.
+
+    Writes are debounced off the read path: stored entries are written at
+    once by a timer thread, write_delay seconds after the first unwritten
+    one, or by flush.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        max_age: float = 86400,
+        write_delay: float = 1.0,
+        logger: Optional[LoggingInterface] = None,
+    ):
+        """
+
+        :param file_path: path of the cache file
+        :param max_age: maximum age of a loaded entry, in seconds
+        :param write_delay: delay between storing an entry and writing the
+        file, in seconds
+        :param logger: logging interface, logging failed background writes
+        """
+        self.file_path = file_path
+        self.logger = logger
+        self.max_age = max_age
+        self.write_delay = write_delay
+        # Guards entries and the write timer
+        self.lock = threading.Lock()
+        # Serializes file writes
+        self.write_lock = threading.Lock()
+        # path -> (key-value store, fetched at)
+        self.entries: Dict[str, Tuple[dict, float]] = {}
+        # Entries changed since the last write
+        self.dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self.writes = 0
+
+    def _after_fork(self) -> None:
+        """
+        Replace locks, possibly held by a thread of the parent, in a forked
+        child. The parent's write timer is not running in the child.
+        """
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self._timer = None
+
+    def load(self) -> Dict[str, Tuple[dict, float]]:
+        """
+        Read entries from file, dropping entries older than max_age.
+        Returns path -> (key-value store, fetched at), empty if the file is
+        missing. Raises if the file is unsafe or invalid.
+        """
+        try:
+            fd = os.open(self.file_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return {}
+        with os.fdopen(fd, "rb") as f:
+            st = os.fstat(f.fileno())
+            if st.st_mode & (stat.S_IRWXG | stat.S_IRWXO) or (
+                hasattr(os, "getuid") and st.st_uid != os.getuid()
+            ):
+                raise Exception(
+                    f"Unsafe permissions on Vault cache file {self.file_path}"
+                )
+            content = json.loads(f.read())
+        if content.get("version") != FORMAT_VERSION:
+            return {}
+
+        now = time.time()
+        entries = {}
+        for path, entry in content.get("entries", {}).items():
+            fetched_at = entry["fetched_at"]
+            if now - fetched_at <= self.max_age:
+                entries[path] = (entry["data"], fetched_at)
+        with self.lock:
+            self.entries = dict(entries)
+        return entries
+
+    def store(self, path: str, kv_store: dict, fetched_at: Optional[float] = None):
+        """
+        Record the key-value store read at path. The file is written later,
+        by the write timer.
+        """
+        if fetched_at is None:
+            fetched_at = time.time()
+        with self.lock:
+            self.entries[path] = (kv_store, fetched_at)
+            self.dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self._flush_timer)
+                self._timer.name = "pyconfita-vault-persist"
+                self._timer.start()
+
+    def flush(self) -> None:
+        """
+        Write the file now if entries changed since the last write.
+        """
+        with self.write_lock:
+            with self.lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self.dirty:
+                    return
+                entries = dict(self.entries)
+                self.dirty = False
+            try:
+                self._write(entries)
+            except BaseException:
+                # Written again on next flush
+                with self.lock:
+                    self.dirty = True
+                raise
+
+    def _flush_timer(self) -> None:
+        """
+        Flush from the write timer thread, logging failures.
+        """
+        try:
+            self.flush()
+        except Exception as e:
+            if self.logger is not None:
+                self.logger.log(
+                    **{
+                        "level": "warning",
+                        "message": {
+                            "message": f"[Vault] Failed to write persistent"
+                            f" cache {self.file_path}: {e}"
+                        },
+                    }
+                )
+
+    def _write(self, entries: Dict[str, Tuple[dict, float]]) -> None:
+        """
+        Write entries to a temporary file (0600) in the same directory, then
+        rename it over the cache file.
+        """
+        content = {
+            "version": FORMAT_VERSION,
+            "entries": {
+                path: {"fetched_at": fetched_at, "data": kv_store}
+                for path, (kv_store, fetched_at) in entries.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # mkstemp creates the file with 0600 permissions
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pyconfita-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(content, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.writes += 1
+
+    def purge(self, path: Optional[str] = None) -> None:
+        """
+        Drop the entry of path and write the file, or drop all entries and
+        the file if path is None.
+        """
+        if path is not None:
+            with self.lock:
+                if self.entries.pop(path, None) is None:
+                    return
+                self.dirty = True
+            self.flush()
+            return
+        with self.write_lock:
+            with self.lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self.entries = {}
+                self.dirty = False
+            try:
+                os.unlink(self.file_path)
+            except FileNotFoundError:
+                pass
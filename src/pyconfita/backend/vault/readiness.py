@@ -0,0 +1,173 @@
+import asyncio
+import random
+import time
+from typing import Callable, Optional
+
+from pyconfita.logging_interface import LoggingInterface
+from pyconfita.metrics_interface import MetricsInterface, NOOP_METRICS
+from pyconfita.tracing_interface import TracerInterface, NOOP_TRACER, OUTCOME
+
+
+class Readiness:
+    """
+    Track readiness of the Vault agent.
+
+    States:
+    - unknown: the agent is probed, failed probes are retried with
+    exponential backoff and jitter until timeout;
+    - ready: a probe succeeded less than ttl seconds ago, or readiness was
+    pinned. No probe is sent.
+    Calling reset goes back to unknown, e.g. after a failed read.
+    """
+
+    metrics: MetricsInterface = NOOP_METRICS
+    tracer: TracerInterface = NOOP_TRACER
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        logger: LoggingInterface,
+        timeout: float = 30,
+        ttl: Optional[float] = 60,
+        initial_backoff: float = 0.05,
+        max_backoff: float = 1.0,
+    ):
+        """
+
+        :param probe: returns True if the agent is ready, may raise
+        :param logger: logging interface
+        :param timeout: maximum time waiting for readiness, in seconds
+        :param ttl: time a successful probe is remembered, in seconds. None to
+        remember it until reset
+        :param initial_backoff: delay before the first retry, in seconds
+        :param max_backoff: maximum delay between two retries, in seconds
+        """
+        self.probe = probe
+        self.logger = logger
+        self.timeout = timeout
+        self.ttl = ttl
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.ready_at: Optional[float] = None
+        self.pinned = False
+
+    def is_ready(self) -> bool:
+        """
+        Returns True if readiness is known without probing.
+        """
+        if self.ready_at is None:
+            return False
+        if self.pinned or self.ttl is None:
+            return True
+        return time.monotonic() - self.ready_at < self.ttl
+
+    def reset(self) -> None:
+        """
+        Forget readiness: next wait probes the agent again.
+        """
+        self.ready_at = None
+        self.pinned = False
+
+    def pin(self) -> None:
+        """
+        Remember readiness until reset, whatever the ttl.
+        """
+        if self.ready_at is not None:
+            self.pinned = True
+
+    def _try_probe(self, elapsed: float) -> bool:
+        if not self.tracer.enabled:
+            return self._probe_once(elapsed)
+        with self.tracer.start_span("pyconfita.vault.probe") as span:
+            is_ready = self._probe_once(elapsed)
+            span.set_attribute(OUTCOME, "ready" if is_ready else "not_ready")
+        return is_ready
+
+    def _probe_once(self, elapsed: float) -> bool:
+        start = time.perf_counter()
+        try:
+            is_ready = bool(self.probe())
+        except Exception as e:
+            self.logger.log_deferred(
+                level="debug",
+                message_factory=lambda: {
+                    "message": f"Waiting Vault agent, t = {elapsed}"
+                },
+            )
+            is_ready = False
+        if self.metrics.enabled:
+            self.metrics.observe(
+                "pyconfita_vault_probe_seconds",
+                time.perf_counter() - start,
+                {"result": "ready" if is_ready else "not_ready"},
+            )
+
+        if is_ready:
+            self.ready_at = time.monotonic()
+            self.logger.log(
+                **{
+                    "level": "info",
+                    "message": {"message": f"Vault agent is ready!"},
+                }
+            )
+        return is_ready
+
+    def _next_delay(self, backoff: float, remaining: float) -> float:
+        """
+        Returns the delay before next probe: backoff with jitter, bounded by
+        the remaining time.
+        """
+        return min(backoff * random.uniform(0.5, 1.0), max(remaining, 0))
+
+    def _log_not_ready(self) -> None:
+        self.logger.log(
+            **{
+                "level": "error",
+                "message": {"message": f"Vault agent is not ready"},
+            }
+        )
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for readiness until timeout (defaults to self.timeout).
+        Returns immediately if readiness is known.
+        """
+        if self.is_ready():
+            return True
+
+        timeout = self.timeout if timeout is None else timeout
+        start_time = time.monotonic()
+        backoff = self.initial_backoff
+        while True:
+            elapsed = time.monotonic() - start_time
+            if self._try_probe(elapsed):
+                return True
+            remaining = timeout - (time.monotonic() - start_time)
+            if remaining <= 0:
+                self._log_not_ready()
+                return False
+            time.sleep(self._next_delay(backoff, remaining))
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def wait_async(self, run: Callable, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for readiness until timeout (defaults to self.timeout), without
+        blocking the event loop. Probes are run with coroutine function run
+        (e.g. in an executor).
+        """
+        if self.is_ready():
+            return True
+
+        timeout = self.timeout if timeout is None else timeout
+        start_time = time.monotonic()
+        backoff = self.initial_backoff
+        while True:
+            elapsed = time.monotonic() - start_time
+            if await run(self._try_probe, elapsed):
+                return True
+            remaining = timeout - (time.monotonic() - start_time)
+            if remaining <= 0:
+                self._log_not_ready()
+                return False
+            await asyncio.sleep(self._next_delay(backoff, remaining))
+            backoff = min(backoff * 2, self.max_backoff)
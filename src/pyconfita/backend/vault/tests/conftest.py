@@ -0,0 +1,14 @@
+import pytest
+
+from pyconfita.testing import serve
+
+
+@pytest.fixture
+def vault_stub():
+    with serve(
+        store={
+            "path1": {"k_1": "secret_1", "k_2": "secret_2", "k_4": "t", "k_6": "10"},
+            "path2": {"k_1": "secret_1_path2", "k_3": "secret_3"},
+        }
+    ) as server:
+        yield server
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from pyconfita.backend.vault.async_vault import Backend
+from pyconfita.logging_interface import DummyLoggingInterface
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+def test_get(vault_stub):
+    """Test get against a local Vault agent stub"""
+
+    async def run():
+        bk = Backend(MOCK_LOGGER, url=vault_stub.url, default_key_path="path1")
+        try:
+            assert await bk.get("k_1") == "secret_1"
+            assert await bk.get("k_4", type=bool) == True
+            assert await bk.get("k_6", type=int) == 10
+            assert await bk.get("k_3") is None
+            assert await bk.get("k_1", path="path2") == "secret_1_path2"
+            with pytest.raises(Exception, match="path=unknown"):
+                await bk.get("k_1", path="unknown")
+        finally:
+            bk.close()
+
+    asyncio.run(run())
+
+
+def test_get_struct(vault_stub):
+    """Test get_struct and get_many against a local Vault agent stub"""
+
+    async def run():
+        bk = Backend(MOCK_LOGGER, url=vault_stub.url, default_key_path="path1")
+        try:
+            schema = {"k_1": str, "k_3": str, "k_4": bool, "k_6": int}
+            res = await bk.get_struct(schema)
+            assert res == {"k_1": "secret_1", "k_3": None, "k_4": True, "k_6": 10}
+            res = await bk.get_many(schema)
+            assert res == {"k_1": "secret_1", "k_4": True, "k_6": 10}
+        finally:
+            bk.close()
+
+    asyncio.run(run())
+
+
+def test_connection_reuse(vault_stub):
+    """Test concurrent reads reuse pooled keep-alive connections"""
+
+    async def run():
+        bk = Backend(
+            MOCK_LOGGER, url=vault_stub.url, default_key_path="path1", pool_maxsize=2
+        )
+        try:
+            for _ in range(5):
+                values = await asyncio.gather(*(bk.get("k_1") for _ in range(10)))
+                assert values == ["secret_1"] * 10
+        finally:
+            bk.close()
+
+    asyncio.run(run())
+    assert len(vault_stub.data_requests()) == 50
+    # Connections are pooled: at most pool_maxsize connections opened
+    assert len(vault_stub.client_ports) <= 2
+
+
+def test_cache(vault_stub):
+    """Test get with caching enabled only reads the key-value store once"""
+
+    async def run():
+        bk = Backend(
+            MOCK_LOGGER, url=vault_stub.url, default_key_path="path1", enable_cache=True
+        )
+        try:
+            assert await bk.get("k_1") == "secret_1"
+            assert await bk.get("k_2") == "secret_2"
+        finally:
+            bk.close()
+
+    asyncio.run(run())
+    assert vault_stub.data_requests() == ["/v1/path1"]
+
+
+def test_agent_not_ready():
+    """Test an Exception is raised when Vault agent cannot be reached"""
+
+    async def run():
+        bk = Backend(
+            MOCK_LOGGER,
+            url="http://127.0.0.1:1",
+            default_key_path="path1",
+            readiness_timeout=1,
+        )
+        try:
+            with pytest.raises(Exception):
+                await bk.get("k_1")
+        finally:
+            bk.close()
+
+    asyncio.run(run())
+
+
+def test_options():
+    """Test options default as in VaultBackend, and options of VaultBackend
+    not supported raise"""
+    bk = Backend(MOCK_LOGGER, url="http://127.0.0.1:1")
+    assert bk.pool_maxsize == 64
+    bk.close()
+    for option in ["refresh_ahead", "kv_version", "persistent_cache_path"]:
+        with pytest.raises(Exception, match=option):
+            Backend(MOCK_LOGGER, url="http://127.0.0.1:1", **{option: 1})
+
+
+def test_after_fork(vault_stub):
+    """Test HTTP session and executor are not shared with a forked child"""
+
+    async def run():
+        bk = Backend(
+            MOCK_LOGGER, url=vault_stub.url, default_key_path="path1", token="t"
+        )
+        try:
+            assert await bk.get("k_1") == "secret_1"
+            session, executor = bk.session, bk.executor
+            bk._after_fork()
+            assert bk.session is not session
+            assert bk.executor is not executor
+            assert bk.session.headers["X-Vault-Token"] == "t"
+            assert await bk.get("k_1") == "secret_1"
+        finally:
+            bk.close()
+
+    asyncio.run(run())
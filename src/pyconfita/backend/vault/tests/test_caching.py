@@ -1,7 +1,14 @@
+import threading
+import time
 from unittest import mock
 
-from pyconfita.backend.vault.vault import Backend, KeyRef
+import pytest
+
+from pyconfita.testing import serve
+from pyconfita.backend.vault.vault import Backend, KeyRef, KEY_NOT_FOUND_IN_CACHE
 from pyconfita.logging_interface import DummyLoggingInterface
+from pyconfita.metrics_interface import InMemoryMetrics
+from pyconfita.tracing_interface import InMemoryTracer
 
 MOCK_VAULT_URL = "http://localhost:8200"
 MOCK_VAULT_DATA = {"data": {"k_1": "secret_1", "k_2": "secret_2"}}
@@ -67,15 +74,31 @@ def test__cache_kv_store():
     kv_store = {"unseen": "sofar", "other": "one"}
     path = "path_to_kv"
     _ = bk._cache_kv_store(path, kv_store)
-    # Check one key-value pair has been cached
+    # Check the whole key-value store has been cached with one entry
+    assert bk.cache.paths() == [path]
+    assert bk.cache.get_kv_store(path) == kv_store
     key_ref = KeyRef(path=path, key="unseen")
-    assert len(bk.cache.items()) == 2
-    assert bk.cache.get(key_ref.get_cache_key()) == "sofar"
+    assert bk.cache.get(key_ref) == "sofar"
 
     # Check all k-v are cached...
     for k, v in kv_store.items():
         key_ref = KeyRef(path=path, key=k)
-        assert bk.cache.get(key_ref.get_cache_key()) == v
+        assert bk.cache.get(key_ref) == v
+
+    # Negative entry: key missing in cached store
+    assert bk.cache.get(KeyRef(path=path, key="missing")) is None
+    # Path not cached
+    assert (
+        bk.cache.get(KeyRef(path="other_path", key="unseen")) == KEY_NOT_FOUND_IN_CACHE
+    )
+
+
+def test_get_cache_key():
+    """Test cache keys of key references include path"""
+    assert (
+        KeyRef(path="path1", key="k").get_cache_key()
+        != KeyRef(path="path2", key="k").get_cache_key()
+    )
 
 
 def test_get():
@@ -97,3 +120,325 @@ def test_get():
             assert res == "secret_1"
             res = bk.get("k_2")
             assert res == "secret_2"
+
+
+MOCK_VAULT_MULTI_STORE = {
+    "path1": {"data": {"k_1": "secret_1_path1", "k_2": "secret_2_path1"}},
+    "path2": {"data": {"k_1": "secret_1_path2"}},
+}
+
+
+def test_get_same_key_from_multiple_paths():
+    """Test get with caching enabled. Ensure same key names read from
+    different paths do not collide, and each path is read once"""
+    reads = []
+
+    def mocked_read(path, *args, **kwargs):
+        reads.append(path)
+        return MOCK_VAULT_MULTI_STORE.get(path, None)
+
+    with mock.patch("hvac.v1.Client.read", side_effect=mocked_read):
+        with mock.patch(
+            "pyconfita.backend.vault.vault.Backend.is_agent_ready",
+            side_effect=mocked_is_ready,
+        ):
+            bk = Backend(
+                MOCK_LOGGER,
+                readiness_timeout=MOCK_VAULT_TIMEOUT,
+                default_key_path="path1",
+                enable_cache=True,
+            )
+            assert bk.get("k_1") == "secret_1_path1"
+            assert bk.get("k_1", path="path2") == "secret_1_path2"
+            assert bk.get("k_2", path="path2") is None
+            assert bk.get("k_2") == "secret_2_path1"
+            # Negative entries
+            assert bk.get("k_3") is None
+            assert bk.get("k_3", path="path2") is None
+            # Paths not found raise, and are not cached
+            for _ in range(2):
+                with pytest.raises(Exception, match="path=unknown"):
+                    bk.get("k_1", path="unknown")
+            assert reads == ["path1", "path2", "unknown", "unknown"]
+
+
+def test_get_struct():
+    """Test get_struct with caching enabled is served from cache"""
+    reads = []
+
+    def mocked_read(path, *args, **kwargs):
+        reads.append(path)
+        return MOCK_VAULT_MULTI_STORE.get(path, None)
+
+    with mock.patch("hvac.v1.Client.read", side_effect=mocked_read):
+        with mock.patch(
+            "pyconfita.backend.vault.vault.Backend.is_agent_ready",
+            side_effect=mocked_is_ready,
+        ):
+            bk = Backend(
+                MOCK_LOGGER,
+                readiness_timeout=MOCK_VAULT_TIMEOUT,
+                default_key_path="path1",
+                enable_cache=True,
+            )
+            schema = {"k_1": str, "k_2": str, "k_3": str}
+            expected = {"k_1": "secret_1_path1", "k_2": "secret_2_path1", "k_3": None}
+            assert bk.get_struct(schema) == expected
+            assert bk.get_struct(schema) == expected
+            assert bk.get("k_1") == "secret_1_path1"
+            assert bk.get_many(schema) == {
+                "k_1": "secret_1_path1",
+                "k_2": "secret_2_path1",
+            }
+            assert reads == ["path1"]
+
+
+class FlakyStore:
+    """Vault read mock counting reads, failing on demand"""
+
+    def __init__(self):
+        self.reads = 0
+        self.fail = False
+        self.value = "v1"
+
+    def read(self, path, *args, **kwargs):
+        self.reads += 1
+        if self.fail:
+            raise Exception("Vault agent unreachable")
+        return {"data": {"k_1": self.value}}
+
+
+def test_stale_while_revalidate():
+    """Test expired values are served right away within stale grace, while
+    reloaded in background, even when the agent is down"""
+    with serve({"path1": {"k_1": "v1"}}) as server:
+        bk = Backend(
+            MOCK_LOGGER,
+            url=server.url,
+            default_key_path="path1",
+            readiness_timeout=0.3,
+            readiness_ttl=0,
+            enable_cache=True,
+            cache_ttl=0.1,
+            cache_stale_grace=0.6,
+        )
+        assert bk.get("k_1") == "v1"
+        assert bk.get("k_1") == "v1"
+
+        # Expired, agent down: stale value served without waiting for the
+        # agent, one reload in background
+        time.sleep(0.15)
+        server.ready = False
+        start = time.perf_counter()
+        assert bk.get("k_1") == "v1"
+        assert bk.get("k_1") == "v1"
+        assert time.perf_counter() - start < 0.1
+        assert bk._flight.in_flight() == 1
+        wait_reloads(bk)
+        assert bk.get_cache_stats()["refresh_failures"] == 1
+
+        # Expired, agent up: stale value served, then reloaded in background
+        server.ready = True
+        server.store["path1"] = {"k_1": "v2"}
+        assert bk.get("k_1") == "v1"
+        wait_reloads(bk)
+        assert bk.get("k_1") == "v2"
+
+        # Expired beyond stale grace, agent down: error raised
+        time.sleep(0.75)
+        server.ready = False
+        with pytest.raises(Exception):
+            bk.get("k_1")
+
+        stats = bk.get_cache_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 5
+        assert stats["stale_served"] == 3
+        assert stats["refreshes"] == 1
+        assert server.data_requests() == ["/v1/path1"] * 2
+
+
+def wait_reloads(bk: Backend, timeout: float = 2) -> None:
+    """Wait for background reloads to be done"""
+    deadline = time.monotonic() + timeout
+    while bk._flight.in_flight() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_refresh_ahead():
+    """Test hot paths are reloaded in background before they expire, so that
+    reads are served from cache"""
+    store = FlakyStore()
+    with mock.patch("hvac.v1.Client.read", side_effect=store.read):
+        with mock.patch(
+            "pyconfita.backend.vault.vault.Backend.is_agent_ready",
+            side_effect=mocked_is_ready,
+        ):
+            bk = Backend(
+                MOCK_LOGGER,
+                default_key_path="path1",
+                enable_cache=True,
+                cache_ttl=0.4,
+                refresh_ahead=True,
+                refresh_ahead_ratio=0.5,
+                refresh_interval=0.05,
+            )
+            try:
+                assert bk.get("k_1") == "v1"
+                store.value = "v2"
+                # Past refresh ratio, before expiry
+                time.sleep(0.3)
+                assert bk.get("k_1") == "v2"
+                time.sleep(0.3)
+                assert bk.get("k_1") == "v2"
+
+                stats = bk.get_cache_stats()
+                assert stats["misses"] == 1
+                assert stats["hits"] == 2
+                assert stats["refreshes"] >= 1
+                assert stats["refresh_latency_max"] >= 0
+
+                # Refresh failures keep cached entry
+                store.fail = True
+                time.sleep(0.3)
+                assert bk.get_cache_stats()["refresh_failures"] >= 1
+            finally:
+                bk.close()
+
+
+def test_refresh_ahead_coalesced():
+    """Test the refresh thread starts on the first read, and refreshes do not
+    read a path while a cache miss of it is in flight"""
+    with serve({"path1": {"k_1": "v1"}}, delay=0.2) as server:
+        bk = Backend(
+            MOCK_LOGGER,
+            url=server.url,
+            default_key_path="path1",
+            enable_cache=True,
+            refresh_ahead=True,
+            refresh_interval=60,
+        )
+        try:
+            assert bk._refresh_thread is None
+            assert bk.get("k_1") == "v1"
+            assert bk._refresh_thread is not None
+
+            bk.cache.delete("path1")
+            miss = threading.Thread(target=bk.get, args=("k_1",))
+            miss.start()
+            time.sleep(0.05)
+            # The miss is in flight: not read again
+            bk._refresh_hot_paths()
+            miss.join()
+            wait_reloads(bk)
+            assert server.data_requests() == ["/v1/path1"] * 2
+        finally:
+            bk.close()
+        assert bk._refresh_thread is None
+
+
+def test_cache_metrics(vault_stub):
+    """Test Vault reads, readiness probes and cache requests are reported"""
+    metrics = InMemoryMetrics()
+    bk = Backend(
+        MOCK_LOGGER,
+        url=vault_stub.url,
+        default_key_path="path1",
+        enable_cache=True,
+        cache_maxsize=1,
+        metrics=metrics,
+    )
+    assert bk.get("k_1") == "secret_1"
+    assert bk.get("k_2") == "secret_2"
+    assert bk.get("k_1", path="path2") == "secret_1_path2"
+
+    requests = "pyconfita_cache_requests_total"
+    assert metrics.get_counter(requests, cache="vault", result="hit") == 1
+    assert metrics.get_counter(requests, cache="vault", result="miss") == 2
+    assert (
+        metrics.get_counter(
+            "pyconfita_cache_evictions_total", cache="vault", reason="size"
+        )
+        == 1
+    )
+    assert bk.get_cache_stats()["evictions"] == 1
+    assert metrics.get_histogram("pyconfita_vault_read_seconds", result="ok").count == 2
+    assert (
+        metrics.get_histogram("pyconfita_vault_probe_seconds", result="ready").count
+        == 1
+    )
+
+
+def test_cache_tracing(vault_stub):
+    """Test Vault reads, readiness probes and cache lookups are traced"""
+    tracer = InMemoryTracer()
+    bk = Backend(
+        MOCK_LOGGER,
+        url=vault_stub.url,
+        default_key_path="path1",
+        enable_cache=True,
+        tracer=tracer,
+    )
+    assert bk.readiness.tracer is tracer
+    assert bk.get("k_1") == "secret_1"
+    assert bk.get("k_2") == "secret_2"
+
+    lookups = tracer.find("pyconfita.vault.cache_lookup")
+    assert [s.attributes["pyconfita.outcome"] for s in lookups] == ["miss", "hit"]
+    assert lookups[0].attributes["pyconfita.path"] == "path1"
+    (probe,) = tracer.find("pyconfita.vault.probe")
+    assert probe.attributes["pyconfita.outcome"] == "ready"
+    (read,) = tracer.find("pyconfita.vault.read")
+    assert read.attributes == {
+        "pyconfita.path": "path1",
+        "pyconfita.backend": "vault",
+        "pyconfita.outcome": "ok",
+    }
+    assert read.duration >= 0
+
+    tracer.reset()
+    with mock.patch.object(bk.cli, "read", side_effect=Exception("down")):
+        with pytest.raises(Exception):
+            bk.get("k_1", path="path2")
+    (read,) = tracer.find("pyconfita.vault.read")
+    assert read.attributes["pyconfita.outcome"] == "error"
+    assert read.exception is not None
+
+
+def test_uncached_reads_instrumented(vault_stub):
+    """Test reads with caching disabled are traced and measured as cached
+    ones"""
+    metrics = InMemoryMetrics()
+    tracer = InMemoryTracer()
+    bk = Backend(
+        MOCK_LOGGER,
+        url=vault_stub.url,
+        default_key_path="path1",
+        metrics=metrics,
+        tracer=tracer,
+    )
+    assert bk.get("k_1") == "secret_1"
+    assert bk.get("k_3", path="path2") == "secret_3"
+    with pytest.raises(Exception, match="path=unknown"):
+        bk.get("k_1", path="unknown")
+
+    reads = tracer.find("pyconfita.vault.read")
+    assert [s.attributes["pyconfita.path"] for s in reads] == [
+        "path1",
+        "path2",
+        "unknown",
+    ]
+    assert metrics.get_histogram("pyconfita_vault_read_seconds", result="ok").count == 3
+
+
+def test_after_fork(vault_stub):
+    """Test Vault client and cache are not shared with a forked child"""
+    bk = Backend(
+        MOCK_LOGGER, url=vault_stub.url, default_key_path="path1", enable_cache=True
+    )
+    assert bk.get("k_1") == "secret_1"
+    cli = bk.cli
+    bk._after_fork()
+    assert bk.cli is not cli
+    assert bk.cache.paths() == []
+    assert bk.get("k_1") == "secret_1"
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from pyconfita.backend.vault.async_vault import Backend as AsyncBackend
+from pyconfita.backend.vault.vault import Backend
+from pyconfita.logging_interface import DummyLoggingInterface
+from pyconfita.testing import run_threads
+
+MOCK_LOGGER = DummyLoggingInterface()
+N_THREADS = 32
+N_EXPIRIES = 5
+
+
+def test_cache_miss_coalescing(vault_stub):
+    """Test concurrent cache misses on a path read it once per expiry"""
+    vault_stub.delay = 0.02
+    bk = Backend(
+        MOCK_LOGGER, url=vault_stub.url, default_key_path="path1", enable_cache=True
+    )
+    probes = 0
+    for _ in range(N_EXPIRIES):
+        bk.cache.delete("path1")
+        vault_stub.requests.clear()
+        results = run_threads(lambda i: bk.get("k_1"), N_THREADS)
+        assert results == ["secret_1"] * N_THREADS
+        assert vault_stub.data_requests() == ["/v1/path1"]
+        probes += vault_stub.requests.count("/")
+    # One readiness probe, before the first read
+    assert probes == 1
+    stats = bk.get_cache_stats()
+    assert stats["misses"] == N_THREADS * N_EXPIRIES
+    assert stats["coalesced"] > 0
+    assert bk._flight.in_flight() == 0
+
+
+def test_cache_miss_coalescing_error(vault_stub):
+    """Test the error of a coalesced read is raised to every caller"""
+    bk = Backend(
+        MOCK_LOGGER, url=vault_stub.url, default_key_path="path1", enable_cache=True
+    )
+    reads = []
+
+    def read(path):
+        reads.append(path)
+        time.sleep(0.05)
+        raise Exception("down")
+
+    with mock.patch.object(bk, "_read_kv_store", side_effect=read):
+        results = run_threads(lambda i: bk.get("k_1"), N_THREADS)
+    assert len(results) == N_THREADS
+    assert all(isinstance(r, Exception) for r in results)
+    assert len(reads) == 1
+    assert bk._flight.in_flight() == 0
+    assert bk.get("k_1") == "secret_1"
+
+
+def test_async_cache_miss_coalescing(vault_stub):
+    """Test concurrent cache misses on a path read it once per expiry, with
+    the asynchronous backend"""
+    vault_stub.delay = 0.02
+
+    async def run():
+        bk = AsyncBackend(
+            MOCK_LOGGER,
+            url=vault_stub.url,
+            default_key_path="path1",
+            enable_cache=True,
+        )
+        try:
+            for _ in range(N_EXPIRIES):
+                bk.cache.delete("path1")
+                vault_stub.requests.clear()
+                results = await asyncio.gather(
+                    *[bk.get("k_1") for _ in range(N_THREADS)]
+                )
+                assert results == ["secret_1"] * N_THREADS
+                assert vault_stub.data_requests() == ["/v1/path1"]
+            assert bk.cache.stats.coalesced == (N_THREADS - 1) * N_EXPIRIES
+
+            bk.cache.delete("path1")
+            with mock.patch.object(bk, "_read", side_effect=Exception("down")):
+                results = await asyncio.gather(
+                    *[bk.get("k_1") for _ in range(N_THREADS)],
+                    return_exceptions=True,
+                )
+            assert all(isinstance(r, Exception) for r in results)
+            assert bk._flight.in_flight() == 0
+        finally:
+            bk.close()
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+import pytest
+
+from pyconfita.testing import serve
+from pyconfita.backend.vault.vault import Backend
+from pyconfita.logging_interface import DummyLoggingInterface
+from pyconfita.metrics_interface import InMemoryMetrics
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+@pytest.fixture
+def kv2_stub():
+    with serve(
+        store={},
+        kv2_store={
+            "app": [{"k_1": "v1_1"}, {"k_1": "v1_2", "k_2": "v2_2"}],
+            "other": [{"k_3": "v3_1"}],
+        },
+    ) as server:
+        yield server
+
+
+def make_backend(url: str, **kwargs) -> Backend:
+    return Backend(
+        MOCK_LOGGER,
+        url=url,
+        default_key_path="app",
+        readiness_timeout=0.2,
+        kv_version=2,
+        **kwargs,
+    )
+
+
+def expire(bk: Backend, path: str) -> None:
+    """Expire the entry cached at path, keeping its version"""
+    bk.cache.get_entry(path).fetched_at -= bk.cache.ttl
+
+
+def test_kv2_get(kv2_stub):
+    """Test keys are read from the current version of KV v2 secrets"""
+    bk = make_backend(kv2_stub.url)
+    assert bk.get("k_1") == "v1_2"
+    assert bk.get("k_3", path="other") == "v3_1"
+    with pytest.raises(Exception, match="path=missing"):
+        bk.get("k_1", path="missing")
+    assert kv2_stub.data_requests() == [
+        "/v1/secret/data/app",
+        "/v1/secret/data/other",
+        "/v1/secret/data/missing",
+    ]
+
+
+def test_kv2_version_check(kv2_stub):
+    """Test expired entries are revalidated by reading metadata only, and data
+    is read again only once the version moved"""
+    metrics = InMemoryMetrics()
+    bk = make_backend(kv2_stub.url, enable_cache=True, metrics=metrics)
+    assert bk.get("k_1") == "v1_2"
+    assert bk.cache.get_version("app")[0] == 2
+
+    # Entry expired, version unchanged: metadata only
+    kv2_stub.requests.clear()
+    expire(bk, "app")
+    assert bk.get("k_1") == "v1_2"
+    assert kv2_stub.data_requests() == ["/v1/secret/metadata/app"]
+    assert bk.cache.stats.version_unchanged == 1
+
+    # Entry expired, version moved: metadata then data
+    kv2_stub.put_kv2("app", {"k_1": "v1_3"})
+    kv2_stub.requests.clear()
+    expire(bk, "app")
+    assert bk.get("k_1") == "v1_3"
+    assert kv2_stub.data_requests() == [
+        "/v1/secret/metadata/app",
+        "/v1/secret/data/app",
+    ]
+    assert bk.cache.get_version("app")[0] == 3
+    assert bk.cache.stats.version_changed == 1
+    name = "pyconfita_vault_version_checks_total"
+    assert metrics.get_counter(name, result="unchanged") == 1
+    assert metrics.get_counter(name, result="changed") == 1
+
+
+def test_kv2_pinned_version(kv2_stub):
+    """Test pinned versions are read, and never revalidated against Vault"""
+    bk = make_backend(kv2_stub.url, enable_cache=True, pinned_versions={"app": 1})
+    assert bk.get("k_1") == "v1_1"
+    assert bk.get("k_2") is None
+    assert kv2_stub.data_requests() == ["/v1/secret/data/app?version=1"]
+
+    kv2_stub.put_kv2("app", {"k_1": "v1_3"})
+    kv2_stub.requests.clear()
+    expire(bk, "app")
+    assert bk.get("k_1") == "v1_1"
+    assert kv2_stub.data_requests() == []
+
+
+def test_kv2_versions_bounded(kv2_stub):
+    """Test versions are bounded as cached entries, and dropped with them"""
+    for i in range(3):
+        kv2_stub.put_kv2(f"path{i}", {"k_1": str(i)})
+    bk = make_backend(kv2_stub.url, enable_cache=True, cache_maxsize=2)
+    for i in range(3):
+        assert bk.get("k_1", path=f"path{i}") == str(i)
+    assert bk.cache.get_version("path0") is None
+    assert bk.cache.get_version("path2") == (1, {"k_1": "2"})
+
+    bk.cache.clear()
+    assert bk.cache.get_version("path2") is None
+
+
+def test_kv_version_invalid():
+    """Test unsupported KV versions are rejected"""
+    with pytest.raises(Exception):
+        Backend(MOCK_LOGGER, readiness_timeout=0.1, kv_version=3)
@@ -0,0 +1,163 @@
+import json
+import os
+import stat
+import time
+
+import pytest
+
+from pyconfita.backend.vault.persistent import PersistentCache
+from pyconfita.backend.vault.vault import Backend
+from pyconfita.logging_interface import DummyLoggingInterface
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+def make_backend(url: str, cache_path: str, **kwargs) -> Backend:
+    return Backend(
+        MOCK_LOGGER,
+        url=url,
+        default_key_path="path1",
+        readiness_timeout=0.2,
+        enable_cache=True,
+        persistent_cache_path=cache_path,
+        **kwargs,
+    )
+
+
+def test_persistent_cache(tmp_path):
+    """Test entries are written atomically with owner-only permissions"""
+    cache_path = str(tmp_path / "cache" / "vault.json")
+    cache = PersistentCache(cache_path, max_age=60)
+    assert cache.load() == {}
+
+    cache.store("path1", {"k_1": "v1"})
+    cache.store("path2", {"k_1": "v2"}, fetched_at=time.time() - 120)
+    cache.flush()
+    assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+    assert os.listdir(tmp_path / "cache") == ["vault.json"]
+
+    entries = PersistentCache(cache_path, max_age=60).load()
+    assert list(entries) == ["path1"]
+    assert entries["path1"][0] == {"k_1": "v1"}
+
+    cache.purge("path1")
+    assert list(PersistentCache(cache_path).load()) == ["path2"]
+    cache.purge()
+    assert not os.path.exists(cache_path)
+
+    # Purging all entries cancels a pending write
+    cache.store("path3", {"k_1": "v3"})
+    cache.purge()
+    assert cache._timer is None
+    assert not os.path.exists(cache_path)
+
+
+def test_persistent_cache_debounced(tmp_path):
+    """Test entries stored within the write delay are written at once, in
+    background"""
+    cache_path = str(tmp_path / "vault.json")
+    cache = PersistentCache(cache_path, write_delay=0.1)
+    for i in range(10):
+        cache.store(f"path{i}", {"k_1": str(i)})
+    assert cache.writes == 0
+    assert not os.path.exists(cache_path)
+
+    time.sleep(0.3)
+    assert cache.writes == 1
+    assert len(PersistentCache(cache_path).load()) == 10
+    # Nothing left to write
+    cache.flush()
+    assert cache.writes == 1
+
+
+def test_persistent_cache_unsafe(tmp_path):
+    """Test files readable by others are rejected"""
+    cache_path = str(tmp_path / "vault.json")
+    with open(cache_path, "w") as f:
+        json.dump({"version": 1, "entries": {}}, f)
+    os.chmod(cache_path, 0o644)
+    with pytest.raises(Exception):
+        PersistentCache(cache_path).load()
+
+
+def test_warm_start(vault_stub, tmp_path):
+    """Test key-value stores are served from the persistent cache on start,
+    and read again from Vault in the background"""
+    cache_path = str(tmp_path / "vault.json")
+    bk = make_backend(vault_stub.url, cache_path)
+    assert bk._revalidate_thread is None
+    assert bk.get("k_1") == "secret_1"
+    assert bk.get("k_3", path="path2") == "secret_3"
+    bk.close()
+    assert list(PersistentCache(cache_path).load()) == ["path1", "path2"]
+
+    # Agent is down: values are served from the persistent cache
+    vault_stub.ready = False
+    vault_stub.store["path1"]["k_1"] = "secret_1_updated"
+    vault_stub.requests.clear()
+    bk = make_backend(vault_stub.url, cache_path)
+    assert bk.get("k_1") == "secret_1"
+    assert bk.get("k_3", path="path2") == "secret_3"
+    bk._revalidate_thread.join()
+    assert vault_stub.data_requests() == []
+    assert bk.get("k_1") == "secret_1"
+
+    # Agent is up: values are revalidated in the background
+    vault_stub.ready = True
+    bk = make_backend(vault_stub.url, cache_path)
+    bk._revalidate_thread.join()
+    assert bk.get("k_1") == "secret_1_updated"
+    assert sorted(vault_stub.data_requests()) == ["/v1/path1", "/v1/path2"]
+    bk.close()
+    assert PersistentCache(cache_path).load()["path1"][0]["k_1"] == "secret_1_updated"
+
+
+def test_warm_start_fetched_at(vault_stub, tmp_path):
+    """Test entries loaded from the persistent cache keep the time they were
+    read at, and are served even if expired until read again"""
+    cache_path = str(tmp_path / "vault.json")
+    fetched_at = time.time() - 3600
+    cache = PersistentCache(cache_path)
+    cache.store("path1", {"k_1": "old"}, fetched_at=fetched_at)
+    cache.flush()
+
+    vault_stub.ready = False
+    bk = make_backend(vault_stub.url, cache_path, cache_ttl=600)
+    assert bk.cache.get_entry("path1").fetched_at == fetched_at
+    assert bk.get("k_1") == "old"
+    bk._revalidate_thread.join()
+    assert bk.get("k_1") == "old"
+
+    vault_stub.ready = True
+    bk = make_backend(vault_stub.url, cache_path, cache_ttl=600)
+    bk._revalidate_thread.join()
+    assert bk.get("k_1") == "secret_1"
+    assert bk.cache.get_entry("path1").fetched_at > fetched_at
+    bk.close()
+
+
+def test_warm_start_max_age(vault_stub, tmp_path):
+    """Test entries older than max age are read from Vault"""
+    cache_path = str(tmp_path / "vault.json")
+    cache = PersistentCache(cache_path)
+    cache.store("path1", {"k_1": "old"}, fetched_at=time.time() - 3600)
+    cache.flush()
+    bk = make_backend(vault_stub.url, cache_path, persistent_cache_max_age=60)
+    assert bk._revalidate_thread is None
+    assert bk.get("k_1") == "secret_1"
+
+    bk.purge_persistent_cache()
+    assert not os.path.exists(cache_path)
+    assert bk.get("k_1") == "secret_1"
+
+
+def test_warm_start_invalid_file(vault_stub, tmp_path):
+    """Test invalid cache files are ignored"""
+    cache_path = str(tmp_path / "vault.json")
+    with open(cache_path, "w") as f:
+        f.write("not json")
+    os.chmod(cache_path, 0o600)
+    bk = make_backend(vault_stub.url, cache_path)
+    assert bk.get("k_1") == "secret_1"
+    bk.close()
+    assert list(PersistentCache(cache_path).load()) == ["path1"]
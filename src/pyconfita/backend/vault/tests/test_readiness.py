@@ -0,0 +1,179 @@
+import time
+from dataclasses import dataclass
+from unittest import mock
+
+from pyconfita.backend.vault.readiness import Readiness
+from pyconfita.backend.vault.vault import Backend
+from pyconfita.logging_interface import DummyLoggingInterface
+
+MOCK_LOGGER = DummyLoggingInterface()
+MOCK_VAULT_STORE = {"path1": {"data": {"k_1": "secret_1"}}}
+
+
+class CountingProbe:
+    """Probe answering a list of results, counting calls"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if len(self.results) > 1:
+            return self.results.pop(0)
+        return self.results[0]
+
+
+def test_success_is_remembered():
+    """Test a successful probe is remembered for ttl seconds"""
+    probe = CountingProbe([True])
+    readiness = Readiness(probe=probe, logger=MOCK_LOGGER, timeout=1, ttl=0.2)
+
+    assert readiness.wait()
+    assert readiness.wait()
+    assert probe.calls == 1
+
+    time.sleep(0.25)
+    assert readiness.wait()
+    assert probe.calls == 2
+
+
+def test_failure_backoff():
+    """Test failed probes are retried with exponential backoff until
+    success"""
+    results = iter([Exception("connection refused"), False, False, False, True])
+
+    def raising_probe():
+        res = next(results)
+        if isinstance(res, Exception):
+            raise res
+        return res
+
+    delays = []
+    real_sleep = time.sleep
+
+    def recording_sleep(delay):
+        delays.append(delay)
+        real_sleep(delay)
+
+    readiness = Readiness(
+        probe=raising_probe,
+        logger=MOCK_LOGGER,
+        timeout=5,
+        initial_backoff=0.01,
+        max_backoff=0.04,
+    )
+    with mock.patch("time.sleep", side_effect=recording_sleep):
+        assert readiness.wait()
+
+    assert len(delays) == 4
+    # Jitter: delay in [backoff / 2, backoff]
+    for delay, backoff in zip(delays, [0.01, 0.02, 0.04, 0.04]):
+        assert backoff / 2 <= delay <= backoff
+
+
+def test_failure_timeout():
+    """Test wait returns False once timeout is reached"""
+    probe = CountingProbe([False])
+    readiness = Readiness(
+        probe=probe, logger=MOCK_LOGGER, timeout=0.3, max_backoff=0.05
+    )
+
+    start = time.time()
+    assert not readiness.wait()
+    assert time.time() - start < 0.5
+    assert probe.calls > 2
+    assert not readiness.is_ready()
+
+
+def test_pin_and_reset():
+    """Test pinned readiness ignores ttl until reset"""
+    probe = CountingProbe([True])
+    readiness = Readiness(probe=probe, logger=MOCK_LOGGER, timeout=1, ttl=0)
+
+    assert readiness.wait()
+    readiness.pin()
+    assert readiness.wait()
+    assert probe.calls == 1
+
+    readiness.reset()
+    assert not readiness.is_ready()
+    assert readiness.wait()
+    assert probe.calls == 2
+
+
+@dataclass
+class MockResponse:
+    status_code: int
+
+
+def test_backend_probes_once():
+    """Test uncached reads do not probe the agent while readiness is known,
+    and probe again after a failed read"""
+    probe_calls = []
+
+    def mocked_readiness(*args, **kwargs):
+        probe_calls.append(1)
+        return MockResponse(status_code=200)
+
+    def mocked_read(path, *args, **kwargs):
+        if path == "broken":
+            raise Exception("connection reset")
+        return MOCK_VAULT_STORE.get(path, None)
+
+    with mock.patch("requests.Session.get", side_effect=mocked_readiness):
+        with mock.patch("hvac.v1.Client.read", side_effect=mocked_read):
+            bk = Backend(MOCK_LOGGER, default_key_path="path1", readiness_timeout=1)
+
+            start = time.time()
+            assert bk.get("k_1") == "secret_1"
+            assert bk.get("k_1") == "secret_1"
+            assert bk.get_struct({"k_1": str}) == {"k_1": "secret_1"}
+            assert time.time() - start < 0.5
+            assert len(probe_calls) == 1
+
+            try:
+                bk.get("k_1", path="broken")
+            except Exception:
+                pass
+            assert bk.get("k_1") == "secret_1"
+            assert len(probe_calls) == 2
+
+
+def test_backend_await_ready():
+    """Test await_ready pins readiness whatever readiness_ttl"""
+    probe_calls = []
+
+    def mocked_readiness(*args, **kwargs):
+        probe_calls.append(1)
+        return MockResponse(status_code=200)
+
+    with mock.patch("requests.Session.get", side_effect=mocked_readiness):
+        with mock.patch(
+            "hvac.v1.Client.read", side_effect=lambda x: MOCK_VAULT_STORE.get(x)
+        ):
+            bk = Backend(
+                MOCK_LOGGER,
+                default_key_path="path1",
+                readiness_timeout=1,
+                readiness_ttl=0,
+            )
+            assert bk.await_ready()
+            assert bk.get("k_1") == "secret_1"
+            assert bk.get("k_1") == "secret_1"
+            assert len(probe_calls) == 1
+
+
+def test_backend_probe_session(vault_stub):
+    """Test probes share the keep-alive session of reads of the thread"""
+    bk = Backend(
+        MOCK_LOGGER,
+        url=vault_stub.url,
+        default_key_path="path1",
+        readiness_ttl=0,
+    )
+    for _ in range(3):
+        assert bk.get("k_1") == "secret_1"
+    assert vault_stub.requests.count("/") == 3
+    assert len(vault_stub.client_ports) == 1
+    bk.close()
@@ -203,19 +203,19 @@ def mocked_readiness_timeout(*args, **kwargs):
 
 def test_is_agent_ready():
     """Check is_agent_ready behavior"""
-    with mock.patch("requests.get", side_effect=mocked_readiness):
+    with mock.patch("requests.Session.get", side_effect=mocked_readiness):
         timeout = 1
         bk = Backend(MOCK_LOGGER, readiness_timeout=timeout)
         is_ready = bk.is_agent_ready()
         assert is_ready
 
-    with mock.patch("requests.get", side_effect=mocked_readiness_failure):
+    with mock.patch("requests.Session.get", side_effect=mocked_readiness_failure):
         timeout = 1
         bk = Backend(MOCK_LOGGER, readiness_timeout=timeout)
         is_ready = bk.is_agent_ready()
         assert not is_ready
 
-    with mock.patch("requests.get", side_effect=mocked_readiness_timeout):
+    with mock.patch("requests.Session.get", side_effect=mocked_readiness_timeout):
         timeout = 1
         bk = Backend(MOCK_LOGGER, readiness_timeout=timeout)
         is_ready = bk.is_agent_ready()
@@ -255,3 +255,74 @@ def test_get_struct():
             assert res.get("k_4") == True
             assert res.get("k_5") == False
             assert res.get("k_6") == 10
+
+
+def test_get_many():
+    with mock.patch(
+        "hvac.v1.Client.read", side_effect=lambda x: mocked_requests_read(x)
+    ):
+        with mock.patch(
+            "pyconfita.backend.vault.vault.Backend.is_agent_ready",
+            side_effect=mocked_is_ready,
+        ):
+            bk = Backend(
+                MOCK_LOGGER,
+                readiness_timeout=MOCK_VAULT_TIMEOUT,
+                default_key_path=MOCK_VAULT_DATA_PATH,
+            )
+
+            res = bk.get_many({"k_1": str, "k_3": str, "k_6": int})
+            assert res == {"k_1": "secret_1", "k_6": 10}
+
+
+MOCK_VAULT_MULTI_STORE = {
+    f"path{i}": {"data": {"k_1": f"secret_1_path{i}", "k_2": f"secret_2_path{i}"}}
+    for i in range(4)
+}
+
+
+def test__get_multiple_keys_reads_each_path_once():
+    """Check _get_multiple_keys reads each path once, and distinct paths
+    concurrently"""
+    reads = []
+
+    def mocked_slow_read(path, *args, **kwargs):
+        reads.append(path)
+        time.sleep(0.2)
+        return MOCK_VAULT_MULTI_STORE.get(path, None)
+
+    with mock.patch("hvac.v1.Client.read", side_effect=mocked_slow_read):
+        bk = Backend(MOCK_LOGGER, readiness_timeout=MOCK_VAULT_TIMEOUT, max_workers=4)
+
+        obj = {
+            f"p{i}_{k}": KeyRef(path=f"path{i}", key=k)
+            for i in range(4)
+            for k in ["k_1", "k_2", "k_3"]
+        }
+        start = time.time()
+        res = bk._get_multiple_keys(obj)
+        elapsed = time.time() - start
+
+        assert sorted(reads) == ["path0", "path1", "path2", "path3"]
+        # Concurrent reads: roughly the slowest read, not the sum of reads
+        assert elapsed < 0.6
+        assert res.get("p0_k_1") == "secret_1_path0"
+        assert res.get("p3_k_2") == "secret_2_path3"
+        assert res.get("p2_k_3") is None
+        assert len(res.keys()) == len(obj.keys())
+
+
+def test__get_multiple_keys_sequential():
+    """Check _get_multiple_keys reads paths sequentially with one worker"""
+    with mock.patch(
+        "hvac.v1.Client.read",
+        side_effect=lambda x: MOCK_VAULT_MULTI_STORE.get(x, None),
+    ):
+        bk = Backend(MOCK_LOGGER, readiness_timeout=MOCK_VAULT_TIMEOUT, max_workers=1)
+
+        obj = {
+            "a": KeyRef(path="path0", key="k_1"),
+            "b": KeyRef(path="path1", key="k_1"),
+        }
+        res = bk._get_multiple_keys(obj)
+        assert res == {"a": "secret_1_path0", "b": "secret_1_path1"}
@@ -1,14 +1,39 @@
-import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List, Mapping
+import threading
+import time
+import weakref
+
 import hvac
 import requests
-from cacheout import Cache
 
 from pyconfita.backend.backend import Backend as _Backend
+from pyconfita.backend.vault.cache import KVStoreCache, KEY_NOT_FOUND_IN_CACHE
+from pyconfita.backend.vault.persistent import PersistentCache
+from pyconfita.backend.vault.readiness import Readiness
+from pyconfita.fork import register_after_fork
 from pyconfita.logging_interface import LoggingInterface
-
-KEY_NOT_FOUND_IN_CACHE = "__key_not_found_in_cache__"
+from pyconfita.metrics_interface import MetricsInterface, NOOP_METRICS
+from pyconfita.schema import Schema
+from pyconfita.singleflight import SingleFlight
+from pyconfita.tracing_interface import (
+    TracerInterface,
+    NOOP_TRACER,
+    PATH,
+    BACKEND,
+    OUTCOME,
+)
+
+
+def raise_path_not_found(logger: LoggingInterface, path: str) -> None:
+    """
+    Log and raise the error of a read of a path not found in Vault, e.g.
+    mistyped.
+    """
+    message = f"[Vault] No key-value store found at path={path}"
+    logger.log(**{"level": "error", "message": {"message": message}})
+    raise Exception(message)
 
 
 @dataclass
@@ -22,15 +47,24 @@ class KeyRef:
     key: str
 
     def get_cache_key(self) -> str:
-        return f"{self.key}"
+        return f"{self.path}:{self.key}"
 
 
 class Backend(_Backend):
     """
     Load a key from Vault key-value store.
+
+    Thread-safe: each thread sends requests with its own Vault client and
+    keep-alive HTTP session (requests does not promise that a Session is
+    thread-safe), and concurrent cache misses on a path share one read.
+    Paths are read concurrently on a thread pool kept by the backend, so that
+    its threads keep their sessions between reads.
     """
 
     name: str = "vault"
+    # Secrets change without a new generation: cached by the Vault cache,
+    # with its ttl, not by Confita
+    cacheable: bool = False
 
     def __init__(
         self,
@@ -52,72 +86,362 @@ class Backend(_Backend):
         :param url: Vault agent URL, defaults to http://localhost:8200
         :param readiness_timeout: timeout, defaults to 30 seconds
         :param enable_cache: bool, True to enable caching key-value stores
+        :param kwargs:
+            - cache_maxsize: maximum number of cached entries, defaults to 1024
+            - cache_ttl: cache entries time to live, defaults to 600 seconds
+            - cache_stale_grace: time an expired entry is still served, right
+            away, while it is reloaded in background, defaults to 0 seconds
+            - refresh_ahead: bool, True to reload recently read paths in
+            background before they expire, defaults to False. The background
+            thread is started on the first read, and stopped by close
+            - refresh_ahead_ratio: fraction of cache_ttl after which a path is
+            reloaded, defaults to 0.8
+            - refresh_interval: delay between two checks of the background
+            thread, defaults to 1 second
+            - max_workers: maximum number of key-value stores read
+            concurrently, defaults to 8
+            - read_timeout: timeout of one request to Vault agent, defaults to
+            30 seconds
+            - readiness_ttl: time a successful readiness probe is remembered,
+            defaults to 60 seconds
+            - readiness_backoff: delay before retrying a failed readiness
+            probe, doubled on each failure, defaults to 0.05 seconds
+            - readiness_max_backoff: maximum delay between readiness probes,
+            defaults to 1 second
+            - persistent_cache_path: file persisting cached key-value stores,
+            loaded on start to serve them right away while they are read again
+            from Vault in a background thread. Requires enable_cache, defaults
+            to None (disabled)
+            - persistent_cache_max_age: maximum age of key-value stores loaded
+            from persistent_cache_path, defaults to 86400 seconds
+            - persistent_cache_write_delay: delay between caching a key-value
+            store and writing persistent_cache_path in a background thread,
+            batching writes, defaults to 1 second
+            - kv_version: 1, or 2 to read KV v2 secrets at
+            <mount_point>/data/<path>, defaults to 1. With caching enabled,
+            the version of each key-value store is remembered, and expired
+            entries are revalidated by reading metadata only: data is read
+            again only if the version changed
+            - mount_point: mount point of the KV v2 secrets engine, defaults
+            to secret
+            - pinned_versions: dict, path -> version of the KV v2 secret read
+            at path, defaults to the current versions
+            - metrics: metrics interface, defaults to no-op
+            - tracer: tracer interface, defaults to no-op
         """
         self.default_key_path = default_key_path
         self.url = url
         self.readiness_timeout = readiness_timeout
-        self.cli = hvac.Client(self.url)
+        self.max_workers = kwargs.get("max_workers", 8)
+        self.read_timeout = kwargs.get("read_timeout", 30)
+        # Vault client of each thread, and all live clients, closed by close
+        self._local = threading.local()
+        self._clients = weakref.WeakSet()
+        self._clients_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
         if logger is None:
             raise Exception("Vault logger must not be None")
         self.logger = logger
+        self.readiness = Readiness(
+            probe=self._probe,
+            logger=self.logger,
+            timeout=self.readiness_timeout,
+            ttl=kwargs.get("readiness_ttl", 60),
+            initial_backoff=kwargs.get("readiness_backoff", 0.05),
+            max_backoff=kwargs.get("readiness_max_backoff", 1.0),
+        )
+        self.kv_version = kwargs.get("kv_version", 1)
+        if self.kv_version not in (1, 2):
+            raise Exception(f"Unsupported KV version: {self.kv_version}")
+        self.mount_point = kwargs.get("mount_point", "secret")
+        self.pinned_versions: Dict[str, int] = dict(kwargs.get("pinned_versions") or {})
         self.cache = None
         self.enable_cache = enable_cache
+        self.refresh_ahead = False
         if self.enable_cache:
             maxsize = kwargs.get("cache_maxsize", 1024)
             ttl = kwargs.get("cache_ttl", 600)  # Defaults to 10min
-            self.cache = Cache(maxsize=maxsize, ttl=ttl)
-
-    def is_agent_ready(self) -> bool:
+            stale_grace = kwargs.get("cache_stale_grace", 0)
+            self.cache = KVStoreCache(maxsize=maxsize, ttl=ttl, stale_grace=stale_grace)
+            self.refresh_ahead = kwargs.get("refresh_ahead", False)
+        # Concurrent cache misses on a path share one read
+        self._flight = SingleFlight()
+        self.metrics = kwargs.get("metrics") or NOOP_METRICS
+        self.tracer = kwargs.get("tracer") or NOOP_TRACER
+
+        # Warm start from the persistent cache: paths served, even expired,
+        # until read again from Vault
+        self.persistent_cache = None
+        self._warm_paths = set()
+        self._revalidate_thread = None
+        persistent_cache_path = kwargs.get("persistent_cache_path")
+        if self.enable_cache and persistent_cache_path is not None:
+            self.persistent_cache = PersistentCache(
+                persistent_cache_path,
+                max_age=kwargs.get("persistent_cache_max_age", 86400),
+                write_delay=kwargs.get("persistent_cache_write_delay", 1.0),
+                logger=self.logger,
+            )
+            self._warm_start()
+
+        # Refresh-ahead: paths read recently, with last access time. The
+        # refresh thread is started on the first read
+        self._hot_paths: Dict[str, float] = {}
+        self._refresh_thread = None
+        self._refresh_lock = threading.Lock()
+        self._refresh_stop = threading.Event()
+        if self.refresh_ahead:
+            self.refresh_ahead_ratio = kwargs.get("refresh_ahead_ratio", 0.8)
+            self.refresh_interval = kwargs.get("refresh_interval", 1.0)
+        register_after_fork(self)
+
+    def _warm_start(self) -> None:
         """
-        Wait for Vault agent readiness until timeout.
+        Cache key-value stores loaded from the persistent cache, with the
+        time they were read at, then read them again from Vault in a
+        background thread. Until read again, they are served even if expired.
+        """
+        try:
+            entries = self.persistent_cache.load()
+        except Exception as e:
+            self.logger.log(
+                **{
+                    "level": "warning",
+                    "message": {
+                        "message": f"[Vault] Ignoring persistent cache"
+                        f" {self.persistent_cache.file_path}: {e}"
+                    },
+                }
+            )
+            return
+        if not entries:
+            return
+        for path, (kv_store, fetched_at) in entries.items():
+            self.cache.set_kv_store(path, kv_store, fetched_at=fetched_at)
+        self._warm_paths = set(entries)
+        self._revalidate_thread = threading.Thread(
+            target=self.revalidate,
+            args=(list(entries),),
+            name="pyconfita-vault-revalidate",
+            daemon=True,
+        )
+        self._revalidate_thread.start()
 
-        :return:
+    def revalidate(self, paths: List[str]) -> int:
         """
-        is_ready = False
-        start_time = time.time()
-        t = 0
-        while not is_ready and t < self.readiness_timeout:
+        Read key-value stores at paths from Vault, once ready, and cache them.
+        On failure, cached key-value stores are kept.
+        Returns the number of paths read.
+        """
+        if not self.readiness.wait():
+            return 0
+        revalidated = 0
+        for path in paths:
             try:
-                res = requests.get(self.url)
-                is_ready = res.status_code in [200, 201, 202, 203, 204]
-            except Exception as e:
-                self.logger.log(
-                    **{
-                        "level": "debug",
-                        "message": {"message": f"Waiting Vault agent, t = {t}"},
-                    }
-                )
-                is_ready = False
+                kv_store = self._get_kv_store(path=path)
+            except Exception:
+                continue
+            self._cache_kv_store(path=path, kv_store=kv_store)
+            revalidated += 1
+        return revalidated
+
+    def purge_persistent_cache(self, path: Optional[str] = None) -> None:
+        """
+        Drop the key-value store persisted for path, or the whole persistent
+        cache file if path is None. The in-memory cache is kept.
 
-            # Increment timer
-            time.sleep(1)
-            t = time.time() - start_time
+        :param path:
+        :return:
+        """
+        if self.persistent_cache is not None:
+            self.persistent_cache.purge(path)
 
-        if not is_ready:
-            self.logger.log(
-                **{
-                    "level": "error",
-                    "message": {"message": f"Vault agent is not ready"},
-                }
+    def _start_refresh_thread(self) -> None:
+        """
+        Start the refresh-ahead thread, unless already started.
+        """
+        with self._refresh_lock:
+            if self._refresh_thread is not None:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_ahead_loop,
+                name="pyconfita-vault-refresh",
+                daemon=True,
             )
+            self._refresh_thread.start()
 
-        self.logger.log(
-            **{
-                "level": "info",
-                "message": {"message": f"Vault agent is ready!"},
-            }
+    def _after_fork(self) -> None:
+        """
+        Reset state inherited from the parent process, in a forked child: the
+        Vault clients (and their HTTP sessions) and the thread pool are
+        created again, cached key-value stores are dropped, and the
+        refresh-ahead thread is started again on the next read.
+        """
+        self._local = threading.local()
+        self._clients = weakref.WeakSet()
+        self._clients_lock = threading.Lock()
+        self._executor = None
+        if self.cache is not None:
+            self.cache.reset()
+        self._flight = SingleFlight()
+        self._warm_paths = set()
+        if self.persistent_cache is not None:
+            self.persistent_cache._after_fork()
+        self._hot_paths = {}
+        self._refresh_lock = threading.Lock()
+        self._refresh_stop = threading.Event()
+        self._refresh_thread = None
+
+    @property
+    def cli(self) -> hvac.Client:
+        """
+        Vault client of the calling thread, created on its first request.
+        """
+        cli = getattr(self._local, "cli", None)
+        if cli is None:
+            cli = self._local.cli = self._make_client()
+            with self._clients_lock:
+                self._clients.add(cli)
+        return cli
+
+    def _make_client(self) -> hvac.Client:
+        """
+        Returns a Vault client with its own keep-alive HTTP session.
+        """
+        return hvac.Client(
+            self.url, timeout=self.read_timeout, session=requests.Session()
         )
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Returns the thread pool reading paths concurrently, created on first
+        use with max_workers threads.
+        """
+        if self._executor is None:
+            with self._clients_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="pyconfita-vault",
+                    )
+        return self._executor
+
+    def close(self) -> None:
+        """
+        Stop the background refresh thread, if any, write pending entries of
+        the persistent cache, stop the thread pool, and release keep-alive
+        connections of all threads.
+        """
+        self._refresh_stop.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+            self._refresh_thread = None
+        if self.persistent_cache is not None:
+            self.persistent_cache.flush()
+        with self._clients_lock:
+            executor, self._executor = self._executor, None
+            clients = list(self._clients)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for cli in clients:
+            cli.adapter.close()
+
+    def get_cache_stats(self) -> dict:
+        """
+        Returns cache counters: hits, misses, stale values served, refreshes
+        and refresh latency, KV v2 version checks. Empty if caching is disabled.
+        """
+        if not self.enable_cache:
+            return {}
+        return self.cache.stats.as_dict()
+
+    @property
+    def metrics(self) -> MetricsInterface:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: MetricsInterface) -> None:
+        self._metrics = metrics
+        self.readiness.metrics = metrics
+        if self.cache is not None:
+            self.cache.metrics = metrics
+
+    @property
+    def tracer(self) -> TracerInterface:
+        return self._tracer
+
+    @tracer.setter
+    def tracer(self, tracer: TracerInterface) -> None:
+        self._tracer = tracer
+        self.readiness.tracer = tracer
+        if self.cache is not None:
+            self.cache.tracer = tracer
+
+    def _observe_read(self, start: float, result: str) -> None:
+        if self._metrics.enabled:
+            self._metrics.observe(
+                "pyconfita_vault_read_seconds",
+                time.perf_counter() - start,
+                {"result": result},
+            )
+
+    def _probe(self) -> bool:
+        """
+        Returns True if Vault agent answers with a success status code.
+        """
+        res = self.cli.adapter.session.get(self.url, timeout=self.read_timeout)
+        return res.status_code in [200, 201, 202, 203, 204]
+
+    def is_agent_ready(self) -> bool:
+        """
+        Wait for Vault agent readiness until timeout.
+        Readiness is remembered for readiness_ttl seconds after a successful
+        probe: no request is sent to the agent meanwhile.
+
+        :return:
+        """
+        return self.readiness.wait()
+
+    def await_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for Vault agent readiness until timeout (defaults to
+        readiness_timeout), and remember it until a read fails.
+        Meant to be called once at startup, so that reads never probe the
+        agent.
+
+        :param timeout:
+        :return:
+        """
+        is_ready = self.readiness.wait(timeout=timeout)
+        if is_ready:
+            self.readiness.pin()
         return is_ready
 
     def _get_kv_store(self, path: str) -> dict:
         """
-        Return key-value store at path
+        Return key-value store at path. Raises if path is not found.
         """
+        if not self._tracer.enabled:
+            return self._read_kv_store(path)
+        with self._tracer.start_span(
+            "pyconfita.vault.read", {PATH: path, BACKEND: self.name}
+        ) as span:
+            kv_store = self._read_kv_store(path)
+            span.set_attribute(OUTCOME, "ok")
+        return kv_store
+
+    def _read_kv_store(self, path: str) -> dict:
+        start = time.perf_counter()
         try:
-            kv_store = self.cli.read(path)
-            return kv_store.get("data", {})
+            if self.kv_version == 2:
+                kv_store = self._read_kv2_store(path)
+            else:
+                res = self.cli.read(path)
+                kv_store = None if res is None else res.get("data", {})
+            self._observe_read(start, "ok")
         except Exception as e:
+            self._observe_read(start, "error")
+            self.readiness.reset()
             self.logger.log(
                 **{
                     "level": "error",
@@ -128,6 +452,64 @@ class Backend(_Backend):
                 }
             )
             raise e
+        if kv_store is None:
+            raise_path_not_found(self.logger, path)
+        return kv_store
+
+    def _read_kv2_store(self, path: str) -> Optional[dict]:
+        """
+        Return the KV v2 secret at path, in its pinned version if any. With
+        caching enabled, the data is only read if its version changed since
+        the last read (checked with a metadata read, or against the pinned
+        version). Returns None if path (or its pinned version) is not found.
+        """
+        pinned = self.pinned_versions.get(path)
+        known = self.cache.get_version(path) if self.enable_cache else None
+        if known is not None:
+            version = pinned if pinned is not None else self._read_kv2_version(path)
+            unchanged = version == known[0]
+            self._record_version_check(unchanged)
+            if unchanged:
+                return known[1]
+
+        try:
+            res = self.cli.secrets.kv.v2.read_secret_version(
+                path=path, version=pinned, mount_point=self.mount_point
+            )
+        except hvac.exceptions.InvalidPath:
+            if self.enable_cache:
+                self.cache.set_version(path, None, {})
+            return None
+        secret = (res or {}).get("data") or {}
+        kv_store = secret.get("data") or {}
+        if self.enable_cache:
+            version = (secret.get("metadata") or {}).get("version")
+            self.cache.set_version(path, version, kv_store)
+        return kv_store
+
+    def _read_kv2_version(self, path: str) -> Optional[int]:
+        """
+        Returns the current version of the KV v2 secret at path, None if not
+        found.
+        """
+        try:
+            res = self.cli.secrets.kv.v2.read_secret_metadata(
+                path=path, mount_point=self.mount_point
+            )
+        except hvac.exceptions.InvalidPath:
+            return None
+        return ((res or {}).get("data") or {}).get("current_version")
+
+    def _record_version_check(self, unchanged: bool) -> None:
+        if unchanged:
+            self.cache.stats.increment("version_unchanged")
+        else:
+            self.cache.stats.increment("version_changed")
+        if self._metrics.enabled:
+            self._metrics.increment(
+                "pyconfita_vault_version_checks_total",
+                labels={"result": "unchanged" if unchanged else "changed"},
+            )
 
     def _get_key(self, k_ref: KeyRef) -> Optional[str]:
         """
@@ -136,21 +518,7 @@ class Backend(_Backend):
         :param k_ref:
         :return:
         """
-        v = None
-        try:
-            kv_store = self.cli.read(k_ref.path)
-            return kv_store.get("data", {}).get(k_ref.key, None)
-        except Exception as e:
-            self.logger.log(
-                **{
-                    "level": "error",
-                    "message": {
-                        "message": f"[Vault] Error reading key={k_ref.key}"
-                        f" at path={k_ref.path}: {e}"
-                    },
-                }
-            )
-            raise e
+        return self._get_kv_store(k_ref.path).get(k_ref.key, None)
 
     def _get_multiple_keys(self, k_refs: Dict[str, KeyRef]) -> dict:
         """
@@ -171,10 +539,31 @@ class Backend(_Backend):
                 ...
             }
 
+        Each path is read once, and distinct paths are read concurrently.
+
         :param k_refs:
         :return:
         """
-        return {kname: self._get_key(sec_ref) for kname, sec_ref in k_refs.items()}
+        paths = list(dict.fromkeys(k_ref.path for k_ref in k_refs.values()))
+        kv_stores = self._get_kv_stores(paths)
+        return {
+            kname: kv_stores[k_ref.path].get(k_ref.key, None)
+            for kname, k_ref in k_refs.items()
+        }
+
+    def _get_kv_stores(self, paths: List[str]) -> Dict[str, dict]:
+        """
+        Return key-value stores at paths, read concurrently on the thread
+        pool of the backend, bounded by max_workers.
+
+        :param paths:
+        :return:
+        """
+        if len(paths) <= 1 or self.max_workers <= 1:
+            return {path: self._get_kv_store(path=path) for path in paths}
+
+        executor = self._get_executor()
+        return dict(zip(paths, executor.map(self._get_kv_store, paths)))
 
     def _get_key_when_ready(self, k_ref: KeyRef) -> Optional[str]:
         """
@@ -254,27 +643,159 @@ class Backend(_Backend):
         Cache key-value store (loaded from path) if caching is enabled.
         """
         if self.enable_cache:
-            for k, v in kv_store.items():
-                cache_key = KeyRef(path=path, key=k).get_cache_key()
-                try:
-                    self.cache.set(cache_key, v)
-                    self.logger.log(
-                        **{
-                            "level": "debug",
-                            "message": {"message": f"[Vault] Set key {k}" f" in cache"},
-                        }
-                    )
-                except Exception as e:
-                    self.logger.log(
-                        **{
-                            "level": "error",
-                            "message": {
-                                "message": f"[Vault] Failed to cache value"
-                                f" for key {k}"
-                            },
-                        }
-                    )
-                    raise e
+            try:
+                self.cache.set_kv_store(path, kv_store)
+            except Exception as e:
+                self.logger.log(
+                    **{
+                        "level": "error",
+                        "message": {
+                            "message": f"[Vault] Failed to cache key-value"
+                            f" store at path={path}"
+                        },
+                    }
+                )
+                raise e
+            self._warm_paths.discard(path)
+            self.logger.log_deferred(
+                level="debug",
+                message_factory=lambda: {
+                    "message": f"[Vault] Set key-value store at path={path}"
+                    f" in cache"
+                },
+            )
+            if self.persistent_cache is not None:
+                self._persist_kv_store(path=path, kv_store=kv_store)
+
+    def _persist_kv_store(self, path: str, kv_store: dict) -> None:
+        """
+        Record key-value store in the persistent cache, written in
+        background. Failures are logged, and do not fail reads.
+        """
+        try:
+            self.persistent_cache.store(path, kv_store)
+        except Exception as e:
+            self.logger.log(
+                **{
+                    "level": "warning",
+                    "message": {
+                        "message": f"[Vault] Failed to persist key-value store"
+                        f" at path={path}: {e}"
+                    },
+                }
+            )
+
+    def _get_cached_kv_store(self, path: str) -> dict:
+        """
+        Return key-value store at path
+        - from cache if enabled
+        - from expired cache entry (within stale grace, or loaded from the
+        persistent cache), right away, while it is reloaded in a background
+        thread
+        - directly when Vault is ready, caching it if enabled. Concurrent
+        cache misses on path wait for the first one to read it, and share its
+        result or error
+        """
+        if not self.enable_cache:
+            return self._get_kv_store_when_ready(path=path)
+
+        if self.refresh_ahead:
+            self._hot_paths[path] = time.time()
+            if self._refresh_thread is None:
+                self._start_refresh_thread()
+        kv_store = self.cache.get_kv_store(path)
+        if kv_store is not None:
+            return kv_store
+        if self.cache.stale_grace or path in self._warm_paths:
+            kv_store = self.cache.get_stale_kv_store(path)
+            if kv_store is not None:
+                self.cache.record_stale_served()
+                self._flight.start(
+                    path, lambda: self._reload_kv_store(path), self._get_executor()
+                )
+                return kv_store
+        self.logger.log_deferred(
+            level="debug",
+            message_factory=lambda: {
+                "message": f"[Vault] key-value store at path={path} not"
+                f" found in cache"
+            },
+        )
+        kv_store, shared = self._flight.do(path, lambda: self._load_kv_store(path))
+        if shared:
+            self.cache.stats.increment("coalesced")
+        return kv_store
+
+    def _load_kv_store(self, path: str) -> dict:
+        """
+        Read key-value store at path after a cache miss, and cache it.
+        """
+        # A concurrent read may have cached path since the cache lookup
+        kv_store = self.cache.peek_kv_store(path)
+        if kv_store is not None:
+            return kv_store
+        kv_store = self._get_kv_store_when_ready(path=path)
+        self._cache_kv_store(path=path, kv_store=kv_store)
+        return kv_store
+
+    def _reload_kv_store(self, path: str) -> dict:
+        """
+        Read key-value store at path in background (expired, or refreshed
+        ahead), and cache it. On failure, the cached entry is kept, and an
+        expired one is served until its stale grace ends.
+        """
+        start = time.time()
+        try:
+            kv_store = self._get_kv_store_when_ready(path=path)
+        except Exception as e:
+            self.cache.stats.increment("refresh_failures")
+            self.logger.log(
+                **{
+                    "level": "warning",
+                    "message": {
+                        "message": f"[Vault] Failed to reload key-value store"
+                        f" at path={path}, keeping cached entry: {e}"
+                    },
+                }
+            )
+            raise e
+        self._cache_kv_store(path=path, kv_store=kv_store)
+        self.cache.stats.record_refresh(time.time() - start)
+        return kv_store
+
+    def _refresh_ahead_loop(self) -> None:
+        """
+        Reload hot paths before they expire, until close is called.
+        """
+        while not self._refresh_stop.wait(self.refresh_interval):
+            self._refresh_hot_paths()
+
+    def _refresh_hot_paths(self) -> None:
+        """
+        Reload paths read during the last cache_ttl seconds once their age
+        reaches refresh_ahead_ratio * cache_ttl, in background. Paths not read
+        meanwhile are no longer refreshed.
+        Reloads go through the single-flight: a path is not reloaded while a
+        read of it is in flight, and cache misses meanwhile wait for the
+        reload. On failure, the cached entry is kept, and can be served stale.
+        """
+        ttl = self.cache.ttl
+        for path, accessed_at in list(self._hot_paths.items()):
+            now = time.time()
+            if now - accessed_at > ttl:
+                self._hot_paths.pop(path, None)
+                continue
+            entry = self.cache.get_entry(path)
+            if (
+                entry is not None
+                and now - entry.fetched_at < self.refresh_ahead_ratio * ttl
+            ):
+                continue
+            self._flight.start(
+                path,
+                lambda path=path: self._reload_kv_store(path),
+                self._get_executor(),
+            )
 
     def _get(self, key: str, **kwargs) -> Optional[Any]:
         """
@@ -288,46 +809,12 @@ class Backend(_Backend):
         :param kwargs:
         :return:
         """
-        _value = None
-
         _path = kwargs.get("path", self.default_key_path)
         k_ref = KeyRef(path=_path, key=key)
         if self.enable_cache:
-            self.logger.log(
-                **{
-                    "level": "debug",
-                    "message": {
-                        "message": f"[Vault][cache enabled] try to get key"
-                        f" {key} from cache"
-                    },
-                }
-            )
-            _value = self.cache.get(
-                k_ref.get_cache_key(), default=KEY_NOT_FOUND_IN_CACHE
-            )
-            if _value == KEY_NOT_FOUND_IN_CACHE:
-                self.logger.log(
-                    **{
-                        "level": "debug",
-                        "message": {
-                            "message": f"[Vault] key {key} not" f" found in cache"
-                        },
-                    }
-                )
-                kv_store = self._get_kv_store_when_ready(path=k_ref.path)
-                self._cache_kv_store(path=k_ref.path, kv_store=kv_store)
-                _value = self.cache.get(k_ref.get_cache_key(), default=None)
-            else:
-                self.logger.log(
-                    **{
-                        "level": "debug",
-                        "message": {
-                            "message": f"[Vault][cache enabled] key"
-                            f" {key} found in cache"
-                        },
-                    }
-                )
-        else:
+            return self._get_cached_kv_store(path=k_ref.path).get(k_ref.key)
+
+        if self.logger.is_enabled("debug"):
             self.logger.log(
                 **{
                     "level": "debug",
@@ -337,15 +824,20 @@ class Backend(_Backend):
                     },
                 }
             )
-            _value = self._get_key_when_ready(k_ref)
-        return _value
+        return self._get_key_when_ready(k_ref)
+
+    def get_struct(self, schema: dict, **kwargs) -> Mapping:
+        """
+        Load all values defined in schema in a struct (dict) with one request,
+        or from cache if enabled.
+        """
+        if isinstance(schema, Schema):
+            return schema.build(self.get_many(schema, **kwargs))
 
-    def get_struct(self, schema: dict, **kwargs) -> dict:
-        """ """
         _struct = {}
 
         _path = kwargs.get("path", self.default_key_path)
-        kv_store = self._get_kv_store_when_ready(path=_path)
+        kv_store = self._get_cached_kv_store(path=_path)
         for key, _type in schema.items():
             _value = kv_store.get(key)
             if _value is not None:
@@ -353,3 +845,12 @@ class Backend(_Backend):
             _struct[key] = _value
 
         return _struct
+
+    def get_many(self, keys: Dict[str, type], **kwargs) -> dict:
+        """
+        Load values of keys found in the key-value store with one request, or
+        from cache if enabled.
+        """
+        _path = kwargs.get("path", self.default_key_path)
+        kv_store = self._get_cached_kv_store(path=_path)
+        return self._get_many_from(kv_store, keys)
@@ -0,0 +1,37 @@
+import os
+import weakref
+
+# Objects reset in child processes after fork, with their _after_fork method
+_instances: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def register_after_fork(obj) -> None:
+    """
+    Call obj._after_fork() in the child process after each fork, e.g. to drop
+    HTTP sessions, caches, locks and threads inherited from the parent.
+    obj is weakly referenced.
+    """
+    _instances.add(obj)
+
+
+def _after_fork_in_child() -> None:
+    # Each object is reset even if resetting a previous one failed
+    for obj in list(_instances):
+        try:
+            obj._after_fork()
+        except Exception as e:
+            logger = getattr(obj, "logger", None)
+            if logger is not None:
+                logger.log(
+                    **{
+                        "level": "error",
+                        "message": {
+                            "message": f"Failed to reset {type(obj).__name__}"
+                            f" after fork: {e}"
+                        },
+                    }
+                )
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,9 +1,43 @@
+from typing import Callable, Optional
+
+# Severity of supported logging levels
+LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "warning": 30,
+    "error": 40,
+    "critical": 50,
+}
+
+
 class LoggingInterface:
     """Simple logging interface"""
 
     def log(self, level=None, message=None, *args, **kwargs) -> None:
         raise NotImplementedError
 
+    def is_enabled(self, level=None) -> bool:
+        """
+        Returns True if messages at level are emitted by the logger.
+        Defaults to True: all messages are considered emitted.
+        Override it so that callers can skip building discarded messages.
+        """
+        return True
+
+    def log_deferred(
+        self,
+        level=None,
+        message_factory: Optional[Callable[[], dict]] = None,
+        *args,
+        **kwargs,
+    ) -> None:
+        """
+        Log the message returned by message_factory. The factory is only
+        called if level is enabled.
+        """
+        if self.is_enabled(level):
+            self.log(level=level, message=message_factory(), *args, **kwargs)
+
 
 class DummyLoggingInterface(LoggingInterface):
     """
@@ -11,5 +45,19 @@ class DummyLoggingInterface(LoggingInterface):
     Do not use in production.
     """
 
+    def __init__(self, level: str = "debug"):
+        """
+
+        :param level: minimum level of emitted messages, defaults to debug
+        """
+        self.level = level
+
+    def is_enabled(self, level=None) -> bool:
+        # Unknown levels are always emitted
+        if level not in LEVELS:
+            return True
+        return LEVELS[level] >= LEVELS.get(self.level, 0)
+
     def log(self, level=None, message=None, *args, **kwargs) -> None:
-        print(level, message)
+        if self.is_enabled(level):
+            print(level, message)
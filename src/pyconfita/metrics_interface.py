@@ -0,0 +1,193 @@
+import bisect
+import threading
+from typing import Dict, Optional, Tuple
+
+# Upper bounds of latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+class MetricsInterface:
+    """
+    Simple metrics interface. Defaults to no-op.
+
+    Callers only measure (e.g. time) and report values if enabled is True, so
+    that the default interface costs one attribute lookup. Implementations
+    set enabled to True, and override increment and observe.
+
+    Metric names follow Prometheus conventions, labels are dicts of strings.
+    """
+
+    enabled: bool = False
+
+    def increment(
+        self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Add value to counter name.
+        """
+        pass
+
+    def observe(
+        self, name: str, value: float, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Record value (e.g. a latency in seconds) in histogram name.
+        """
+        pass
+
+
+# Shared default (no-op) metrics interface
+NOOP_METRICS = MetricsInterface()
+
+
+def _labels_key(labels: Optional[Dict[str, str]]) -> Tuple[Tuple[str, str], ...]:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for k, v in labels:
+        v = v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{k}="{v}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Histogram:
+    """
+    Cumulative histogram of observed values.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # One count per bucket, and one for values above the last bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list:
+        """
+        Returns (upper bound, count of values <= upper bound), +Inf last.
+        """
+        res = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            res.append((bound, total))
+        return res
+
+
+class InMemoryMetrics(MetricsInterface):
+    """
+    Metrics aggregated in memory: counters and histograms, keyed by name and
+    labels. Thread-safe.
+    Use as_prometheus to dump them in Prometheus text exposition format.
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+
+        :param buckets: upper bounds of histogram buckets, sorted
+        """
+        self.buckets = tuple(buckets)
+        self.counters: Dict[str, Dict[tuple, float]] = {}
+        self.histograms: Dict[str, Dict[tuple, Histogram]] = {}
+        self.lock = threading.Lock()
+
+    def increment(
+        self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        key = _labels_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(
+        self, name: str, value: float, labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        key = _labels_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """
+        Returns the value of counter name with labels, 0 if not found.
+        """
+        with self.lock:
+            return self.counters.get(name, {}).get(_labels_key(labels), 0)
+
+    def get_histogram(self, name: str, **labels) -> Optional[Histogram]:
+        """
+        Returns histogram name with labels, None if not found.
+        """
+        with self.lock:
+            return self.histograms.get(name, {}).get(_labels_key(labels))
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def as_prometheus(self) -> str:
+        """
+        Returns all metrics in Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name in sorted(self.counters):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self.counters[name].items()):
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+            for name in sorted(self.histograms):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self.histograms[name].items()):
+                    for bound, count in histogram.cumulative_counts():
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_labels)} {count}"
+                        )
+                    lines.append(
+                        f"{name}_sum{_format_labels(labels)}"
+                        f" {_format_value(histogram.sum)}"
+                    )
+                    lines.append(
+                        f"{name}_count{_format_labels(labels)} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
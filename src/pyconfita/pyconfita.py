@@ -1,19 +1,47 @@
-from typing import List, Optional, Any
+import itertools
+import time
+from typing import Callable, List, Optional, Any, Dict, Tuple, Mapping
 
-from pyconfita.backend.backend import Backend
+from pyconfita.backend.backend import AsyncBackend, Backend
 from pyconfita.logging_interface import LoggingInterface
+from pyconfita.metrics_interface import MetricsInterface, NOOP_METRICS
+from pyconfita.schema import Schema, has_nested
+from pyconfita.snapshot import Snapshot, SnapshotRefresher
+from pyconfita.tracing_interface import (
+    TracerInterface,
+    Span,
+    NOOP_SPAN,
+    NOOP_TRACER,
+    KEY,
+    PATH,
+    BACKEND,
+    OUTCOME,
+    batch_outcome,
+)
 
 
 class Confita:
     logger: LoggingInterface
     backends: List[Backend]
     case_sensitive: bool = True
+    case_insensitive_struct: bool = False
+    enable_cache: bool = False
+    cache_maxsize: int = 4096
+    short_circuit: bool = False
+    metrics: MetricsInterface = NOOP_METRICS
+    tracer: TracerInterface = NOOP_TRACER
 
     def __init__(
         self,
         logger: LoggingInterface,
         backends: List[Backend],
         case_sensitive: bool = True,
+        enable_cache: bool = False,
+        short_circuit: bool = False,
+        metrics: Optional[MetricsInterface] = None,
+        tracer: Optional[TracerInterface] = None,
+        cache_maxsize: int = 4096,
+        case_insensitive_struct: bool = False,
         *args,
         **kwargs,
     ):
@@ -22,12 +50,164 @@ class Confita:
         :param logger:
         :param backends: list of key-value backends. Order sets the
         evaluation order for values.
+        :param case_sensitive: bool, False to read keys with casing variations
+        :param enable_cache: bool, True to cache values resolved by get. An
+        entry is discarded as soon as the generation of one of the backends
+        changes, or explicitly with invalidate. Values of live backends (not
+        cacheable, e.g. environment without snapshot, Vault) are not cached:
+        they are read on each get.
+        :param short_circuit: bool, True to resolve get_struct from the last
+        backend to the first one, only requesting keys still unresolved, and
+        stopping as soon as all keys are resolved.
+        :param metrics: metrics interface, defaults to no-op. It is also set
+        on backends without metrics interface.
+        :param tracer: tracer interface, defaults to no-op. It is also set on
+        backends without tracer interface.
+        :param cache_maxsize: maximum number of keys cached, the oldest key is
+        dropped to make room. Defaults to 4096
+        :param case_insensitive_struct: bool, True to read keys of get_struct
+        with casing variations, as get with case sensitivity disabled. It
+        applies to all schema forms alike: dict, nested dict and compiled
+        Schema. Defaults to False: get_struct reads exact keys
         :param args:
         :param kwargs:
         """
         self.logger = logger
+        for bk in backends:
+            self._check_backend(bk)
         self.backends = backends
         self.case_sensitive = case_sensitive
+        self.case_insensitive_struct = case_insensitive_struct
+        self.enable_cache = enable_cache
+        self.cache_maxsize = cache_maxsize
+        self.short_circuit = short_circuit
+        if metrics is not None:
+            self.metrics = metrics
+            for bk in self.backends:
+                if bk.metrics is NOOP_METRICS:
+                    bk.metrics = metrics
+        if tracer is not None:
+            self.tracer = tracer
+            for bk in self.backends:
+                if bk.tracer is NOOP_TRACER:
+                    bk.tracer = tracer
+        # key -> {(type, path, case_sensitive): (generations, value, index)}
+        # value is resolved from cacheable backends, index is the position of
+        # the winning backend (-1 if none).
+        # Copy-on-write: entries of a key are replaced, never modified, so
+        # that lookups take no lock
+        self._cache: Dict[str, Dict[tuple, Tuple[tuple, Any, int]]] = {}
+        # Incremented by invalidate: values resolved meanwhile are not cached
+        self._cache_epoch = 0
+        self._snapshot_versions = itertools.count(1)
+
+    def _check_backend(self, bk: Backend) -> None:
+        """
+        Raises if backend bk is asynchronous: its reads are coroutines, to be
+        awaited with AsyncConfita.
+        """
+        if isinstance(bk, AsyncBackend):
+            raise Exception(
+                f"Asynchronous backend {bk.name} is not supported by Confita,"
+                f" use AsyncConfita"
+            )
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop cached values resolved for key. Drop all cached values if key is
+        None.
+
+        :param key:
+        :return:
+        """
+        self._cache_epoch += 1
+        if key is None:
+            cache, self._cache = self._cache, {}
+            # Copied at once: a concurrent get may still add entries
+            evicted = sum(len(entries) for entries in list(cache.values()))
+        else:
+            evicted = len(self._cache.pop(key, None) or ())
+        if self.metrics.enabled and evicted:
+            self._record_evictions(evicted, "invalidate")
+
+    def _record_evictions(self, value: int, reason: str) -> None:
+        self.metrics.increment(
+            "pyconfita_cache_evictions_total",
+            value,
+            {"cache": "confita", "reason": reason},
+        )
+
+    def _record_cache_request(self, hit: bool) -> None:
+        self.metrics.increment(
+            "pyconfita_cache_requests_total",
+            labels={"cache": "confita", "result": "hit" if hit else "miss"},
+        )
+
+    def _record_lookups(self, bk: Backend, requested: int, found: int) -> None:
+        """
+        Count lookups of keys in backend bk, found (hit) or not (miss).
+        """
+        if found:
+            self.metrics.increment(
+                "pyconfita_backend_lookups_total",
+                found,
+                {"backend": bk.name, "result": "hit"},
+            )
+        if requested > found:
+            self.metrics.increment(
+                "pyconfita_backend_lookups_total",
+                requested - found,
+                {"backend": bk.name, "result": "miss"},
+            )
+
+    def _record_wins(self, winners: Dict[str, str]) -> None:
+        """
+        Count resolved keys per winning backend, from key -> backend name.
+        """
+        counts = {}
+        for name in winners.values():
+            counts[name] = counts.get(name, 0) + 1
+        for name, count in counts.items():
+            self.metrics.increment(
+                "pyconfita_backend_wins_total", count, {"backend": name}
+            )
+
+    def _start_span(
+        self, name: str, key: Any, kwargs: dict, bk: Optional[Backend] = None
+    ) -> Span:
+        """
+        Returns a span started with the tracer (no-op span if disabled), with
+        key (or list of keys), path and backend attributes.
+        """
+        if not self.tracer.enabled:
+            return NOOP_SPAN
+        attributes = {KEY: key}
+        if kwargs.get("path") is not None:
+            attributes[PATH] = kwargs["path"]
+        if bk is not None:
+            attributes[BACKEND] = bk.name
+        return self.tracer.start_span(name, attributes)
+
+    def _trace_read(
+        self, span_name: str, bk: Backend, keys: Mapping, read, *args, **kwargs
+    ) -> dict:
+        """
+        Returns read(*args, **kwargs), a read of keys in backend bk, in a span
+        if tracing is enabled.
+        """
+        if not self.tracer.enabled:
+            return read(*args, **kwargs)
+        with self._start_span(span_name, list(keys), kwargs, bk) as span:
+            _values = read(*args, **kwargs)
+            found = sum(v is not None for v in _values.values())
+            span.set_attribute(OUTCOME, batch_outcome(len(keys), found))
+        return _values
+
+    def _get_generations(self) -> tuple:
+        """
+        Returns the generations of all the backends, in order.
+        """
+        return tuple(bk.get_generation() for bk in self.backends)
 
     def get(self, key: str, **kwargs) -> Optional[Any]:
         """
@@ -35,32 +215,209 @@ class Confita:
         Returns the last not None value found in order of the list of
         backends. Returns None if not found.
 
+        When caching is enabled, the value resolved from cacheable backends
+        is cached by (key, type, path, casing mode) until a backend changes.
+        Live backends are read on each get.
+
         :param key:
         :param kwargs:
         :return:
         """
+        metrics = self.metrics
+        if not metrics.enabled and not self.tracer.enabled:
+            if not self.enable_cache:
+                # Fast path
+                return self._get(key, **kwargs)
+            return self._get_cached(key, **kwargs)
+
+        with self._start_span("pyconfita.get", key, kwargs) as span:
+            start = time.perf_counter()
+            _value = self._get_cached(key, **kwargs)
+            if metrics.enabled:
+                metrics.observe("pyconfita_get_seconds", time.perf_counter() - start)
+            span.set_attribute(OUTCOME, "miss" if _value is None else "hit")
+        return _value
+
+    def _get_cached(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key from cache if enabled, else from backends.
+        """
+        if not self.enable_cache:
+            return self._get(key, **kwargs)
+
+        epoch = self._cache_epoch
+        variant = self._get_cache_variant(**kwargs)
+        generations = self._get_generations()
+        entry = self._lookup_cache(key, variant, generations, kwargs)
+        if self.metrics.enabled:
+            self._record_cache_request(hit=entry is not None)
+        if entry is None:
+            cacheable = [bk for bk in self.backends if bk.cacheable]
+            _value, winner = self._resolve(key, cacheable, **kwargs)
+            index = -1 if winner is None else self.backends.index(winner)
+            self._set_cache_entry(key, variant, (generations, _value, index), epoch)
+        else:
+            _, _value, index = entry
+            winner = None
+
+        # Live backends after the cached winner take precedence
+        live = [bk for bk in self.backends[index + 1 :] if not bk.cacheable]
+        if live:
+            live_value, live_winner = self._resolve(key, live, **kwargs)
+            if live_value is not None:
+                _value, winner = live_value, live_winner
+        if self.metrics.enabled and winner is not None:
+            self._record_wins({key: winner.name})
+        return _value
+
+    def _set_cache_entry(
+        self, key: str, variant: tuple, entry: Tuple[tuple, Any, int], epoch: int
+    ) -> None:
+        """
+        Cache entry (generations, value, index) for key and variant, resolved
+        since invalidation epoch, unless the cache was invalidated meanwhile.
+        Concurrent sets for key may drop each other's variants: they are
+        resolved again on next get.
+        """
+        if self._cache_epoch != epoch:
+            return
+        cache = self._cache
+        entries = cache.get(key)
+        if entries is None:
+            self._make_room(cache)
+            entries = {}
+        if self.metrics.enabled and variant in entries:
+            # Resolved with older generations
+            self._record_evictions(1, "generation")
+        entries = {**entries, variant: entry}
+        cache[key] = entries
+        if self._cache_epoch != epoch:
+            # Invalidated while being set
+            cache.pop(key, None)
+
+    def _make_room(self, cache: dict) -> None:
+        """
+        Drop the oldest key of cache if it holds cache_maxsize keys.
+        """
+        if len(cache) < self.cache_maxsize:
+            return
+        try:
+            oldest = next(iter(cache))
+        except (StopIteration, RuntimeError):
+            # Emptied or modified by a concurrent get
+            return
+        evicted = len(cache.pop(oldest, None) or ())
+        if self.metrics.enabled and evicted:
+            self._record_evictions(evicted, "size")
+
+    def _get_cache_variant(self, **kwargs) -> tuple:
+        """
+        Returns the part of the cache key derived from get parameters:
+        (type, path, casing mode).
+        """
+        return (
+            kwargs.get("v_type", kwargs.get("type", str)),
+            kwargs.get("path"),
+            self.case_sensitive,
+        )
+
+    def _lookup_cache(
+        self, key: str, variant: tuple, generations: tuple, kwargs: dict
+    ) -> Optional[Tuple[tuple, Any, int]]:
+        """
+        Returns the cache entry for key and variant, as _get_cache_entry, in a
+        span if tracing is enabled.
+        """
+        if not self.tracer.enabled:
+            return self._get_cache_entry(key, variant, generations)
+        with self._start_span("pyconfita.cache_lookup", key, kwargs) as span:
+            entry = self._get_cache_entry(key, variant, generations)
+            span.set_attribute(OUTCOME, "miss" if entry is None else "hit")
+        return entry
+
+    def _get_cache_entry(
+        self, key: str, variant: tuple, generations: tuple
+    ) -> Optional[Tuple[tuple, Any, int]]:
+        """
+        Returns the cache entry (generations, value, index) for key and
+        variant if it was resolved with the current generations of the
+        backends, else None.
+        """
+        entries = self._cache.get(key)
+        if entries is not None:
+            entry = entries.get(variant)
+            if entry is not None and entry[0] == generations:
+                return entry
+        return None
+
+    def _get(self, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key in all the backends, bypassing the cache.
+
+        :param key:
+        :param kwargs:
+        :return:
+        """
+        _value, winner = self._resolve(key, self.backends, **kwargs)
+        if self.metrics.enabled and winner is not None:
+            self._record_wins({key: winner.name})
+        return _value
+
+    def _resolve(
+        self, key: str, backends: List[Backend], **kwargs
+    ) -> Tuple[Optional[Any], Optional[Backend]]:
+        """
+        Read the value at key in backends. Returns the last not None value
+        found in order of backends, and the backend it was read from (None if
+        not found).
+        """
         _value = None
+        winner = None
 
+        # Debug messages are only built if the logger emits them
+        debug = self.logger.is_enabled("debug")
+        track = self.metrics.enabled
+        trace = self.tracer.enabled
         _all_values = []
-        for bk in self.backends:
-            tmp_value = None
-            if self.case_sensitive:
-                # Initial casing for key
-                tmp_value = bk.get(key, **kwargs)
+        for bk in backends:
+            if trace:
+                with self._start_span("pyconfita.backend.get", key, kwargs, bk) as span:
+                    tmp_value = self._read(bk, key, **kwargs)
+                    span.set_attribute(OUTCOME, "miss" if tmp_value is None else "hit")
             else:
-                # Try reading with casing variations on key
-                tmp_value = (
-                    bk.get(key, **kwargs)
-                    or bk.get(key.upper(), **kwargs)
-                    or bk.get(key.lower(), **kwargs)
+                tmp_value = self._read(bk, key, **kwargs)
+            if tmp_value is not None:
+                _value = tmp_value
+                winner = bk
+            if track:
+                self._record_lookups(bk, 1, tmp_value is not None)
+            if debug:
+                self.logger.log(
+                    **{
+                        "level": "debug",
+                        "message": {"message": f"{bk.name} reads {key} = {tmp_value}"},
+                    }
                 )
-            self.logger.log(
-                **{
-                    "level": "debug",
-                    "message": {"message": f"{bk.name} reads {key} = {tmp_value}"},
-                }
-            )
-            _all_values.append(tmp_value)
+                _all_values.append(tmp_value)
+
+        if debug:
+            self._log_values(key, _all_values, _value)
+        return _value, winner
+
+    def _read(self, bk: Backend, key: str, **kwargs) -> Optional[Any]:
+        """
+        Read the value at key in one backend.
+        """
+        if self.case_sensitive:
+            # Initial casing for key
+            return bk.get(key, **kwargs)
+        # Casefolded key index if available, else casing variations
+        return bk.get_case_insensitive(key, **kwargs)
+
+    def _log_values(self, key: str, _all_values: list, _value: Any) -> None:
+        """
+        Log (debug) all values read for key, and the final value.
+        """
         self.logger.log(
             **{
                 "level": "debug",
@@ -76,28 +433,210 @@ class Confita:
                 },
             }
         )
-        if len(d_values) > 0:
-            _value = d_values[-1]
-
         self.logger.log(
             **{
                 "level": "debug",
                 "message": {"message": f"Final value read for {key} = {_value}"},
             }
         )
-        return _value
 
-    def get_struct(self, schema: dict, **kwargs) -> dict:
+    def get_struct(self, schema: dict, **kwargs) -> Mapping:
         """
         Load all values defined in schema in a struct (dict) with identical
         backend precedence used in get: returns the last not None value found
         in order of the list of backends (defaults to None).
+
+        Schema is a dict (key -> type, or key -> nested dict schema read at
+        dotted paths) or a compiled Schema, in which case the returned struct
+        is a StructResult with schema defaults applied.
+        Keys are read as is, unless case_insensitive_struct is enabled: then
+        casing variations of keys are read as in get, whatever the schema
+        form.
+        """
+        if not self.metrics.enabled and not self.tracer.enabled:
+            return self._get_struct(schema, **kwargs)
+
+        with self._start_span("pyconfita.get_struct", list(schema), kwargs) as span:
+            start = time.perf_counter()
+            _struct = self._get_struct(schema, **kwargs)
+            if self.metrics.enabled:
+                self.metrics.observe(
+                    "pyconfita_get_struct_seconds", time.perf_counter() - start
+                )
+            found = sum(v is not None for v in _struct.values())
+            span.set_attribute(OUTCOME, batch_outcome(len(_struct), found))
+        return _struct
+
+    def snapshot(self, schema: dict, **kwargs) -> Snapshot:
+        """
+        Resolve all values defined in schema once, as get_struct, in a
+        read-only, hashable Snapshot. Reads of the snapshot never touch a
+        backend.
+
+        :param schema: dict or compiled Schema, as in get_struct
+        :param kwargs:
+        :return: snapshot with a version increasing on each call, and its
+        build time
+        """
+        version = next(self._snapshot_versions)
+        start = time.perf_counter()
+        _struct = self.get_struct(schema, **kwargs)
+        return Snapshot(
+            _struct, version=version, build_seconds=time.perf_counter() - start
+        )
+
+    def refresher(
+        self,
+        schema: dict,
+        interval: float = 60.0,
+        on_swap: Optional[Callable[[Snapshot], Any]] = None,
+        **kwargs,
+    ) -> SnapshotRefresher:
+        """
+        Returns a SnapshotRefresher building snapshots of schema every
+        interval seconds, once started. The first snapshot is built now.
+
+        :param schema: dict or compiled Schema, as in get_struct
+        :param interval: delay between two builds, in seconds
+        :param on_swap: called with each new snapshot, e.g.
+        SharedSnapshotPublisher.publish
+        :param kwargs:
+        :return:
         """
+        return SnapshotRefresher(
+            build=lambda: self.snapshot(schema, **kwargs),
+            interval=interval,
+            logger=self.logger,
+            on_swap=on_swap,
+        )
+
+    def _get_struct(self, schema: dict, **kwargs) -> Mapping:
+        if isinstance(schema, Schema):
+            return schema.build(self._get_many(schema, **kwargs))
+
+        if self.case_insensitive_struct or has_nested(schema):
+            compiled = Schema(schema)
+            return compiled.build(self._get_many(compiled, **kwargs)).as_dict()
+
+        if self.short_circuit:
+            return self._get_struct_short_circuit(schema, **kwargs)
+
+        track = self.metrics.enabled
+        winners = {}
         _struct = {k: None for k in schema.keys()}
         for bk in self.backends:
-            tmp_struct = bk.get_struct(schema, **kwargs)
+            tmp_struct = self._trace_read(
+                "pyconfita.backend.get_struct",
+                bk,
+                schema,
+                bk.get_struct,
+                schema,
+                **kwargs,
+            )
+            found = 0
             for k, v in tmp_struct.items():
                 if v is not None:
                     _struct[k] = v
+                    found += 1
+                    if track:
+                        winners[k] = bk.name
+            if track:
+                self._record_lookups(bk, len(schema), found)
+
+        if track:
+            self._record_wins(winners)
+        return _struct
+
+    def _get_struct_short_circuit(self, schema: dict, **kwargs) -> dict:
+        """
+        Load all values defined in schema walking backends from the highest
+        precedence (last) to the lowest one (first). Each backend is only
+        asked for the keys still unresolved with get_many, and the walk stops
+        once all keys are resolved. Remaining backends are not queried.
+        """
+        track = self.metrics.enabled
+        winners = {}
+        _struct = {k: None for k in schema.keys()}
+        unresolved = dict(schema)
+        for bk in reversed(self.backends):
+            if not unresolved:
+                break
+            requested = len(unresolved)
+            tmp_values = self._trace_read(
+                "pyconfita.backend.get_many",
+                bk,
+                unresolved,
+                bk.get_many,
+                unresolved,
+                **kwargs,
+            )
+            for k, v in tmp_values.items():
+                if v is not None:
+                    _struct[k] = v
+                    unresolved.pop(k, None)
+                    if track:
+                        winners[k] = bk.name
+            if track:
+                self._record_lookups(bk, requested, requested - len(unresolved))
 
+        if track:
+            self._record_wins(winners)
         return _struct
+
+    def _read_many(self, bk: Backend, schema: Schema, **kwargs) -> dict:
+        """
+        Read values of compiled schema found in one backend, with casing
+        variations of keys if case_insensitive_struct is enabled.
+        """
+        if not self.case_insensitive_struct:
+            return bk.get_many(schema, **kwargs)
+        if bk.has_case_insensitive_index:
+            return bk.get_many_case_insensitive(schema, **kwargs)
+        return schema.pick_variants(bk.get_many(schema.variant_schema, **kwargs))
+
+    def _get_many(self, schema: Schema, **kwargs) -> dict:
+        """
+        Resolve values of compiled schema with backend precedence, returning
+        only the keys found in at least one backend.
+        """
+        track = self.metrics.enabled
+        winners = {}
+        _values = {}
+        if self.short_circuit:
+            for bk in reversed(self.backends):
+                pending = schema.subset(k for k in schema if k not in _values)
+                if not pending:
+                    break
+                tmp_values = self._trace_read(
+                    "pyconfita.backend.get_many",
+                    bk,
+                    pending,
+                    self._read_many,
+                    bk,
+                    pending,
+                    **kwargs,
+                )
+                for k, v in tmp_values.items():
+                    _values.setdefault(k, v)
+                if track:
+                    self._record_lookups(bk, len(pending), len(tmp_values))
+                    winners.update(dict.fromkeys(tmp_values, bk.name))
+        else:
+            for bk in self.backends:
+                tmp_values = self._trace_read(
+                    "pyconfita.backend.get_many",
+                    bk,
+                    schema,
+                    self._read_many,
+                    bk,
+                    schema,
+                    **kwargs,
+                )
+                _values.update(tmp_values)
+                if track:
+                    self._record_lookups(bk, len(schema), len(tmp_values))
+                    winners.update(dict.fromkeys(tmp_values, bk.name))
+
+        if track:
+            self._record_wins(winners)
+        return _values
@@ -0,0 +1,251 @@
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Supported type conversions
+SUPPORTED_TYPES = (str, bool, float, int)
+
+
+def _make_caster(_type: type) -> Callable[[Any], Any]:
+    """
+    Returns the function converting a value into _type. See Backend._cast.
+    """
+    convert = (lambda v: "t" in v.lower()) if _type is bool else _type
+
+    def cast(v: Any) -> Any:
+        if v is None:
+            return v
+
+        if isinstance(v, _type):
+            # Right type
+            return v
+
+        # Mismatch: value is not None and type is incorrect
+        if isinstance(v, str):
+            return convert(v)
+
+        raise Exception(
+            "Type conversion cannot be achieved when variable is not a string"
+        )
+
+    return cast
+
+
+CASTERS: Dict[type, Callable[[Any], Any]] = {
+    _type: _make_caster(_type) for _type in SUPPORTED_TYPES
+}
+
+
+def get_caster(_type: type) -> Callable[[Any], Any]:
+    """
+    Returns the function converting a value into _type.
+    Supported types: [str, bool, float, int].
+    """
+    try:
+        return CASTERS[_type]
+    except (KeyError, TypeError):
+        raise Exception(
+            "Unsupported type conversion. Support for str, bool, float, int."
+        )
+
+
+def _is_nested(spec: Any) -> bool:
+    # Types and (type, default) tuples are checked first: isinstance on an
+    # abstract class is slow
+    return not isinstance(spec, (type, tuple)) and isinstance(spec, Mapping)
+
+
+def has_nested(schema: Mapping) -> bool:
+    """
+    Returns True if schema has nested schemas (mapping values).
+    """
+    return any(_is_nested(spec) for spec in schema.values())
+
+
+def get_key_variants(key: str) -> Tuple[str, ...]:
+    """
+    Returns the casing variations of key read in case-insensitive mode, in
+    order: key, uppercased key, lowercased key.
+    """
+    return tuple(dict.fromkeys((key, key.upper(), key.lower())))
+
+
+class StructResult(Mapping):
+    """
+    Read-only struct returned by get_struct for a compiled Schema.
+    Values are stored in slots. Fields are readable as mapping items, and as
+    attributes when the key is a valid identifier.
+    """
+
+    __slots__ = ()
+    _keys: Tuple[str, ...] = ()
+    _index: Dict[str, str] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            slot = self._index[key]
+        except KeyError:
+            raise KeyError(key)
+        return getattr(self, slot)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+    def as_dict(self) -> dict:
+        """
+        Returns the struct as a dict, nested structs included.
+        """
+        _dict = {}
+        for key, slot in self._index.items():
+            v = getattr(self, slot)
+            _dict[key] = v.as_dict() if isinstance(v, StructResult) else v
+        return _dict
+
+
+def _make_result_class(keys: Tuple[str, ...]) -> type:
+    """
+    Returns a StructResult subclass with one slot per key.
+    """
+    index = {key: f"_f{i}" for i, key in enumerate(keys)}
+    namespace = {"__slots__": tuple(index.values()), "_keys": keys, "_index": index}
+    for key, slot in index.items():
+        if (
+            key.isidentifier()
+            and not key.startswith("_")
+            and not hasattr(StructResult, key)
+        ):
+            namespace[key] = property(lambda self, _slot=slot: getattr(self, _slot))
+    return type("Struct", (StructResult,), namespace)
+
+
+class Schema(Mapping):
+    """
+    Compiled schema, to be reused across get_struct calls.
+
+    Built from a dict mapping keys to types, or to (type, default) tuples.
+    Per-field casters, defaults, casing variations of keys and the result
+    class are computed once. A Schema is a mapping of keys to types, and can
+    be used wherever a dict schema is.
+
+    A key may map to a nested dict schema: its fields are read at dotted
+    paths (e.g. {"db": {"host": str}} reads "db.host"), and the result holds
+    a nested struct. Flat and nested keys are read with the same casing rule
+    (see Confita case_insensitive_struct).
+    """
+
+    def __init__(self, fields: Dict[str, Any], _prefix: str = ""):
+        """
+
+        :param fields: key -> type, key -> (type, default), or key -> nested
+        dict schema
+        """
+        self.fields: Dict[str, type] = {}
+        self.defaults: Dict[str, Any] = {}
+        # Top-level key -> (dotted path, nested schema or None)
+        self.layout: Dict[str, Tuple[str, Optional["Schema"]]] = {}
+        for key, spec in fields.items():
+            path = f"{_prefix}{key}"
+            if _is_nested(spec):
+                nested = Schema(spec, _prefix=f"{path}.")
+                self.fields.update(nested.fields)
+                self.defaults.update(nested.defaults)
+                self.layout[key] = (path, nested)
+                continue
+            if isinstance(spec, tuple):
+                _type, default = spec
+                self.defaults[path] = default
+            else:
+                _type = spec
+            self.fields[path] = _type
+            self.layout[key] = (path, None)
+        self.casters = {key: get_caster(_type) for key, _type in self.fields.items()}
+        self.variants = {key: get_key_variants(key) for key in self.fields}
+        self._variant_schema: Optional["Schema"] = None
+        self._result_class: Optional[type] = None
+
+    @classmethod
+    def compile(cls, schema: Dict[str, Any]) -> "Schema":
+        """
+        Returns schema if already compiled, else compiles it.
+        """
+        if isinstance(schema, Schema):
+            return schema
+        return cls(schema)
+
+    def __getitem__(self, key: str) -> type:
+        return self.fields[key]
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __repr__(self) -> str:
+        return f"Schema({self.fields})"
+
+    def subset(self, keys: Iterable[str]) -> "Schema":
+        """
+        Returns the schema restricted to keys, sharing compiled casters.
+        """
+        sub = Schema.__new__(Schema)
+        sub.fields = {key: self.fields[key] for key in keys}
+        sub.defaults = {k: self.defaults[k] for k in sub.fields if k in self.defaults}
+        sub.casters = {key: self.casters[key] for key in sub.fields}
+        sub.variants = {key: self.variants[key] for key in sub.fields}
+        sub.layout = {key: (key, None) for key in sub.fields}
+        sub._variant_schema = None
+        sub._result_class = None
+        return sub
+
+    @property
+    def variant_schema(self) -> "Schema":
+        """
+        Schema of all casing variations of keys, each typed as its key.
+        """
+        if self._variant_schema is None:
+            fields = {}
+            for key, variants in self.variants.items():
+                for variant in variants:
+                    fields.setdefault(variant, self.fields[key])
+            self._variant_schema = Schema(fields)
+        return self._variant_schema
+
+    def pick_variants(self, values: Dict[str, Any]) -> dict:
+        """
+        Returns values found for each key, reading casing variations of the
+        key in order (see get_key_variants).
+        """
+        picked = {}
+        for key, variants in self.variants.items():
+            for variant in variants:
+                v = values.get(variant)
+                if v is not None:
+                    picked[key] = v
+                    break
+        return picked
+
+    def build(self, values: Dict[str, Any]) -> StructResult:
+        """
+        Returns the struct of values (keyed by dotted path for nested
+        schemas), defaults (or None) for missing values.
+        """
+        if self._result_class is None:
+            self._result_class = _make_result_class(tuple(self.layout))
+        result = self._result_class.__new__(self._result_class)
+        index = self._result_class._index
+        defaults = self.defaults
+        for key, (path, nested) in self.layout.items():
+            if nested is not None:
+                v = nested.build(values)
+            else:
+                v = values.get(path)
+                if v is None:
+                    v = defaults.get(path)
+            object.__setattr__(result, index[key], v)
+        return result
@@ -0,0 +1,236 @@
+import json
+import os
+import struct
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, List, Optional
+
+from pyconfita.snapshot import Snapshot
+
+MAGIC = b"PYCONFSH"
+# Control segment: magic, generation of the last published snapshot
+_CONTROL = struct.Struct("<8sQ")
+_GENERATION = struct.Struct("<Q")
+_GENERATION_OFFSET = 8
+# Data segment header: magic, generation, payload size, then JSON payload
+_DATA = struct.Struct("<8sQQ")
+# Published data segments kept linked, for readers attaching the previous one
+KEEP_SEGMENTS = 2
+# Attempts to read a snapshot while newer ones are being published
+READ_ATTEMPTS = 10
+# Key of the JSON object encoding a set: {"__pyconfita_set__": [...]}
+_SET_TAG = "__pyconfita_set__"
+
+
+def _segment_name(name: str, generation: int) -> str:
+    return f"{name}_{generation}"
+
+
+def _encode_value(value: Any) -> Any:
+    """
+    Returns the JSON encoding of values json does not support: sets (e.g.
+    YAML !!set) are tagged objects. Raises on other values.
+    """
+    if isinstance(value, (set, frozenset)):
+        return {_SET_TAG: list(value)}
+    raise Exception(f"Cannot share value of type {type(value).__name__} in a snapshot")
+
+
+def _decode_object(obj: dict) -> Any:
+    if len(obj) == 1 and _SET_TAG in obj:
+        return frozenset(obj[_SET_TAG])
+    return obj
+
+
+def _encode(snapshot: Snapshot) -> bytes:
+    return json.dumps(
+        {
+            "version": snapshot.version,
+            "built_at": snapshot.built_at,
+            "build_seconds": snapshot.build_seconds,
+            "values": snapshot.as_dict(),
+        },
+        separators=(",", ":"),
+        default=_encode_value,
+    ).encode()
+
+
+def _decode(payload: bytes) -> Snapshot:
+    data = json.loads(payload, object_hook=_decode_object)
+    return Snapshot(
+        data["values"],
+        version=data["version"],
+        built_at=data["built_at"],
+        build_seconds=data["build_seconds"],
+    )
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach the existing segment name, without tracking it: the resource
+    tracker would unlink it when this process exits, while the publisher
+    and other readers still use it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    segment = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        # Registered under its POSIX name, with a leading slash
+        resource_tracker.unregister("/" + segment.name, "shared_memory")
+    return segment
+
+
+class SharedSnapshotPublisher:
+    """
+    Publish snapshots in shared memory, to be read by other processes (e.g.
+    the workers of a prefork server) with SharedSnapshotReader.
+
+    Each snapshot is written once in a new segment, named after its
+    generation, before the generation is updated in the control segment
+    (named name). Older segments are unlinked once KEEP_SEGMENTS newer ones
+    are published.
+
+    Only the process creating the publisher can publish, and unlink segments
+    on close: in forked children, close only unmaps them.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        """
+
+        :param name: name of the control segment, defaults to
+        pyconfita_<pid>. Readers attach it by name
+        """
+        self.name = name if name is not None else f"pyconfita_{os.getpid()}"
+        self.generation = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._segments: List[shared_memory.SharedMemory] = []
+        self._control = shared_memory.SharedMemory(
+            name=self.name, create=True, size=_CONTROL.size
+        )
+        _CONTROL.pack_into(self._control.buf, 0, MAGIC, 0)
+
+    def publish(self, snapshot: Snapshot) -> int:
+        """
+        Publish snapshot. Returns its generation.
+        """
+        if os.getpid() != self._pid:
+            raise Exception(
+                "Shared snapshots can only be published by the process which"
+                " created the publisher"
+            )
+        payload = _encode(snapshot)
+        with self._lock:
+            generation = self.generation + 1
+            segment = shared_memory.SharedMemory(
+                name=_segment_name(self.name, generation),
+                create=True,
+                size=_DATA.size + len(payload),
+            )
+            _DATA.pack_into(segment.buf, 0, MAGIC, generation, len(payload))
+            segment.buf[_DATA.size : _DATA.size + len(payload)] = payload
+            # Readers attach the new segment from now on
+            _GENERATION.pack_into(self._control.buf, _GENERATION_OFFSET, generation)
+            self.generation = generation
+            self._segments.append(segment)
+            while len(self._segments) > KEEP_SEGMENTS:
+                old = self._segments.pop(0)
+                old.close()
+                old.unlink()
+        return generation
+
+    def close(self) -> None:
+        """
+        Unmap all segments, and unlink them in the creating process.
+        """
+        owner = os.getpid() == self._pid
+        for segment in self._segments + [self._control]:
+            segment.close()
+            if owner:
+                segment.unlink()
+        self._segments = []
+
+    def __enter__(self) -> "SharedSnapshotPublisher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class SharedSnapshotReader:
+    """
+    Read snapshots published in shared memory by SharedSnapshotPublisher,
+    from another process.
+
+    Segments are attached by name, untracked, and never written. Checking for
+    a new generation reads 8 bytes of the mapped control segment. A snapshot
+    is decoded once per generation, then reads are plain dict lookups in the
+    local Snapshot. Reads are not zero-copy: each reader holds its own
+    decoded copy of the snapshot.
+
+    Mappings are inherited by forked children, and stay valid there.
+    """
+
+    def __init__(self, name: str):
+        """
+
+        :param name: name of the control segment of the publisher
+        """
+        self.name = name
+        self._control = _attach(name)
+        magic, _ = _CONTROL.unpack_from(self._control.buf, 0)
+        if magic != MAGIC:
+            self._control.close()
+            raise Exception(f"Shared memory segment {name} is not a pyconfita one")
+        self._generation = 0
+        self._snapshot: Optional[Snapshot] = None
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns the generation of the last published snapshot, 0 if none.
+        """
+        return _GENERATION.unpack_from(self._control.buf, _GENERATION_OFFSET)[0]
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """
+        Returns the last published snapshot.
+        """
+        generation = self.generation
+        if generation != self._generation or self._snapshot is None:
+            self._load(generation)
+        return self._snapshot
+
+    def _load(self, generation: int) -> None:
+        for _ in range(READ_ATTEMPTS):
+            if generation == 0:
+                raise Exception(f"No snapshot published in {self.name}")
+            try:
+                segment = _attach(_segment_name(self.name, generation))
+            except FileNotFoundError:
+                # Unlinked after newer publishes: read the last generation
+                generation = self.generation
+                continue
+            try:
+                magic, _generation, size = _DATA.unpack_from(segment.buf, 0)
+                if magic != MAGIC or _generation != generation:
+                    raise Exception(
+                        f"Invalid shared snapshot {self.name} generation"
+                        f" {generation}"
+                    )
+                with segment.buf[_DATA.size : _DATA.size + size] as view:
+                    payload = bytes(view)
+            finally:
+                segment.close()
+            self._snapshot = _decode(payload)
+            self._generation = generation
+            return
+        raise Exception(f"Failed to read shared snapshot {self.name}")
+
+    def close(self) -> None:
+        """
+        Unmap the control segment.
+        """
+        self._control.close()
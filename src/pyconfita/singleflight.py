@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _Call:
+    """
+    Call in flight: its result or error, set once done.
+    """
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls by key, across threads: the first caller runs
+    the call, and callers arriving while it is in flight wait for its result,
+    or its error.
+
+    Calls in flight are striped by hash of key, each stripe with its own lock,
+    so that calls for distinct keys seldom contend.
+    """
+
+    def __init__(self, stripes: int = 16):
+        """
+
+        :param stripes: number of stripes (lock, calls in flight)
+        """
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.calls: List[Dict[Hashable, _Call]] = [{} for _ in range(stripes)]
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn, unless a call for key is already in flight, then wait for it.
+        Returns (result, shared), shared being True if the result of another
+        caller's call was returned. Raises the error of the call.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        self._run(key, call, fn)
+        if call.error is not None:
+            raise call.error
+        return call.result, False
+
+    def start(
+        self, key: Hashable, fn: Callable[[], Any], executor: Optional[Executor] = None
+    ) -> bool:
+        """
+        Run fn in background, on executor if any, else in a new thread,
+        unless a call for key is already in flight. Callers of do arriving
+        meanwhile wait for its result, or its error. Returns True if the call
+        was started.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            return False
+        if executor is not None:
+            executor.submit(self._run, key, call, fn)
+        else:
+            threading.Thread(
+                target=self._run,
+                args=(key, call, fn),
+                name="pyconfita-singleflight",
+                daemon=True,
+            ).start()
+        return True
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """
+        Returns the call in flight for key, or a new one, and True if new.
+        """
+        stripe = hash(key) % len(self.locks)
+        with self.locks[stripe]:
+            call = self.calls[stripe].get(key)
+            if call is not None:
+                return call, False
+            call = self.calls[stripe][key] = _Call()
+            return call, True
+
+    def _run(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> None:
+        """
+        Run fn for call, then set its result or error, and release callers.
+        """
+        stripe = hash(key) % len(self.locks)
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self.locks[stripe]:
+                del self.calls[stripe][key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        return sum(len(calls) for calls in self.calls)
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce concurrent calls by key, across tasks of one event loop: the
+    first caller starts the call in a task, and callers arriving while it is
+    in flight await the same task. Cancelling a caller does not cancel the
+    call.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Await fn(), unless a call for key is already in flight, then await
+        it. Returns (result, shared), shared being True if the result of
+        another caller's call was returned. Raises the error of the call.
+        """
+        task = self.tasks.get(key)
+        shared = task is not None
+        if not shared:
+            task = asyncio.ensure_future(fn())
+            self.tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task), shared
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
+        if not task.cancelled():
+            # Errors are raised to callers, if any remain
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self.tasks)
@@ -0,0 +1,215 @@
+import threading
+import time
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from pyconfita.fork import register_after_fork
+
+
+def _freeze(value: Any, version: int, built_at: float) -> Any:
+    """
+    Returns an immutable copy of value: nested mappings become snapshots,
+    lists tuples and sets frozensets.
+    """
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, Mapping):
+        return Snapshot(value, version=version, built_at=built_at)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v, version, built_at) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+class Snapshot(Mapping):
+    """
+    Read-only, hashable mapping of values resolved once across all backends
+    (see Confita.snapshot). Reads never touch a backend.
+
+    Snapshots compare equal when their values are equal, whatever their
+    version and build time.
+    """
+
+    __slots__ = ("_values", "_hash", "version", "built_at", "build_seconds")
+
+    def __init__(
+        self,
+        values: Mapping,
+        version: int = 0,
+        built_at: Optional[float] = None,
+        build_seconds: float = 0.0,
+    ):
+        """
+
+        :param values: resolved values, copied and frozen
+        :param version: version of the snapshot, increasing with each build
+        :param built_at: build time, seconds since epoch. Defaults to now
+        :param build_seconds: time spent resolving values, in seconds
+        """
+        if built_at is None:
+            built_at = time.time()
+        _values = {k: _freeze(v, version, built_at) for k, v in values.items()}
+        object.__setattr__(self, "_values", _values)
+        object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "built_at", built_at)
+        object.__setattr__(self, "build_seconds", build_seconds)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Snapshot is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Snapshot is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Snapshot):
+            return self._values == other._values
+        if isinstance(other, Mapping):
+            return self._values == dict(other.items())
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(frozenset(self._values.items())))
+        return self._hash
+
+    def __reduce__(self):
+        return (
+            type(self),
+            (self._values, self.version, self.built_at, self.build_seconds),
+        )
+
+    def __repr__(self) -> str:
+        return f"Snapshot(version={self.version}, {self._values})"
+
+    def as_dict(self) -> dict:
+        """
+        Returns the snapshot as a dict, nested snapshots included.
+        """
+        return {
+            k: v.as_dict() if isinstance(v, Snapshot) else v
+            for k, v in self._values.items()
+        }
+
+
+class SnapshotRefresher:
+    """
+    Keep a snapshot up to date: a new snapshot is built in a background
+    thread every interval seconds, and swapped in atomically if its values
+    changed. Readers get the current snapshot with the snapshot attribute:
+    one consistent version, never a mix of two.
+
+    If a build fails, the error is logged and the current snapshot is kept.
+
+    The background thread does not survive fork: in a child process, the
+    refresher is stopped until started again.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Snapshot],
+        interval: float = 60.0,
+        logger=None,
+        on_swap: Optional[Callable[[Snapshot], Any]] = None,
+    ):
+        """
+        Builds the first snapshot synchronously: build errors are raised.
+
+        :param build: returns a new snapshot, e.g. Confita.snapshot with a
+        schema bound
+        :param interval: delay between two builds, in seconds
+        :param logger: logging interface for build errors
+        :param on_swap: called with the first snapshot, then with each
+        snapshot swapped in, in order (e.g. SharedSnapshotPublisher.publish)
+        """
+        self.build = build
+        self.interval = interval
+        self.logger = logger
+        self.on_swap = on_swap
+        self.snapshot: Snapshot = build()
+        if on_swap is not None:
+            on_swap(self.snapshot)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self) -> bool:
+        """
+        Build a new snapshot now, and swap it in if its values changed.
+        Returns True if swapped.
+        """
+        with self._lock:
+            snapshot = self.build()
+            if snapshot == self.snapshot:
+                return False
+            # Single reference assignment: readers see the old or new snapshot
+            self.snapshot = snapshot
+            if self.on_swap is not None:
+                self.on_swap(snapshot)
+            return True
+
+    def start(self) -> "SnapshotRefresher":
+        """
+        Start the background thread, if not started.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_loop,
+                name="pyconfita-snapshot-refresh",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, if any.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                if self.logger is not None:
+                    self.logger.log(
+                        **{
+                            "level": "error",
+                            "message": {
+                                "message": f"Failed to refresh snapshot,"
+                                f" keeping version {self.snapshot.version}: {e}"
+                            },
+                        }
+                    )
+
+    def __enter__(self) -> "SnapshotRefresher":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,6 @@
+"""
+Test support shipped with the package: a local Vault agent stub and a thread
+runner, used by the package tests and benchmarks.
+"""
+from pyconfita.testing.threads import run_threads
+from pyconfita.testing.vault_stub import serve
@@ -0,0 +1,25 @@
+import threading
+from typing import Any, Callable, List
+
+
+def run_threads(fn: Callable[[int], Any], n: int) -> List[Any]:
+    """
+    Run fn(i) in n threads started at once.
+    Returns the result of each thread, in order, or the error it raised.
+    """
+    barrier = threading.Barrier(n)
+    results: List[Any] = [None] * n
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = fn(i)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
@@ -0,0 +1,149 @@
+"""
+Local HTTP server standing in for the Vault agent, used by the Vault backend
+tests and benchmarks. Standard library only.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubVaultHandler(BaseHTTPRequestHandler):
+    """
+    Mimic the Vault agent:
+    - GET / answers 200 (readiness), 503 while the server is not ready
+    - GET /v1/<path> answers the key-value store at path, 404 if not found
+    - GET /v1/<mount>/data/<path>[?version=<n>] answers the current (or n-th)
+    version of the KV v2 secret at path, with its metadata
+    - GET /v1/<mount>/metadata/<path> answers the KV v2 metadata at path
+    Each answer is delayed by the server delay, in seconds.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body at once on keep-alive connections
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.client_ports.add(self.client_address[1])
+
+        if server.delay:
+            time.sleep(server.delay)
+        status, body = 200, {}
+        if not server.ready:
+            status, body = 503, {"errors": ["agent not ready"]}
+        elif self.path.startswith("/v1/"):
+            url = urlsplit(self.path)
+            path = url.path[len("/v1/") :]
+            data = server.read(path, parse_qs(url.query))
+            if data is None:
+                status, body = 404, {"errors": []}
+            else:
+                body = {"data": data}
+
+        payload = json.dumps(body).encode()
+        with server.lock:
+            server.bytes_sent += len(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubVaultServer(ThreadingHTTPServer):
+    """Local HTTP server mimicking the Vault agent key-value read endpoint"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        store: dict,
+        delay: float = 0.0,
+        kv2_store: Optional[dict] = None,
+        mount_point: str = "secret",
+    ):
+        super().__init__(("127.0.0.1", 0), StubVaultHandler)
+        self.store = store
+        # KV v2: path -> list of versions of the secret, oldest first
+        self.kv2_store = kv2_store if kv2_store is not None else {}
+        self.mount_point = mount_point
+        self.delay = delay
+        self.ready = True
+        self.bytes_sent = 0
+        self.requests = []
+        self.client_ports = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def data_requests(self) -> list:
+        return [r for r in self.requests if r.startswith("/v1/")]
+
+    def put_kv2(self, path: str, data: dict) -> int:
+        """
+        Write a new version of the KV v2 secret at path. Returns its version.
+        """
+        with self.lock:
+            versions = self.kv2_store.setdefault(path, [])
+            versions.append(data)
+            return len(versions)
+
+    def read(self, path: str, query: dict) -> Optional[dict]:
+        """
+        Returns the data answered at path, None if not found.
+        """
+        data_prefix = f"{self.mount_point}/data/"
+        metadata_prefix = f"{self.mount_point}/metadata/"
+        if path.startswith(data_prefix):
+            versions = self.kv2_store.get(path[len(data_prefix) :])
+            if not versions:
+                return None
+            version = int(query.get("version", [len(versions)])[0])
+            if not 0 < version <= len(versions):
+                return None
+            return {
+                "data": versions[version - 1],
+                "metadata": {"version": version, "destroyed": False},
+            }
+        if path.startswith(metadata_prefix):
+            versions = self.kv2_store.get(path[len(metadata_prefix) :])
+            if not versions:
+                return None
+            return {
+                "current_version": len(versions),
+                "versions": {
+                    str(v): {"destroyed": False} for v in range(1, len(versions) + 1)
+                },
+            }
+        return self.store.get(path)
+
+
+@contextmanager
+def serve(store: dict, delay: float = 0.0, kv2_store: Optional[dict] = None):
+    """
+    Run a StubVaultServer serving store (path -> key-value store) and
+    kv2_store (path -> versions of the KV v2 secret) in a background thread,
+    answering after delay seconds.
+    """
+    server = StubVaultServer(store=store, delay=delay, kv2_store=kv2_store)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,164 @@
+import contextvars
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Span attribute names
+KEY = "pyconfita.key"
+PATH = "pyconfita.path"
+BACKEND = "pyconfita.backend"
+OUTCOME = "pyconfita.outcome"
+
+
+class Span:
+    """
+    Simple span interface, shaped as OpenTelemetry spans. Defaults to no-op.
+
+    A span is a context manager: it ends on exit, and records the exception
+    raised in its block, if any, with outcome "error".
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.set_attribute(OUTCOME, "error")
+            self.record_exception(exc)
+        self.end()
+
+
+class TracerInterface:
+    """
+    Simple tracer interface. Defaults to no-op.
+
+    Callers only start spans, with more than a no-op cost, if enabled is
+    True. Implementations set enabled to True, and override start_span, e.g.
+    to wrap an OpenTelemetry tracer.
+
+    Spans carry attributes: pyconfita.key, pyconfita.path, pyconfita.backend
+    and pyconfita.outcome, when relevant.
+    """
+
+    enabled: bool = False
+
+    def start_span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None
+    ) -> Span:
+        """
+        Returns a started span, to be used as a context manager.
+        """
+        return NOOP_SPAN
+
+
+def batch_outcome(requested: int, found: int) -> str:
+    """
+    Returns the outcome of a lookup of requested keys: hit if all were found,
+    miss if none was found, partial otherwise.
+    """
+    if found == 0:
+        return "miss"
+    if found < requested:
+        return "partial"
+    return "hit"
+
+
+# Shared default (no-op) span and tracer interface
+NOOP_SPAN = Span()
+NOOP_TRACER = TracerInterface()
+
+
+class RecordedSpan(Span):
+    """
+    Span recorded by InMemoryTracer.
+    """
+
+    def __init__(
+        self,
+        tracer: "InMemoryTracer",
+        name: str,
+        attributes: Optional[Dict[str, Any]],
+        parent: Optional["RecordedSpan"],
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.exception: Optional[BaseException] = None
+        self.start_time = time.perf_counter()
+        self.end_time: Optional[float] = None
+        self._token = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.exception = exception
+
+    def __enter__(self) -> "RecordedSpan":
+        # Spans started in this block are children of this span
+        self._token = self.tracer._current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            self.tracer._current.reset(self._token)
+            self._token = None
+        super().__exit__(exc_type, exc, tb)
+
+    def end(self) -> None:
+        if self.end_time is None:
+            self.end_time = time.perf_counter()
+            self.tracer._record(self)
+
+    def __repr__(self) -> str:
+        return f"RecordedSpan({self.name}, {self.attributes})"
+
+
+class InMemoryTracer(TracerInterface):
+    """
+    Tracer recording finished spans in memory, with their parent span.
+    Meant for tests and debugging.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.spans: List[RecordedSpan] = []
+        self.lock = threading.Lock()
+        self._current = contextvars.ContextVar("pyconfita_span", default=None)
+
+    def start_span(
+        self, name: str, attributes: Optional[Dict[str, Any]] = None
+    ) -> RecordedSpan:
+        return RecordedSpan(self, name, attributes, parent=self._current.get())
+
+    def _record(self, span: RecordedSpan) -> None:
+        with self.lock:
+            self.spans.append(span)
+
+    def find(self, name: str) -> List[RecordedSpan]:
+        """
+        Returns finished spans named name, in order of end.
+        """
+        with self.lock:
+            return [span for span in self.spans if span.name == name]
+
+    def reset(self) -> None:
+        with self.lock:
+            self.spans = []
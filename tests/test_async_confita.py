@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from pyconfita import (
+    AsyncConfita,
+    AsyncVaultBackend,
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+)
+from pyconfita.backend.backend import AsyncBackend
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+class SlowAsyncBackend(AsyncBackend):
+    """Asynchronous dict backend answering after a delay"""
+
+    name = "slow"
+
+    def __init__(self, kv: dict, delay: float):
+        self.kv = kv
+        self.delay = delay
+
+    async def _get(self, key: str, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self.kv.get(key)
+
+    async def get_struct(self, schema: dict, **kwargs) -> dict:
+        await asyncio.sleep(self.delay)
+        return {k: self._cast(self.kv.get(k), type=t) for k, t in schema.items()}
+
+    async def get_many(self, keys: dict, **kwargs) -> dict:
+        _struct = await self.get_struct(keys, **kwargs)
+        return {k: v for k, v in _struct.items() if v is not None}
+
+
+def test_get():
+    """Test get with synchronous and asynchronous backends. Ensure precedence
+    is identical to Confita"""
+
+    async def run():
+        c = AsyncConfita(
+            logger=MOCK_LOGGER,
+            backends=[
+                SlowAsyncBackend({"K_1": "slow", "K_2": "slow"}, delay=0.01),
+                DictBackend({"K_1": "dict", "K_3": "10"}),
+            ],
+        )
+        assert await c.get("K_1") == "dict"
+        assert await c.get("K_2") == "slow"
+        assert await c.get("K_3", type=int) == 10
+        assert await c.get("K_UNKNOWN") is None
+
+        c = AsyncConfita(
+            logger=MOCK_LOGGER,
+            backends=[DictBackend({"key_1": "dict"})],
+            case_sensitive=False,
+        )
+        assert await c.get("KEY_1") == "dict"
+
+    asyncio.run(run())
+
+
+def test_get_concurrent_backends():
+    """Test backends are queried concurrently"""
+
+    async def run():
+        c = AsyncConfita(
+            logger=MOCK_LOGGER,
+            backends=[SlowAsyncBackend({"K_1": str(i)}, delay=0.2) for i in range(5)],
+        )
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await c.get("K_1") == "4"
+        assert await c.get_struct({"K_1": str}) == {"K_1": "4"}
+        # Two rounds of concurrent reads, not ten sequential reads
+        assert loop.time() - start < 0.8
+
+    asyncio.run(run())
+
+
+def test_get_struct():
+    """Test get_struct with and without short-circuit resolution"""
+
+    async def run():
+        backends = [
+            SlowAsyncBackend({"K_1": "slow", "K_2": "slow"}, delay=0.01),
+            DictBackend({"K_1": "dict", "K_3": "1.5"}),
+        ]
+        schema = {"K_1": str, "K_2": str, "K_3": float, "K_4": str}
+        expected = {"K_1": "dict", "K_2": "slow", "K_3": 1.5, "K_4": None}
+
+        c = AsyncConfita(logger=MOCK_LOGGER, backends=backends)
+        assert await c.get_struct(schema) == expected
+
+        c = AsyncConfita(logger=MOCK_LOGGER, backends=backends, short_circuit=True)
+        assert await c.get_struct(schema) == expected
+
+    asyncio.run(run())
+
+
+def test_confita_rejects_async_backends():
+    """Test Confita raises on asynchronous backends, instead of returning
+    coroutines"""
+    slow = SlowAsyncBackend({"K_1": "slow"}, delay=0)
+    with pytest.raises(Exception, match="AsyncConfita"):
+        Confita(logger=MOCK_LOGGER, backends=[DictBackend({}), slow])
+
+    vault = AsyncVaultBackend(MOCK_LOGGER, readiness_timeout=0)
+    try:
+        with pytest.raises(Exception, match="AsyncConfita"):
+            Confita(logger=MOCK_LOGGER, backends=[vault])
+    finally:
+        vault.close()
+
+    async def run():
+        c = AsyncConfita(logger=MOCK_LOGGER, backends=[slow])
+        assert await c.get("k_1") is None
+        assert await slow.get_case_insensitive("k_1") == "slow"
+
+    asyncio.run(run())
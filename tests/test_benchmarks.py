@@ -0,0 +1,45 @@
+from benchmarks.__main__ import compare, flatten
+
+
+def test_flatten():
+    """Test numeric results are flattened by path"""
+    results = {"a": 1, "b": {"c": 2.5, "d": ["x"]}, "e": True}
+    assert flatten(results) == {"a": 1, "b/c": 2.5}
+
+
+def test_compare():
+    """Test regressions are reported above threshold, in both directions"""
+    baseline = {
+        "benchmarks": {
+            "ops": {"higher_is_better": True, "results": {"a": 100, "b": 100}},
+            "durations": {"higher_is_better": False, "results": {"a": 100}},
+        }
+    }
+    current = {
+        "benchmarks": {
+            "ops": {"higher_is_better": True, "results": {"a": 80, "b": 95, "c": 1}},
+            "durations": {"higher_is_better": False, "results": {"a": 120}},
+        }
+    }
+    regressions = compare(baseline, current, threshold=0.1)
+    assert [r[0] for r in regressions] == ["ops:a", "durations:a"]
+    assert compare(baseline, current, threshold=0.5) == []
+
+
+def test_compare_budgets():
+    """Test metrics over the budget of their benchmark are reported, without
+    baseline"""
+    current = {
+        "benchmarks": {
+            "import": {
+                "higher_is_better": False,
+                "budgets": {"import_us": 100},
+                "results": {"import_us": 150, "other_us": 1000},
+            }
+        }
+    }
+    assert compare({"benchmarks": {}}, current, threshold=0.1) == [
+        ("import:import_us", 100, 150, 0.5)
+    ]
+    current["benchmarks"]["import"]["results"]["import_us"] = 100
+    assert compare({"benchmarks": {}}, current, threshold=0.1) == []
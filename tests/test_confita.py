@@ -1,12 +1,15 @@
 import os
+import time
 from unittest import mock
 
+from pyconfita.testing import serve
 from pyconfita import (
     Confita,
     EnvBackend,
     FileBackend,
     DictBackend,
     VaultBackend,
+    Schema,
     DummyLoggingInterface,
 )
 
@@ -112,6 +115,40 @@ def test_case_sensitive():
     assert c.get("KEY_1") == "bk_1"
 
 
+def test_case_insensitive_mixed_case():
+    """Test get and get_struct with case sensitivity disabled. Ensure
+    mixed-case keys are found, and falsy values are not discarded"""
+    bk_1 = DictBackend({"DbHost": "bk_1", "Port": "5432", "Debug": "true"})
+    bk_2 = DictBackend({"dbhost": "", "PORT": "0", "DEBUG": False})
+    c = Confita(
+        logger=MOCK_LOGGER,
+        backends=[bk_1],
+        case_sensitive=False,
+        case_insensitive_struct=True,
+    )
+    assert c.get("DBHOST") == "bk_1"
+    assert c.get("dbhost") == "bk_1"
+    assert c.get_struct(Schema({"db_host": str, "DBHOST": str})) == {
+        "db_host": None,
+        "DBHOST": "bk_1",
+    }
+
+    c = Confita(
+        logger=MOCK_LOGGER,
+        backends=[bk_1, bk_2],
+        case_sensitive=False,
+        case_insensitive_struct=True,
+    )
+    assert c.get("DbHost") == ""
+    assert c.get("port", type=int) == 0
+    assert c.get("debug", type=bool) is False
+    assert c.get_struct(Schema({"DbHost": str, "port": int, "Debug": bool})) == {
+        "DbHost": "",
+        "port": 0,
+        "Debug": False,
+    }
+
+
 def test_empty_string():
     """Test get. Ensure values empty string values are not discarded"""
 
@@ -184,3 +221,216 @@ def test_get_struct():
             assert _struct.get("K_3") == "secret_3_from_environment"  # Overrides Vault
             assert _struct.get("K_7") == ""
             assert _struct.get("K_UNKNOWN") is None
+
+
+class CountingDictBackend(DictBackend):
+    """Dict backend counting the number of reads"""
+
+    def __init__(self, kv: dict, *args, **kwargs):
+        super().__init__(kv, *args, **kwargs)
+        self.reads = 0
+
+    def _get(self, key: str, **kwargs):
+        self.reads += 1
+        return super()._get(key, **kwargs)
+
+
+def test_cache():
+    """Test get with caching enabled. Ensure backends are read once per
+    (key, type, path, casing mode) until a backend changes"""
+    bk_1 = CountingDictBackend({"K_1": "bk_1", "K_2": "10"})
+    bk_2 = CountingDictBackend({"K_1": "bk_2"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk_1, bk_2], enable_cache=True)
+
+    assert c.get("K_1") == "bk_2"
+    assert c.get("K_1") == "bk_2"
+    assert (bk_1.reads, bk_2.reads) == (1, 1)
+
+    # Type is part of the cache key
+    assert c.get("K_2") == "10"
+    assert c.get("K_2", type=int) == 10
+    assert c.get("K_2", type=int) == 10
+    assert (bk_1.reads, bk_2.reads) == (3, 3)
+
+    # Missing keys are cached too
+    assert c.get("K_UNKNOWN") is None
+    assert c.get("K_UNKNOWN") is None
+    assert (bk_1.reads, bk_2.reads) == (4, 4)
+
+    # Backend change drops cached values
+    bk_2.kv = {"K_1": "bk_2_updated"}
+    bk_2.generation += 1
+    assert c.get("K_1") == "bk_2_updated"
+    assert (bk_1.reads, bk_2.reads) == (5, 5)
+
+
+def test_cache_invalidate():
+    """Test invalidate drops cached values for one key or all keys"""
+    bk = CountingDictBackend({"K_1": "bk_1", "K_2": "bk_2"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], enable_cache=True)
+
+    assert c.get("K_1") == "bk_1"
+    assert c.get("K_2") == "bk_2"
+    assert bk.reads == 2
+
+    bk.kv["K_1"] = "bk_1_updated"
+    bk.kv["K_2"] = "bk_2_updated"
+    assert c.get("K_1") == "bk_1"
+
+    c.invalidate("K_1")
+    assert c.get("K_1") == "bk_1_updated"
+    assert c.get("K_2") == "bk_2"
+    assert bk.reads == 3
+
+    c.invalidate()
+    assert c.get("K_2") == "bk_2_updated"
+    assert bk.reads == 4
+
+
+def test_cache_disabled():
+    """Test get reads backends on every call when caching is disabled"""
+    bk = CountingDictBackend({"K_1": "bk_1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk])
+
+    assert c.get("K_1") == "bk_1"
+    assert c.get("K_1") == "bk_1"
+    assert bk.reads == 2
+
+
+def test_cache_file_reload(tmp_path):
+    """Test get with caching enabled and a reloaded file. Ensure cached values
+    are dropped when the file changes"""
+    file_path = tmp_path / "vars.yaml"
+    file_path.write_text("K_1: file\n")
+    bk = FileBackend(str(file_path), reload=True, reload_interval=0)
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], enable_cache=True)
+    assert c.get("K_1") == "file"
+
+    new_path = tmp_path / "vars.yaml.new"
+    new_path.write_text("K_1: file_updated\n")
+    os.replace(new_path, file_path)
+    assert c.get("K_1") == "file_updated"
+
+
+def test_cache_live_backends():
+    """Test get with caching enabled reads live backends (environment, Vault)
+    on each call, and caches values of the other backends"""
+    bk_dict = CountingDictBackend({"K_1": "dict", "K_2": "dict", "K_3": "dict"})
+    store = {"path1": {"K_2": "vault"}}
+    with serve(store) as server, mock.patch.dict(
+        os.environ, {"PYCONFITA_TEST_K_1": "env"}
+    ):
+        bk_vault = VaultBackend(
+            MOCK_LOGGER,
+            url=server.url,
+            default_key_path="path1",
+            readiness_timeout=1,
+            enable_cache=True,
+            cache_ttl=0.05,
+        )
+        c = Confita(
+            logger=MOCK_LOGGER,
+            backends=[bk_dict, EnvBackend(prefix="PYCONFITA_TEST_"), bk_vault],
+            enable_cache=True,
+        )
+        assert (c.get("K_1"), c.get("K_2"), c.get("K_3")) == ("env", "vault", "dict")
+
+        os.environ["PYCONFITA_TEST_K_1"] = "env_updated"
+        store["path1"]["K_2"] = "vault_updated"
+        assert c.get("K_1") == "env_updated"
+        # Vault cache ttl applies
+        assert c.get("K_2") == "vault"
+        time.sleep(0.1)
+        assert c.get("K_2") == "vault_updated"
+
+        # Live values win over cached values, until they are missing
+        del os.environ["PYCONFITA_TEST_K_1"]
+        assert c.get("K_1") == "dict"
+        assert c.get("K_3") == "dict"
+        assert bk_dict.reads == 3
+        bk_vault.close()
+
+
+def test_cache_maxsize():
+    """Test the oldest key is dropped once cache_maxsize keys are cached"""
+    bk = CountingDictBackend({"K_1": "1", "K_2": "2", "K_3": "3"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], enable_cache=True, cache_maxsize=2)
+    assert (c.get("K_1"), c.get("K_2"), c.get("K_2", type=int)) == ("1", "2", 2)
+    assert c.get("K_3") == "3"
+    assert list(c._cache) == ["K_2", "K_3"]
+    assert c.get("K_2", type=int) == 2
+    assert c.get("K_1") == "1"
+    assert bk.reads == 5
+
+
+def test_get_struct_short_circuit():
+    """Test get_struct with short-circuit resolution. Ensure results are
+    identical to the default resolution"""
+    os.environ.setdefault("K_3", "secret_3_from_environment")
+    os.environ.setdefault("K_7", "")
+
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    vars_file_path = os.path.join(dir_path, "vars.yaml")
+
+    schema = {
+        "K_1": str,
+        "K_2": str,
+        "K_3": str,
+        "K_4": str,
+        "K_5": str,
+        "K_6": str,
+        "K_7": str,
+        "K_8": str,
+        "K_9": bool,
+        "K_10": float,
+    }
+
+    with mock.patch(
+        "hvac.v1.Client.read", side_effect=lambda x: mocked_requests_read(x)
+    ):
+        with mock.patch(
+            "pyconfita.backend.vault.vault.Backend.is_agent_ready",
+            side_effect=mocked_is_ready,
+        ):
+            backends = [
+                VaultBackend(MOCK_LOGGER, default_key_path=f"path1"),
+                FileBackend(vars_file_path),
+                DictBackend({"K_5": "secret_5", "K_10": "10.54"}),
+                EnvBackend(),
+            ]
+            c = Confita(logger=MOCK_LOGGER, backends=backends)
+            c_short_circuit = Confita(
+                logger=MOCK_LOGGER, backends=backends, short_circuit=True
+            )
+
+            _struct = c_short_circuit.get_struct(schema)
+            assert _struct == c.get_struct(schema)
+            assert _struct.get("K_1") == "secret_1"
+            assert _struct.get("K_2") == "secret_2_from_yml"
+            assert _struct.get("K_3") == "secret_3_from_environment"
+            assert _struct.get("K_7") == ""
+            assert _struct.get("K_8") is None
+            assert _struct.get("K_9") == True
+            assert _struct.get("K_10") == 10.54
+
+
+def test_get_struct_short_circuit_skips_resolved_keys():
+    """Test get_struct with short-circuit resolution. Ensure backends are only
+    asked for unresolved keys, and not queried once all keys are resolved"""
+    bk_1 = CountingDictBackend({"K_1": "bk_1", "K_2": "bk_1"})
+    bk_2 = CountingDictBackend({"K_1": "bk_2"})
+    bk_3 = CountingDictBackend({"K_1": "bk_3", "K_2": "bk_3"})
+
+    c = Confita(logger=MOCK_LOGGER, backends=[bk_1, bk_2], short_circuit=True)
+    assert c.get_struct({"K_1": str, "K_2": str, "K_3": str}) == {
+        "K_1": "bk_2",
+        "K_2": "bk_1",
+        "K_3": None,
+    }
+    assert bk_2.reads == 3
+    # K_1 already resolved by bk_2
+    assert bk_1.reads == 2
+
+    c = Confita(logger=MOCK_LOGGER, backends=[bk_1, bk_2, bk_3], short_circuit=True)
+    assert c.get_struct({"K_1": str, "K_2": str}) == {"K_1": "bk_3", "K_2": "bk_3"}
+    assert (bk_1.reads, bk_2.reads, bk_3.reads) == (2, 3, 2)
@@ -0,0 +1,19 @@
+import pyconfita
+from benchmarks import bench_import
+
+
+def test_lazy_exports():
+    """Test lazily exported names are resolved on access"""
+    from pyconfita.backend.vault.vault import Backend as VaultBackend
+    from pyconfita.backend.file.file import Backend as FileBackend
+
+    assert pyconfita.VaultBackend is VaultBackend
+    assert pyconfita.FileBackend is FileBackend
+    assert set(pyconfita.__all__) <= set(dir(pyconfita))
+
+
+def test_env_dict_imports():
+    """Test importing the env/dict path does not import heavy dependencies.
+    The import time budget is checked by the benchmarks compare gate"""
+    _, heavy_modules = bench_import.import_time()
+    assert heavy_modules == []
@@ -0,0 +1,63 @@
+from pyconfita import Confita, DictBackend, DummyLoggingInterface, LoggingInterface
+
+
+class RecordingLoggingInterface(DummyLoggingInterface):
+    """Logging interface recording emitted messages"""
+
+    def __init__(self, level: str = "debug"):
+        super().__init__(level=level)
+        self.records = []
+
+    def log(self, level=None, message=None, *args, **kwargs) -> None:
+        if self.is_enabled(level):
+            self.records.append((level, message))
+
+
+def test_is_enabled():
+    """Test is_enabled with respect to the logger level"""
+    logger = DummyLoggingInterface()
+    assert logger.is_enabled("debug")
+    assert logger.is_enabled("error")
+
+    logger = DummyLoggingInterface(level="warning")
+    assert not logger.is_enabled("debug")
+    assert not logger.is_enabled("info")
+    assert logger.is_enabled("warning")
+    assert logger.is_enabled("error")
+    # Unknown levels are emitted
+    assert logger.is_enabled(None)
+
+    # Base interface emits everything
+    assert LoggingInterface().is_enabled("debug")
+
+
+def test_log_deferred():
+    """Test log_deferred only builds messages for enabled levels"""
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return {"message": "built"}
+
+    logger = RecordingLoggingInterface(level="info")
+    logger.log_deferred(level="debug", message_factory=factory)
+    assert calls == []
+    assert logger.records == []
+
+    logger.log_deferred(level="info", message_factory=factory)
+    assert calls == [1]
+    assert logger.records == [("info", {"message": "built"})]
+
+
+def test_confita_skips_disabled_debug_messages():
+    """Test Confita.get does not log debug messages when debug is disabled"""
+    logger = RecordingLoggingInterface(level="info")
+    c = Confita(logger=logger, backends=[DictBackend({"K_1": "v"})])
+    assert c.get("K_1") == "v"
+    assert logger.records == []
+
+    logger = RecordingLoggingInterface()
+    c = Confita(logger=logger, backends=[DictBackend({"K_1": "v"})])
+    assert c.get("K_1") == "v"
+    assert len(logger.records) == 4
+    assert logger.records[-1] == ("debug", {"message": "Final value read for K_1 = v"})
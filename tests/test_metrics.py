@@ -0,0 +1,117 @@
+import asyncio
+
+from pyconfita import (
+    AsyncConfita,
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    InMemoryMetrics,
+    Schema,
+)
+from pyconfita.metrics_interface import NOOP_METRICS
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+def test_noop_metrics():
+    """Test metrics default to the no-op interface"""
+    bk = DictBackend({"K_1": "bk_1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk])
+    assert c.metrics is NOOP_METRICS
+    assert bk.metrics is NOOP_METRICS
+    assert not c.metrics.enabled
+    assert c.get("K_1") == "bk_1"
+
+
+def test_in_memory_metrics_prometheus():
+    """Test counters and histograms dump in Prometheus text format"""
+    metrics = InMemoryMetrics(buckets=(0.1, 1.0))
+    metrics.increment("requests_total", labels={"backend": 'a"b'})
+    metrics.increment("requests_total", 2, labels={"backend": 'a"b'})
+    metrics.observe("latency_seconds", 0.05)
+    metrics.observe("latency_seconds", 0.5)
+    metrics.observe("latency_seconds", 5)
+
+    assert metrics.get_counter("requests_total", backend='a"b') == 3
+    assert metrics.as_prometheus() == (
+        "# TYPE requests_total counter\n"
+        'requests_total{backend="a\\"b"} 3\n'
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 1\n'
+        'latency_seconds_bucket{le="1.0"} 2\n'
+        'latency_seconds_bucket{le="+Inf"} 3\n'
+        "latency_seconds_sum 5.55\n"
+        "latency_seconds_count 3\n"
+    )
+
+
+def test_confita_metrics():
+    """Test Confita reports lookups, winning backends and latencies"""
+    metrics = InMemoryMetrics()
+    bk_1 = DictBackend({"K_1": "bk_1", "K_2": "bk_1"})
+    bk_2 = DictBackend({"K_1": "bk_2"})
+    bk_1.name = "dict_1"
+    bk_2.name = "dict_2"
+    c = Confita(logger=MOCK_LOGGER, backends=[bk_1, bk_2], metrics=metrics)
+    assert bk_1.metrics is metrics
+
+    assert c.get("K_1") == "bk_2"
+    lookups = "pyconfita_backend_lookups_total"
+    assert metrics.get_counter(lookups, backend="dict_1", result="hit") == 1
+    assert metrics.get_counter(lookups, backend="dict_2", result="hit") == 1
+    assert metrics.get_counter("pyconfita_backend_wins_total", backend="dict_2") == 1
+    assert metrics.get_histogram("pyconfita_get_seconds").count == 1
+
+    metrics.reset()
+    for short_circuit in [False, True]:
+        c.short_circuit = short_circuit
+        for schema in [{"K_1": str, "K_2": str}, Schema({"K_1": str, "K_2": str})]:
+            assert c.get_struct(schema) == {"K_1": "bk_2", "K_2": "bk_1"}
+    wins = "pyconfita_backend_wins_total"
+    assert metrics.get_counter(wins, backend="dict_1") == 4
+    assert metrics.get_counter(wins, backend="dict_2") == 4
+    assert metrics.get_counter(lookups, backend="dict_2", result="miss") == 4
+    assert metrics.get_histogram("pyconfita_get_struct_seconds").count == 4
+
+
+def test_confita_cache_metrics():
+    """Test Confita reports cache hits, misses and evictions"""
+    metrics = InMemoryMetrics()
+    bk = DictBackend({"K_1": "bk_1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], enable_cache=True, metrics=metrics)
+
+    c.get("K_1")
+    c.get("K_1")
+    bk.kv = {"K_1": "bk_1_updated"}
+    assert c.get("K_1") == "bk_1_updated"
+    c.invalidate()
+
+    requests = "pyconfita_cache_requests_total"
+    evictions = "pyconfita_cache_evictions_total"
+    assert metrics.get_counter(requests, cache="confita", result="hit") == 1
+    assert metrics.get_counter(requests, cache="confita", result="miss") == 2
+    assert metrics.get_counter(evictions, cache="confita", reason="generation") == 1
+    assert metrics.get_counter(evictions, cache="confita", reason="invalidate") == 1
+
+
+def test_async_confita_metrics():
+    """Test AsyncConfita reports lookups, winning backends and latencies"""
+    metrics = InMemoryMetrics()
+    bk_1 = DictBackend({"K_1": "bk_1", "K_2": "bk_1"})
+    bk_2 = DictBackend({"K_1": "bk_2"})
+    bk_2.name = "dict_2"
+    c = AsyncConfita(logger=MOCK_LOGGER, backends=[bk_1, bk_2], metrics=metrics)
+
+    async def main():
+        assert await c.get("K_1") == "bk_2"
+        assert await c.get_struct({"K_1": str, "K_2": str}) == {
+            "K_1": "bk_2",
+            "K_2": "bk_1",
+        }
+
+    asyncio.run(main())
+    wins = "pyconfita_backend_wins_total"
+    assert metrics.get_counter(wins, backend="dict_2") == 2
+    assert metrics.get_counter(wins, backend="dict") == 1
+    assert metrics.get_histogram("pyconfita_get_seconds").count == 1
+    assert metrics.get_histogram("pyconfita_get_struct_seconds").count == 1
@@ -0,0 +1,175 @@
+import pytest
+
+from pyconfita import Confita, DictBackend, DummyLoggingInterface, Schema
+from pyconfita.backend.backend import Backend
+from pyconfita.schema import get_caster, get_key_variants
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+def test_get_caster():
+    """Test casters convert values as Backend._cast"""
+    bk = Backend()
+    for _type, values in [
+        (str, ["s", None]),
+        (bool, ["true", "f", True, None]),
+        (int, ["10", 10, None]),
+        (float, ["10.5", 10.5, None]),
+    ]:
+        for v in values:
+            assert get_caster(_type)(v) == bk._cast(v, type=_type)
+
+    with pytest.raises(Exception):
+        get_caster(bool)(10)
+
+    with pytest.raises(Exception):
+        get_caster(list)
+
+
+def test_get_key_variants():
+    """Test casing variations are ordered and deduplicated"""
+    assert get_key_variants("Key") == ("Key", "KEY", "key")
+    assert get_key_variants("KEY") == ("KEY", "key")
+
+
+def test_schema():
+    """Test compiled schema fields, defaults and result"""
+    schema = Schema({"host": str, "port": (int, 8080), "db-name": str})
+    assert dict(schema) == {"host": str, "port": int, "db-name": str}
+    assert schema.defaults == {"port": 8080}
+    assert Schema.compile(schema) is schema
+
+    res = schema.build({"host": "localhost"})
+    assert res == {"host": "localhost", "port": 8080, "db-name": None}
+    assert res["host"] == "localhost"
+    assert res.get("db-name") is None
+    assert res.host == "localhost"
+    assert res.port == 8080
+    assert list(res.keys()) == ["host", "port", "db-name"]
+    assert res.as_dict() == {"host": "localhost", "port": 8080, "db-name": None}
+    with pytest.raises(KeyError):
+        res["unknown"]
+
+    sub = schema.subset(["port"])
+    assert dict(sub) == {"port": int}
+    assert sub.build({}) == {"port": 8080}
+
+
+def test_backend_get_struct():
+    """Test backend get_struct and get_many with a compiled schema"""
+    bk = DictBackend({"host": "localhost", "port": "5432", "debug": "true"})
+    schema = Schema({"host": str, "port": int, "debug": bool, "user": (str, "me")})
+
+    res = bk.get_struct(schema)
+    assert res == {"host": "localhost", "port": 5432, "debug": True, "user": "me"}
+    assert bk.get_many(schema) == {"host": "localhost", "port": 5432, "debug": True}
+
+    fields = {"host": str, "port": int, "debug": bool, "user": str}
+    assert dict(bk.get_struct(Schema(fields))) == bk.get_struct(fields)
+
+
+def test_confita_get_struct():
+    """Test Confita.get_struct with a compiled schema: identical precedence
+    as with a dict schema, defaults only applied for unresolved keys"""
+    backends = [
+        DictBackend({"K_1": "bk_1", "K_2": "bk_1", "K_3": "1"}),
+        DictBackend({"K_1": "bk_2"}),
+    ]
+    fields = {"K_1": str, "K_2": str, "K_3": int, "K_4": str}
+    schema = Schema({**fields, "K_2": (str, "default"), "K_4": (str, "default")})
+
+    for short_circuit in [False, True]:
+        c = Confita(logger=MOCK_LOGGER, backends=backends, short_circuit=short_circuit)
+        assert c.get_struct(fields) == {
+            "K_1": "bk_2",
+            "K_2": "bk_1",
+            "K_3": 1,
+            "K_4": None,
+        }
+        assert c.get_struct(schema) == {
+            "K_1": "bk_2",
+            "K_2": "bk_1",
+            "K_3": 1,
+            "K_4": "default",
+        }
+
+
+def test_confita_get_struct_case_insensitive():
+    """Test Confita.get_struct reads exact keys of every schema form, unless
+    case-insensitive struct reads are enabled: then casing variations of keys
+    are read for every schema form"""
+    backends = [DictBackend({"KEY_1": "bk_1", "key_2": "bk_1"})]
+    fields = {"key_1": str, "KEY_2": str, "Key_3": str}
+    exact = {"key_1": None, "KEY_2": None, "Key_3": None}
+
+    for case_sensitive in (True, False):
+        c = Confita(
+            logger=MOCK_LOGGER, backends=backends, case_sensitive=case_sensitive
+        )
+        assert c.get_struct(fields) == exact
+        assert c.get_struct(Schema(fields)) == exact
+
+    for short_circuit in (False, True):
+        c = Confita(
+            logger=MOCK_LOGGER,
+            backends=backends,
+            case_insensitive_struct=True,
+            short_circuit=short_circuit,
+        )
+        expected = {"key_1": "bk_1", "KEY_2": "bk_1", "Key_3": None}
+        assert c.get_struct(fields) == expected
+        assert c.get_struct(Schema(fields)) == expected
+
+
+def test_confita_get_struct_nested_casing():
+    """Test nesting a schema does not change how its flat keys are read"""
+    bk = DictBackend({"KEY_1": "bk_1", "db": {"host": "localhost"}})
+    flat = {"key_1": str}
+    nested = {"key_1": str, "db": {"host": str}}
+
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], case_sensitive=False)
+    assert c.get_struct(flat) == {"key_1": None}
+    assert c.get_struct(nested) == {"key_1": None, "db": {"host": "localhost"}}
+
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], case_insensitive_struct=True)
+    assert c.get_struct(flat) == {"key_1": "bk_1"}
+    assert c.get_struct(nested) == {"key_1": "bk_1", "db": {"host": "localhost"}}
+
+
+def test_nested_schema():
+    """Test compiled nested schema fields are read at dotted paths, and the
+    result holds nested structs"""
+    schema = Schema({"db": {"host": str, "port": (int, 5432)}, "debug": bool})
+    assert dict(schema) == {"db.host": str, "db.port": int, "debug": bool}
+    assert schema.defaults == {"db.port": 5432}
+
+    res = schema.build({"db.host": "localhost"})
+    assert res.db.host == "localhost"
+    assert res["db"]["port"] == 5432
+    assert res.debug is None
+    assert res.as_dict() == {"db": {"host": "localhost", "port": 5432}, "debug": None}
+
+
+def test_confita_get_struct_nested():
+    """Test Confita get_struct with nested schemas, across backends"""
+    bk_1 = DictBackend({"db": {"primary": {"host": "bk_1", "port": "5432"}}})
+    bk_2 = DictBackend({"db": {"primary": {"host": "bk_2"}}, "debug": "true"})
+    schema = {"db": {"primary": {"host": str, "port": int}}, "debug": bool}
+    expected = {"db": {"primary": {"host": "bk_2", "port": 5432}}, "debug": True}
+
+    for short_circuit in [False, True]:
+        for case_sensitive in [True, False]:
+            c = Confita(
+                logger=MOCK_LOGGER,
+                backends=[bk_1, bk_2],
+                case_sensitive=case_sensitive,
+                short_circuit=short_circuit,
+            )
+            assert c.get_struct(schema) == expected
+            assert c.get_struct(Schema(schema)).as_dict() == expected
+            assert c.get("db.primary.port", type=int) == 5432
+
+    assert bk_1.get_struct(schema) == {
+        "db": {"primary": {"host": "bk_1", "port": 5432}},
+        "debug": None,
+    }
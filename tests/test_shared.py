@@ -0,0 +1,203 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import pytest
+
+from pyconfita import (
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    SharedSnapshotPublisher,
+    SharedSnapshotReader,
+    Snapshot,
+    StringBackend,
+)
+from pyconfita.fork import register_after_fork
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+requires_fork = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+
+@pytest.fixture
+def publisher():
+    with SharedSnapshotPublisher(name=f"pyconfita_test_{uuid.uuid4().hex[:8]}") as p:
+        yield p
+
+
+def run_in_child(fn) -> dict:
+    """
+    Fork, run fn in the child, and return its JSON result.
+    """
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        try:
+            res = {"result": fn()}
+        except Exception as e:
+            res = {"error": repr(e)}
+        os.write(w, json.dumps(res).encode())
+        os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        res = json.loads(f.read())
+    os.waitpid(pid, 0)
+    assert "error" not in res, res["error"]
+    return res["result"]
+
+
+def test_shared_snapshot(publisher):
+    """Test snapshots published in shared memory are read back by generation"""
+    reader = SharedSnapshotReader(publisher.name)
+    assert reader.generation == 0
+    with pytest.raises(Exception):
+        reader.snapshot
+
+    s = Snapshot({"K_1": "v1", "K_2": 2, "db": {"hosts": ["a", "b"]}}, version=3)
+    assert publisher.publish(s) == 1
+    assert reader.generation == 1
+    assert reader.snapshot == s
+    assert reader.snapshot.version == 3
+    assert reader.snapshot["db"]["hosts"] == ("a", "b")
+    assert reader.snapshot is reader.snapshot
+
+    for i in range(5):
+        publisher.publish(Snapshot({"K_1": f"v{i}"}))
+    assert reader.generation == 6
+    assert reader.snapshot == {"K_1": "v4"}
+    reader.close()
+
+
+def test_shared_snapshot_sets(publisher):
+    """Test set values (e.g. YAML !!set) are shared, other values are
+    rejected"""
+    reader = SharedSnapshotReader(publisher.name)
+    s = Snapshot({"tags": {"a", "b"}, "db": {"roles": frozenset([1, 2])}})
+    publisher.publish(s)
+    assert reader.snapshot == s
+    assert reader.snapshot["tags"] == frozenset(["a", "b"])
+    assert reader.snapshot["db"]["roles"] == frozenset([1, 2])
+
+    with pytest.raises(Exception, match="bytes"):
+        publisher.publish(Snapshot({"K_1": b"raw"}))
+    reader.close()
+
+
+def test_shared_snapshot_reader_exit(publisher):
+    """Test segments outlive a reader process exiting: readers do not
+    register them to their resource tracker"""
+    publisher.publish(Snapshot({"K_1": "v1"}))
+    code = (
+        "from pyconfita import SharedSnapshotReader; "
+        f"print(SharedSnapshotReader({publisher.name!r}).snapshot['K_1'])"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    res = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    )
+    assert res.stdout.strip() == "v1", res.stderr
+    # Resource trackers unlink tracked segments once their process exited
+    time.sleep(0.2)
+    assert SharedSnapshotReader(publisher.name).snapshot["K_1"] == "v1"
+
+
+def test_shared_snapshot_missing():
+    """Test readers fail on unknown segments"""
+    with pytest.raises(FileNotFoundError):
+        SharedSnapshotReader(f"pyconfita_test_{uuid.uuid4().hex[:8]}")
+
+
+@requires_fork
+def test_shared_snapshot_fork(publisher):
+    """Test forked workers read snapshots published by the parent"""
+    bk = DictBackend({"K_1": "v1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk])
+    refresher = c.refresher({"K_1": str}, on_swap=publisher.publish)
+    reader = SharedSnapshotReader(publisher.name)
+
+    assert run_in_child(lambda: reader.snapshot["K_1"]) == "v1"
+    bk.kv = {"K_1": "v2"}
+    refresher.refresh()
+    assert publisher.generation == 2
+    assert run_in_child(
+        lambda: [
+            SharedSnapshotReader(publisher.name).snapshot["K_1"],
+            reader.generation,
+        ]
+    ) == ["v2", 2]
+
+    def publish_in_child():
+        try:
+            publisher.publish(Snapshot({}))
+        except Exception:
+            return "refused"
+
+    assert run_in_child(publish_in_child) == "refused"
+    # Segments are still readable once the child exited
+    assert reader.snapshot["K_1"] == "v2"
+
+
+@requires_fork
+def test_after_fork():
+    """Test objects registered are reset in forked children only"""
+
+    class Resource:
+        def __init__(self):
+            self.resets = 0
+            register_after_fork(self)
+
+        def _after_fork(self):
+            self.resets += 1
+
+    resource = Resource()
+    assert run_in_child(lambda: resource.resets) == 1
+    assert resource.resets == 0
+
+
+@requires_fork
+def test_after_fork_failure():
+    """Test a failing reset does not skip the objects registered after it"""
+
+    class Failing:
+        def __init__(self):
+            register_after_fork(self)
+
+        def _after_fork(self):
+            raise Exception("reset failed")
+
+    class Resource:
+        def __init__(self):
+            self.resets = 0
+            register_after_fork(self)
+
+        def _after_fork(self):
+            self.resets += 1
+
+    resources = [Failing(), Resource(), Failing(), Resource()]
+    assert run_in_child(lambda: [r.resets for r in resources[1::2]]) == [1, 1]
+
+
+@requires_fork
+def test_after_fork_write_lock():
+    """Test backends written in a forked child while a parent thread held
+    their write lock do not deadlock"""
+    backends = [DictBackend({"K_1": "v1"}), StringBackend('{"K_1": "v1"}')]
+    for bk in backends:
+        bk.update({"K_1": "v2"})
+        bk._get_write_lock().acquire()
+
+    def update():
+        for bk in backends:
+            bk.update({"K_1": "v3"})
+        return [bk.get("K_1") for bk in backends]
+
+    try:
+        assert run_in_child(update) == ["v3", "v3"]
+    finally:
+        for bk in backends:
+            bk._get_write_lock().release()
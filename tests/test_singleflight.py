@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyconfita.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight():
+    """Test concurrent calls for a key run once, and share the result"""
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(16)
+    results = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    def call():
+        barrier.wait()
+        results.append(flight.do("key", fn))
+
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(results) == [("value", False)] + [("value", True)] * 15
+    assert flight.in_flight() == 0
+
+    # Calls after completion run again
+    assert flight.do("key", fn) == ("value", False)
+    assert len(calls) == 2
+
+
+def test_single_flight_start():
+    """Test a call started in background is run once, and shared with
+    callers arriving while it is in flight"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait()
+        return "value"
+
+    assert flight.start("key", fn)
+    assert not flight.start("key", fn)
+    results = []
+    follower = threading.Thread(target=lambda: results.append(flight.do("key", fn)))
+    follower.start()
+    release.set()
+    follower.join()
+    assert results == [("value", True)]
+    assert len(calls) == 1
+
+    # Errors of a background call are not raised in its thread
+    assert flight.start("key", lambda: 1 / 0)
+    while flight.in_flight():
+        time.sleep(0.01)
+
+    # Background calls run on executor if any
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pool") as executor:
+        names = []
+        assert flight.start(
+            "key", lambda: names.append(threading.current_thread().name), executor
+        )
+    assert names[0].startswith("pool")
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_error():
+    """Test errors are raised to every concurrent caller"""
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fn():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("down")
+
+    def call():
+        try:
+            flight.do("key", fn)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for t in followers:
+        t.start()
+    for t in [leader] + followers:
+        t.join()
+    assert len(errors) == 5
+    assert flight.in_flight() == 0
+
+
+def test_async_single_flight():
+    """Test concurrent tasks for a key await one call, including its error,
+    and cancelled callers do not cancel it"""
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if len(calls) > 1:
+            raise ValueError("down")
+        return "value"
+
+    async def run():
+        results = await asyncio.gather(*[flight.do("key", fn) for _ in range(16)])
+        assert len(calls) == 1
+        assert results == [("value", False)] + [("value", True)] * 15
+        assert flight.in_flight() == 0
+
+        cancelled = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(ValueError):
+            await flight.do("key", fn)
+        assert len(calls) == 2
+        assert cancelled.cancelled()
+
+    asyncio.run(run())
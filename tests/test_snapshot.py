@@ -0,0 +1,129 @@
+import asyncio
+import pickle
+import threading
+import time
+
+import pytest
+
+from pyconfita import (
+    AsyncConfita,
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    Schema,
+    Snapshot,
+)
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+def test_snapshot():
+    """Test snapshot resolves values once, read-only and hashable"""
+    bk_1 = DictBackend({"K_1": "bk_1", "K_2": "2", "db": {"host": "h", "port": 1}})
+    bk_2 = DictBackend({"K_1": "bk_2"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk_1, bk_2])
+
+    schema = {"K_1": str, "K_2": int, "K_3": str, "db": {"host": str, "port": int}}
+    s = c.snapshot(schema)
+    assert s == {"K_1": "bk_2", "K_2": 2, "K_3": None, "db": {"host": "h", "port": 1}}
+    assert s["db"]["host"] == "h"
+    assert s.get("K_4", "default") == "default"
+    assert s.as_dict()["db"] == {"host": "h", "port": 1}
+    assert s.version == 1
+    assert s.built_at <= time.time()
+    assert s.build_seconds >= 0
+
+    # Backends are not read anymore
+    bk_2.kv = {"K_1": "bk_2_updated"}
+    assert s["K_1"] == "bk_2"
+
+    with pytest.raises(TypeError):
+        s["K_1"] = "value"
+    with pytest.raises(AttributeError):
+        s.version = 3
+
+    s_2 = c.snapshot(Schema({"K_1": str, "K_2": int}))
+    assert s_2.version == 2
+    assert s_2 == {"K_1": "bk_2_updated", "K_2": 2}
+    assert hash(s) != hash(s_2)
+    bk_2.kv = {"K_1": "bk_2"}
+    assert {s, s_2, c.snapshot(schema)} == {s, s_2}
+
+    s_3 = pickle.loads(pickle.dumps(s))
+    assert s_3 == s
+    assert s_3.version == s.version
+
+
+def test_snapshot_freeze():
+    """Test nested lists and mappings are frozen"""
+    s = Snapshot({"a": [1, {"b": [2]}]})
+    assert s["a"] == (1, Snapshot({"b": (2,)}))
+    hash(s)
+
+
+def test_async_snapshot():
+    """Test AsyncConfita snapshot"""
+    c = AsyncConfita(logger=MOCK_LOGGER, backends=[DictBackend({"K_1": "bk_1"})])
+    s = asyncio.run(c.snapshot({"K_1": str}))
+    assert s == {"K_1": "bk_1"}
+    assert s.version == 1
+
+
+def test_refresher():
+    """Test refresher only swaps snapshots with changed values"""
+    bk = DictBackend({"K_1": "v1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk])
+    refresher = c.refresher({"K_1": str})
+    s = refresher.snapshot
+    assert s == {"K_1": "v1"}
+
+    assert not refresher.refresh()
+    assert refresher.snapshot is s
+    bk.kv = {"K_1": "v2"}
+    assert refresher.refresh()
+    assert refresher.snapshot == {"K_1": "v2"}
+    assert refresher.snapshot.version > s.version
+
+
+def test_refresher_background():
+    """Test refresher swaps consistent snapshots in the background"""
+    bk = DictBackend({"A": "0", "B": "0"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk])
+    refresher = c.refresher({"A": int, "B": int}, interval=0.001)
+    errors = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            s = refresher.snapshot
+            if s["A"] != s["B"]:
+                errors.append(s)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    with refresher:
+        for t in readers:
+            t.start()
+        for i in range(1, 50):
+            bk.kv = {"A": str(i), "B": str(i)}
+            time.sleep(0.001)
+        deadline = time.monotonic() + 5
+        while refresher.snapshot["A"] != 49 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        done.set()
+        for t in readers:
+            t.join()
+    assert refresher.snapshot == {"A": 49, "B": 49}
+    assert not errors
+
+
+def test_refresher_error():
+    """Test failed builds keep the current snapshot"""
+    c = Confita(logger=MOCK_LOGGER, backends=[DictBackend({"K_1": "1"})])
+    refresher = c.refresher({"K_1": int}, interval=0.001)
+    s = refresher.snapshot
+    c.backends[0].kv = {"K_1": "not an int"}
+    with pytest.raises(Exception):
+        refresher.refresh()
+    with refresher:
+        time.sleep(0.02)
+    assert refresher.snapshot is s
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+import yaml
+
+from pyconfita import (
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    FileBackend,
+    VaultBackend,
+)
+from pyconfita.testing import run_threads, serve
+
+MOCK_LOGGER = DummyLoggingInterface()
+N_THREADS = 64
+N_READS = 300
+
+
+def test_dict_backend_threads():
+    """Test concurrent updates are all applied, while readers see complete
+    versions, with case-insensitive and dotted lookups"""
+    bk = DictBackend({"Version": "0", "Pair": "0:0", "db": {"host": "h0"}})
+    generation = bk.get_generation()
+    c = Confita(MOCK_LOGGER, [bk], case_sensitive=False, enable_cache=True)
+    n_writers = 8
+
+    def read_write(i):
+        for j in range(N_READS):
+            if i < n_writers and j % 10 == 0:
+                n = f"{i}_{j}"
+                bk.update({"Version": n, "Pair": f"{n}:{n}", "db": {"host": n}})
+            left, right = c.get("PAIR").split(":")
+            assert left == right
+            assert c.get("db.HOST") is not None
+
+    assert run_threads(read_write, N_THREADS) == [None] * N_THREADS
+    assert bk.get_generation() == generation + n_writers * N_READS // 10
+    # No value resolved from an older version remains cached
+    assert c.get("version") == bk.kv["Version"]
+    assert c.get("db.host") == bk.kv["db"]["host"]
+
+
+def test_file_backend_threads(tmp_path):
+    """Test readers see complete files while the file is replaced"""
+    file_path = str(tmp_path / "vars.yaml")
+
+    def write(n: int):
+        tmp_file = str(tmp_path / "vars.yaml.tmp")
+        with open(tmp_file, "w") as f:
+            yaml.safe_dump({f"K_{i}": n for i in range(50)}, f)
+        os.replace(tmp_file, file_path)
+
+    write(0)
+    bk = FileBackend(file_path, reload=True, reload_interval=0)
+    c = Confita(MOCK_LOGGER, [bk])
+    schema = {f"K_{i}": int for i in range(50)}
+    done = threading.Event()
+
+    def writer():
+        n = 0
+        while not done.is_set():
+            n += 1
+            write(n)
+            time.sleep(0.001)
+
+    def read(i):
+        for _ in range(N_READS // 10):
+            res = bk.get_many(schema)
+            # One load: all keys from the same version of the file
+            assert len(set(res.values())) == 1
+            assert c.get("K_0", type=int) is not None
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        assert run_threads(read, N_THREADS) == [None] * N_THREADS
+    finally:
+        done.set()
+        thread.join()
+
+
+def test_vault_backend_threads():
+    """Test concurrent reads keep one session per thread, while entries expire
+    and are evicted"""
+    store = {f"path{i}": {"key": f"secret_{i}"} for i in range(3)}
+    with serve(store) as server:
+        bk = VaultBackend(
+            MOCK_LOGGER,
+            url=server.url,
+            default_key_path="path0",
+            enable_cache=True,
+            cache_ttl=0.01,
+            cache_maxsize=2,
+        )
+        sessions = [None] * N_THREADS
+
+        def read(i):
+            sessions[i] = bk.cli.adapter.session
+            for j in range(N_READS // 10):
+                n = (i + j) % len(store)
+                assert bk.get("key", path=f"path{n}") == f"secret_{n}"
+
+        try:
+            assert run_threads(read, N_THREADS) == [None] * N_THREADS
+        finally:
+            bk.close()
+        assert len(server.client_ports) <= N_THREADS
+    assert len(set(map(id, sessions))) == N_THREADS
+    assert bk._flight.in_flight() == 0
+    # One cache lookup per read, counted under lock
+    stats = bk.get_cache_stats()
+    assert stats["hits"] + stats["misses"] == N_THREADS * (N_READS // 10)
+
+
+def test_invalidate_while_resolving():
+    """Test a value resolved before invalidate is not cached after it"""
+    bk = DictBackend({"K_1": "v1"})
+    c = Confita(MOCK_LOGGER, [bk], enable_cache=True)
+    read = bk._get
+
+    def read_then_change(key, **kwargs):
+        # Value changed without a new generation, and invalidated, while
+        # being resolved
+        value = read(key, **kwargs)
+        bk._kv = {"K_1": "v2"}
+        c.invalidate()
+        return value
+
+    bk._get = read_then_change
+    assert c.get("K_1") == "v1"
+    bk._get = read
+    assert c.get("K_1") == "v2"
@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from pyconfita import (
+    AsyncConfita,
+    Confita,
+    DictBackend,
+    DummyLoggingInterface,
+    InMemoryTracer,
+    Schema,
+)
+from pyconfita.tracing_interface import NOOP_SPAN, NOOP_TRACER
+
+MOCK_LOGGER = DummyLoggingInterface()
+
+
+def test_noop_tracer():
+    """Test tracer defaults to the no-op interface"""
+    bk = DictBackend({"K_1": "bk_1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk])
+    assert c.tracer is NOOP_TRACER
+    assert bk.tracer is NOOP_TRACER
+    assert not c.tracer.enabled
+    with NOOP_TRACER.start_span("span") as span:
+        span.set_attribute("key", "value")
+    assert span is NOOP_SPAN
+    assert c.get("K_1") == "bk_1"
+
+
+def test_in_memory_tracer():
+    """Test spans record attributes, parent span and exceptions"""
+    tracer = InMemoryTracer()
+    with pytest.raises(ValueError):
+        with tracer.start_span("parent", {"a": 1}) as parent:
+            with tracer.start_span("child") as child:
+                child.set_attribute("b", 2)
+            raise ValueError("boom")
+
+    assert tracer.find("child") == [child]
+    assert child.parent is parent
+    assert child.attributes == {"b": 2}
+    assert parent.parent is None
+    assert parent.attributes == {"a": 1, "pyconfita.outcome": "error"}
+    assert isinstance(parent.exception, ValueError)
+    assert parent.duration >= child.duration >= 0
+    tracer.reset()
+    assert tracer.spans == []
+
+
+def test_confita_tracing():
+    """Test Confita traces get, get_struct and each backend call"""
+    tracer = InMemoryTracer()
+    bk_1 = DictBackend({"K_1": "bk_1", "K_2": "bk_1"})
+    bk_2 = DictBackend({"K_1": "bk_2"})
+    bk_2.name = "dict_2"
+    c = Confita(logger=MOCK_LOGGER, backends=[bk_1, bk_2], tracer=tracer)
+    assert bk_1.tracer is tracer
+
+    assert c.get("K_2", path="some/path") == "bk_1"
+    (get,) = tracer.find("pyconfita.get")
+    assert get.attributes == {
+        "pyconfita.key": "K_2",
+        "pyconfita.path": "some/path",
+        "pyconfita.outcome": "hit",
+    }
+    calls = tracer.find("pyconfita.backend.get")
+    assert [s.attributes["pyconfita.backend"] for s in calls] == ["dict", "dict_2"]
+    assert [s.attributes["pyconfita.outcome"] for s in calls] == ["hit", "miss"]
+    assert all(s.parent is get for s in calls)
+
+    for short_circuit in [False, True]:
+        c.short_circuit = short_circuit
+        for schema in [{"K_1": str, "K_3": str}, Schema({"K_1": str, "K_3": str})]:
+            tracer.reset()
+            assert c.get_struct(schema) == {"K_1": "bk_2", "K_3": None}
+            (get_struct,) = tracer.find("pyconfita.get_struct")
+            assert get_struct.attributes["pyconfita.key"] == ["K_1", "K_3"]
+            assert get_struct.attributes["pyconfita.outcome"] == "partial"
+            calls = [s for s in tracer.spans if s.parent is get_struct]
+            assert len(calls) == 2
+            assert {s.attributes["pyconfita.backend"] for s in calls} == {
+                "dict",
+                "dict_2",
+            }
+            # Short-circuit only asks the first backend for K_3
+            assert {s.attributes["pyconfita.outcome"] for s in calls} == (
+                {"partial", "miss"} if short_circuit else {"partial"}
+            )
+
+
+def test_confita_cache_tracing():
+    """Test Confita traces cache lookups"""
+    tracer = InMemoryTracer()
+    bk = DictBackend({"K_1": "bk_1"})
+    c = Confita(logger=MOCK_LOGGER, backends=[bk], enable_cache=True, tracer=tracer)
+
+    c.get("K_1")
+    c.get("K_1")
+    lookups = tracer.find("pyconfita.cache_lookup")
+    assert [s.attributes["pyconfita.outcome"] for s in lookups] == ["miss", "hit"]
+    assert len(tracer.find("pyconfita.backend.get")) == 1
+
+
+def test_async_confita_tracing():
+    """Test AsyncConfita traces concurrent backend calls"""
+    tracer = InMemoryTracer()
+    bk_1 = DictBackend({"K_1": "bk_1", "K_2": "bk_1"})
+    bk_2 = DictBackend({"K_1": "bk_2"})
+    c = AsyncConfita(logger=MOCK_LOGGER, backends=[bk_1, bk_2], tracer=tracer)
+
+    async def main():
+        assert await c.get("K_1") == "bk_2"
+        assert await c.get_struct({"K_1": str, "K_2": str}) == {
+            "K_1": "bk_2",
+            "K_2": "bk_1",
+        }
+
+    asyncio.run(main())
+    (get,) = tracer.find("pyconfita.get")
+    calls = tracer.find("pyconfita.backend.get")
+    assert len(calls) == 2
+    assert all(s.parent is get for s in calls)
+    (get_struct,) = tracer.find("pyconfita.get_struct")
+    assert get_struct.attributes["pyconfita.outcome"] == "hit"
+    calls = tracer.find("pyconfita.backend.get_struct")
+    assert len(calls) == 2
+    assert all(s.parent is get_struct for s in calls)